@@ -7,7 +7,16 @@ __author__ = 'Grzegorz Latuszek, Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
 
-from re import search, match
+from re import search, match, IGNORECASE, MULTILINE
+
+import six
+
+from moler.util.regexliteral import required_literal
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
 
 
 class RegexHelper(object):
@@ -39,3 +48,183 @@ class RegexHelper(object):
 
     def groupdict(self):
         return self._match.groupdict()
+
+
+class LineRule(object):
+
+    def __init__(self, regex, handler, literal=None, guard=None, full_lines_only=True, stop=True):
+        """
+        Declarative rule of parsing line of command output.
+
+        :param regex: compiled regular expression searched in line
+        :param handler: function(command, match) called when regex is found in line. Method of command class
+         (given from class body) is looked up by name in class of parsed command, so subclass may override it.
+        :param literal: string which must be inside line to search it with regex (prefilter). Literals required by
+         regex are found automatically, so pass it only if regex has no required literal (like alternatives).
+        :param guard: function(command) returning False if rule is not active now (like 'inside table' state).
+         Looked up by name like handler.
+        :param full_lines_only: True to apply rule only for full lines (with new line chars)
+        :param stop: True if line is fully parsed by rule, False to try next rules too
+        """
+        self.regex = regex
+        self.handler = handler
+        self.literal = literal
+        self.guard = guard
+        self.full_lines_only = full_lines_only
+        self.stop = stop
+
+
+class LineRules(object):
+
+    def __init__(self, rules, command_class=None):
+        """
+        Rules of parsing lines of command output, compiled once per command class.
+        Rules are tried in order. Regex of rule is searched only if line contains literal required by regex, so most
+        lines are rejected by substring checks instead of regex searches (and no exceptions are raised).
+
+        :param rules: list of LineRule
+        :param command_class: class of parsed commands - handlers and guards are taken from it by name (overridden
+         ones included)
+        """
+        self.rules = list(rules)
+        self._compiled = list()
+        for rule in self.rules:
+            literal = rule.literal if rule.literal is not None else required_literal(rule.regex)
+            self._compiled.append((literal, rule.regex.search, _class_function(command_class, rule.handler),
+                                   _class_function(command_class, rule.guard), rule.full_lines_only, rule.stop))
+
+    def parse(self, command, line, is_full_line):
+        """
+        Apply rules to line.
+
+        :param command: command which output is parsed (passed into handlers and guards)
+        :param line: line of output, without new line chars
+        :param is_full_line: True if line had new line chars
+        :return: True if any rule was applied to line, False otherwise
+        """
+        applied = False
+        for literal, search, handler, guard, full_lines_only, stop in self._compiled:
+            if full_lines_only and not is_full_line:
+                continue
+            if literal and literal not in line:
+                continue
+            if guard is not None and not guard(command):
+                continue
+            match = search(line)
+            if match:
+                handler(command, match)
+                applied = True
+                if stop:
+                    break
+        return applied
+
+
+def _class_function(command_class, function):
+    """
+    Find function of command class having the same name as given one (it may be overridden by subclass).
+
+    :param command_class: class of command or None
+    :param function: function given inside rule (may be lambda or None)
+    :return: function to call with command as first argument
+    """
+    if (command_class is None) or (function is None):
+        return function
+    return getattr(command_class, getattr(function, '__name__', ''), function)
+
+
+class PromptHint(object):
+    _hints = dict()  # compiled prompt -> PromptHint
+
+    @classmethod
+    def get(cls, prompt):
+        """
+        Return hint of prompt (built once per prompt).
+
+        :param prompt: compiled regular expression of prompt
+        :return: PromptHint
+        """
+        hint = cls._hints.get(prompt)
+        if hint is None:
+            hint = PromptHint(prompt)
+            cls._hints[prompt] = hint
+        return hint
+
+    def __init__(self, prompt):
+        """
+        Cheap checks of line done before searching it with prompt regex. Most lines of command output can't be
+        prompt since they don't contain literal required by prompt regex or (for prompt regex ending with $) they end
+        with other char than prompt regex requires, like generic prompt ending with one of $%#>~ chars.
+
+        :param prompt: compiled regular expression of prompt
+        """
+        self.literal = required_literal(prompt)
+        self.end_chars = _required_end_chars(prompt)
+
+    def may_match(self, line):
+        """
+        Check if line may be prompt.
+
+        :param line: line of output
+        :return: False if line can't match prompt regex, True if regex has to be searched in line
+        """
+        if self.literal and self.literal not in line:
+            return False
+        if self.end_chars:
+            stripped_line = line.rstrip()
+            if (not stripped_line) or (stripped_line[-1] not in self.end_chars):
+                return False
+        return True
+
+
+def _required_end_chars(prompt):
+    """
+    Find chars one of which must be the last non-whitespace char of line matching prompt regex ending with $.
+
+    :param prompt: compiled regular expression
+    :return: frozenset of chars or None if there are no such chars
+    """
+    if (prompt.flags & (IGNORECASE | MULTILINE)) or (not isinstance(prompt.pattern, six.text_type)):
+        return None
+    try:
+        items = list(sre_parse.parse(prompt.pattern, prompt.flags))
+    except Exception:  # parser is internal module of re, so don't let it break command
+        return None
+    if (not items) or (items[-1] != (sre_parse.AT, sre_parse.AT_END)):
+        return None
+    items.pop()
+    while items and _is_whitespace_item(items[-1]):
+        items.pop()
+    if not items:
+        return None
+    op, value = items[-1]
+    if op == sre_parse.LITERAL:
+        end_chars = [value]
+    elif op == sre_parse.IN and all(item_op == sre_parse.LITERAL for item_op, _ in value):
+        end_chars = [char for _, char in value]
+    else:
+        return None
+    end_chars = frozenset(six.unichr(char) for char in end_chars)
+    if any(char.isspace() for char in end_chars):
+        return None
+    return end_chars
+
+
+def _is_whitespace_item(item):
+    op, value = item
+    if op == sre_parse.LITERAL:
+        return six.unichr(value).isspace()
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        repeated = list(value[2])
+        return all(_is_whitespace_item(repeated_item) for repeated_item in repeated)
+    if op == sre_parse.IN:
+        return all(_is_whitespace_set_item(set_item) for set_item in value)
+    return False
+
+
+def _is_whitespace_set_item(item):
+    op, value = item
+    if op == sre_parse.CATEGORY:
+        return value == sre_parse.CATEGORY_SPACE
+    if op == sre_parse.LITERAL:
+        return six.unichr(value).isspace()
+    return False
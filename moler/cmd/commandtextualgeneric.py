@@ -8,13 +8,20 @@ __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
 import abc
+import functools
 import logging
 import re
 
 import six
 
-from moler.cmd import RegexHelper
+from moler.cmd import LineRules, PromptHint, RegexHelper
+from moler.util.columnartable import ColumnarTable
+from moler.util.recordsstorage import create_records_storage
+from moler.util.recordstream import RecordStream
 from moler.command import Command
+from moler.connection import ObservableConnection
+from moler.exceptions import WrongUsage
+from moler.helpers import split_into_lines
 from threading import Lock
 
 
@@ -24,6 +31,9 @@ class CommandTextualGeneric(Command):
 
     _re_default_prompt = re.compile(r'^[^<]*[\$|%|#|>|~]\s*$')  # When user provides no prompt
     _default_newline_chars = ("\n", "\r")  # New line chars on device, not system with script!
+    _line_rules = None  # List of LineRule - declarative parsing of lines of output (see _parse_line_with_rules)
+    _records_keys = ()  # Keys of current_ret with accumulated records (see set_result_storage)
+    _tables_keys = ()  # Keys of current_ret with lists of rows (dicts), None if current_ret is such list itself
 
     def __init__(self, connection, prompt=None, newline_chars=None, runner=None):
         """
@@ -61,6 +71,10 @@ class CommandTextualGeneric(Command):
         # command starts, False to split lines on every new line char
         self._stored_exception = None  # Exception stored before it is passed to base class when command is done.
         self._lock_is_done = Lock()
+        self.keep_records = True  # Set False to not keep records (like packets) in current_ret - they are passed only
+        # into streams then (see stream()). Used by commands producing records as they run (long running commands).
+        self._streams = list()
+        self.columnar_result = False  # Set True to return lists of rows (like processes) as ColumnarTable objects.
 
         if not self._newline_chars:
             self._newline_chars = CommandTextualGeneric._default_newline_chars
@@ -140,12 +154,23 @@ class CommandTextualGeneric(Command):
         :param data: List of strings sent by device.
         :return: None.
         """
-        lines = data.splitlines(True)
-        for line in lines:
+        if isinstance(self.connection, ObservableConnection):
+            lines = self.connection.received_lines(data, self._newline_chars)
+        else:
+            lines = split_into_lines(data, self._newline_chars)
+        self.lines_received(lines)
+
+    def lines_received(self, lines):
+        """
+        Called with data already split into lines.
+
+        :param lines: List of tuples (line, is_full_line), line with new line chars.
+        :return: None.
+        """
+        for line, is_full_line in lines:
             if self._last_not_full_line is not None:
                 line = "{}{}".format(self._last_not_full_line, line)
                 self._last_not_full_line = None
-            is_full_line = self.has_endline_char(line)
             if is_full_line:
                 line = self._strip_new_lines_chars(line)
             else:
@@ -182,18 +207,52 @@ class CommandTextualGeneric(Command):
                 self._is_done = True
             elif (self.ret_required and self.has_any_result()) or not self.ret_required:
                 if not self.done():
-                    self.set_result(self.current_ret)
+                    self.set_result(self._prepare_result(self.current_ret))
             else:
                 self._log(lvl=logging.DEBUG,
                           msg="Found candidate for final prompt but current ret is None or empty, required not None nor empty.")
 
+    def _prepare_result(self, result):
+        """
+        Prepare final result of command from current_ret.
+
+        :param result: current_ret
+        :return: result with tables of rows converted to ColumnarTable if columnar_result is set
+        """
+        if not self.columnar_result:
+            return result
+        for key in self._tables_keys:
+            if key is None:
+                return ColumnarTable.from_records(result)
+            if key in result:
+                result[key] = ColumnarTable.from_records(result[key])
+        return result
+
+    def _parse_line_with_rules(self, line, is_full_line):
+        """
+        Parse line with rules of command (_line_rules). Rules are compiled once per command class.
+
+        :param line: Line to parse, new lines are trimmed
+        :param is_full_line: True if new line character was removed from line, False otherwise
+        :return: True if any rule was applied to line, False otherwise
+        """
+        command_class = self.__class__
+        line_rules = command_class.__dict__.get('_compiled_line_rules')
+        if line_rules is None:
+            line_rules = LineRules(self._line_rules or [], command_class=command_class)
+            command_class._compiled_line_rules = line_rules
+        return line_rules.parse(self, line, is_full_line)
+
     def is_end_of_cmd_output(self, line):
         """
-        Checks if end of command is reached.
+        Checks if end of command is reached. Prompt regex is searched only in lines which pass cheap checks of
+        PromptHint (literal required by prompt, last char of prompt).
 
         :param line: Line from device.
         :return:
         """
+        if not PromptHint.get(self._re_prompt).may_match(line):
+            return False
         if self._regex_helper.search_compiled(self._re_prompt, line):
             return True
         return False
@@ -281,6 +340,62 @@ class CommandTextualGeneric(Command):
             self._command_string_right_index)
         self._log(logging.DEBUG, msg, levels_to_go_up=2)
 
+    def stream(self, timeout=None, max_buffered=1000, when_full='drop_oldest'):
+        """
+        Return stream of records parsed by command (for commands passing records as they are parsed, like tcpdump).
+        Command is started if it is not running yet. Iteration stops when command is done. If command failed then its
+        exception is raised after last record.
+
+        :param timeout: timeout of command (used if command is started here)
+        :param max_buffered: max number of records waiting for consumer
+        :param when_full: 'block', 'drop_oldest' or 'drop_newest' - see moler.util.recordstream
+        :return: RecordStream (iterable, also by async for)
+        """
+        record_stream = RecordStream(max_buffered=max_buffered, when_full=when_full)
+        self._streams.append(record_stream)
+        self.add_done_callback(functools.partial(self._close_stream, record_stream))
+        if (not self.done()) and (not self.running()):
+            self.start(timeout=timeout)
+        return record_stream
+
+    def _record_parsed(self, record):
+        """
+        Pass parsed record into streams of command.
+
+        :param record: parsed record
+        :return: None
+        """
+        for record_stream in self._streams:
+            record_stream.put(record)
+
+    @staticmethod
+    def _close_stream(record_stream, command):
+        record_stream.close(exception=command._exception)
+
+    @property
+    def accumulates_records(self):
+        """True if command accumulates records in its result (so set_result_storage() may be used)."""
+        return bool(self._records_keys)
+
+    def set_result_storage(self, mode='memory', max_records=None, directory=None):
+        """
+        Select where command keeps records accumulated in its result (like lines of cat). Call it before command
+        is started. Records already parsed are moved into new storage.
+
+        :param mode: 'memory' (list of all records), 'ring' (last max_records records) or 'disk' (records spilled into
+         temporary file, read lazily) - see moler.util.recordsstorage
+        :param max_records: max number of records kept by 'ring' storage
+        :param directory: directory for file of 'disk' storage (system temporary directory if None)
+        :return: None
+        """
+        if not self.accumulates_records:
+            raise WrongUsage("Command '{}' doesn't accumulate records, result storage can't be selected".format(
+                self.__class__.__name__))
+        for key in self._records_keys:
+            records = create_records_storage(mode=mode, max_records=max_records, directory=directory)
+            records.extend(self.current_ret.get(key, []))
+            self.current_ret[key] = records
+
     def has_any_result(self):
         """
         Checks if any result was already set by command.
@@ -13,6 +13,8 @@ __email__ = 'sylwester.golonka@nokia.com'
 
 
 class Cat(GenericUnixCommand):
+    _records_keys = ("LINES",)  # see set_result_storage()
+
     def __init__(self, connection, path, options=None, prompt=None, newline_chars=None, runner=None):
         super(Cat, self).__init__(connection=connection, prompt=prompt, newline_chars=newline_chars, runner=runner)
         self.path = path
@@ -7,11 +7,10 @@ __author__ = 'Yeshu Yang'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'yeshu.yang@nokia.com'
 
-import re
-
 from moler.cmd.unix.genericunix import GenericUnixCommand
 from moler.util.converterhelper import ConverterHelper
 from moler.exceptions import ParsingDone
+from moler.parser.table_text import TableText
 
 
 class Df(GenericUnixCommand):
@@ -19,6 +18,10 @@ class Df(GenericUnixCommand):
     def __init__(self, connection, prompt=None, newline_chars=None, runner=None):
         super(Df, self).__init__(connection=connection, prompt=prompt, newline_chars=newline_chars, runner=runner)
         self._converter_helper = ConverterHelper()
+        self._table_parser = TableText(Df._headers_regexps, Df._keys, _skip=r'^df:', convert_values=False,
+                                       converters={'Size': Df._without_unit, 'Used': Df._without_unit,
+                                                   'Avail': Df._without_unit, 'Use_percentage': Df._without_unit},
+                                       last_column_free_text=True)
 
     def build_command_string(self):
         cmd = "df -BM -T -P"
@@ -32,21 +35,31 @@ class Df(GenericUnixCommand):
                 pass
         return super(Df, self).on_new_line(line, is_full_line)
 
-    _re_filesystem_line = re.compile(r"^(?P<Filesystem>\S+)\s+(?P<Type>\S+)\s+(?P<Size>\S+)M\s+(?P<Used>\S+)M\s+"
-                                     r"(?P<Avail>\S+)M\s+(?P<Use_percentage>\d+)%\s+(?P<Mounted_on>\S+)$")
+    # Filesystem    Type 1048576-blocks      Used Available Capacity Mounted on
+    _headers_regexps = [r"Filesystem", r"Type", r"\S*blocks", r"Used", r"Avail\S*", r"Capacity|Use%", r"Mounted on"]
+    _keys = ["Filesystem", "Type", "Size", "Used", "Avail", "Use_percentage", "Mounted_on"]
 
     def _parse_filesystem_line(self, line):
-        if self._regex_helper.search_compiled(Df._re_filesystem_line, line):
-            filesystem = self._regex_helper.group("Filesystem")
-            Mounted_on = self._regex_helper.group("Mounted_on")
+        filesystem_info = self._table_parser.parse(line)
+        if filesystem_info:
             if "by_FS" not in self.current_ret:
                 self.current_ret["by_FS"] = dict()
             if "by_MOUNTPOINT" not in self.current_ret:
                 self.current_ret["by_MOUNTPOINT"] = dict()
-            self.current_ret["by_FS"][filesystem] = self._regex_helper.groupdict()
-            self.current_ret["by_MOUNTPOINT"][Mounted_on] = self._regex_helper.groupdict()
+            self.current_ret["by_FS"][filesystem_info["Filesystem"]] = filesystem_info
+            self.current_ret["by_MOUNTPOINT"][filesystem_info["Mounted_on"]] = dict(filesystem_info)
             raise ParsingDone
 
+    @staticmethod
+    def _without_unit(value):
+        """
+        Remove unit (M of -BM option, %) from value.
+
+        :param value: value from output, like 4039M or 46%
+        :return: value without unit, like 4039 or 46
+        """
+        return value.rstrip("M%")
+
 
 COMMAND_OUTPUT = """
 [root@Pclinux90: /home/runner]# df -BM -T -P
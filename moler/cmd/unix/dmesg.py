@@ -11,6 +11,8 @@ __email__ = 'sylwester.golonka@nokia.com'
 
 
 class Dmesg(GenericUnixCommand):
+    _records_keys = ("LINES",)  # see set_result_storage()
+
     def __init__(self, connection, options=None, prompt=None, newline_chars=None, runner=None):
         super(Dmesg, self).__init__(connection=connection, prompt=prompt, newline_chars=newline_chars, runner=runner)
         self.options = options
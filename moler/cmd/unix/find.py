@@ -15,6 +15,8 @@ import re
 
 
 class Find(GenericUnixCommand):
+    _records_keys = ("RESULT",)  # see set_result_storage()
+
     def __init__(self, connection, paths=None, prompt=None, newline_chars=None, options=None, operators=None,
                  runner=None):
         """
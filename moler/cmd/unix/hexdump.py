@@ -14,6 +14,8 @@ import re
 
 
 class Hexdump(GenericUnixCommand):
+    _records_keys = ("RESULT",)  # see set_result_storage()
+
     def __init__(self, connection, files, options=None, prompt=None, newline_chars=None, runner=None):
         super(Hexdump, self).__init__(connection=connection, prompt=prompt, newline_chars=newline_chars,
                                       runner=runner)
@@ -9,8 +9,8 @@ __email__ = 'sylwester.golonka@nokia.com, michal.ernst@nokia.com'
 
 import re
 
+from moler.cmd import LineRule
 from moler.cmd.unix.genericunix import GenericUnixCommand
-from moler.exceptions import ParsingDone
 
 
 class Ifconfig(GenericUnixCommand):
@@ -29,71 +29,54 @@ class Ifconfig(GenericUnixCommand):
         return cmd
 
     def on_new_line(self, line, is_full_line):
-        if is_full_line:
-            try:
-                self._parse_interface(line)
-                self._parse_rx_packets(line)
-                self._parse_tx_packets(line)
-                self._parse_rx_tx_bytes(line)
-                self._parse_content(line)
-                self._parse_link(line)
-                self._parse_v4_brd(line)
-                self._parse_v4(line)
-                self._parse_v6(line)
-            except ParsingDone:
-                pass
+        self._parse_line_with_rules(line, is_full_line)
         return super(Ifconfig, self).on_new_line(line, is_full_line)
 
-    def _process_line(self, line, regexp, key_list, dict_type):
-        if self._regex_helper.search_compiled(regexp, line):
-            _ret = dict()
-            for key in key_list:
-                _ret[key] = self._regex_helper.group(key)
+    def _process_match(self, match, key_list, dict_type):
+        _ret = dict()
+        for key in key_list:
+            _ret[key] = match.group(key)
 
-            if not self.current_ret[self.if_name][dict_type][0]:
-                self.current_ret[self.if_name][dict_type][0] = _ret
-            else:
-                self.current_ret[self.if_name][dict_type].append(_ret)
-            raise ParsingDone
+        if not self.current_ret[self.if_name][dict_type][0]:
+            self.current_ret[self.if_name][dict_type][0] = _ret
+        else:
+            self.current_ret[self.if_name][dict_type].append(_ret)
 
     _re_ip_v4_brd = re.compile(
         r"inet addr:(?P<IP>\d+\.\d+\.\d+\.\d+)\s\sBcast:(?P<BRD>\d+\.\d+\.\d+\.\d+)\s\sMask:(?P<MASK>\d+\.\d+\.\d+\.\d+)")
     _key_ip_v4_brd = ["IP", "BRD", "MASK"]
 
-    def _parse_v4_brd(self, line):
-        return self._process_line(line, Ifconfig._re_ip_v4_brd, Ifconfig._key_ip_v4_brd, "IPV4")
+    def _parse_v4_brd(self, match):
+        return self._process_match(match, Ifconfig._key_ip_v4_brd, "IPV4")
 
     _re_ip_v4 = re.compile(r"inet addr:(?P<IP>\d+\.\d+\.\d+\.\d+)\s\sMask:(?P<MASK>\d+\.\d+\.\d+\.\d+)")
     _key_ip_v4 = ["IP", "MASK"]
 
-    def _parse_v4(self, line):
-        return self._process_line(line, Ifconfig._re_ip_v4, Ifconfig._key_ip_v4, "IPV4")
+    def _parse_v4(self, match):
+        return self._process_match(match, Ifconfig._key_ip_v4, "IPV4")
 
     _re_ip_v6 = re.compile(r"inet6\saddr:\s(?P<IP>.*)\/(?P<MASK>\d+)\sScope:(?P<SCOPE>\S*)")
     _key_ip_v6 = ["IP", "MASK", "SCOPE"]
 
-    def _parse_v6(self, line):
-        return self._process_line(line, Ifconfig._re_ip_v6, Ifconfig._key_ip_v6, "IPV6")
+    def _parse_v6(self, match):
+        return self._process_match(match, Ifconfig._key_ip_v6, "IPV6")
 
     _re_link = re.compile(r"Link\sencap:(?P<ENCAP>\S*)\s\sHWaddr\s(?P<MAC>\S*)")
     _key_link = ["ENCAP", "MAC"]
 
-    def _parse_link(self, line):
-        return self._process_line(line, Ifconfig._re_link, Ifconfig._key_link, "LINK")
+    def _parse_link(self, match):
+        return self._process_match(match, Ifconfig._key_link, "LINK")
 
     _re_interface = re.compile(r"^(?P<INTERFACE>\S+)\s+(.+)$")
 
-    def _parse_interface(self, line):
-        if self._regex_helper.search_compiled(Ifconfig._re_interface, line):
-            self.current_ret[self._regex_helper.group("INTERFACE")] = {"IPV4": [{}], "IPV6": [{}], "LINK": [{}],
-                                                                       "CONTENT": []}
-            self.if_name = self._regex_helper.group("INTERFACE")
+    def _parse_interface(self, match):
+        self.current_ret[match.group("INTERFACE")] = {"IPV4": [{}], "IPV6": [{}], "LINK": [{}], "CONTENT": []}
+        self.if_name = match.group("INTERFACE")
 
     _re_content = re.compile(r"^\s+(?P<CONTENT>\w+.*)")
 
-    def _parse_content(self, line):
-        if self._regex_helper.search_compiled(Ifconfig._re_content, line):
-            self.current_ret[self.if_name]["CONTENT"].append(self._regex_helper.group("CONTENT"))
+    def _parse_content(self, match):
+        self.current_ret[self.if_name]["CONTENT"].append(match.group("CONTENT"))
 
     def _prepare_rx_tx_result_keys(self):
         if "RX" not in self.current_ret[self.if_name]:
@@ -109,50 +92,56 @@ class Ifconfig(GenericUnixCommand):
     _re_rx_packets = re.compile(
         r"RX packets:(?P<PACKETS>\d+)\s+errors:(?P<ERRORS>\d+)\s+dropped:(?P<DROPPED>\d+)\s+overruns:(?P<OVERRUNS>\d+)\s+frame:(?P<FRAME>\d+)")
 
-    def _parse_rx_packets(self, line):
-        if self._regex_helper.search_compiled(Ifconfig._re_rx_packets, line):
-            self._prepare_rx_tx_result_keys()
-            self.current_ret[self.if_name]["RX"]["packets"] = {
-                "packets": self._regex_helper.group("PACKETS"),
-                "errors": self._regex_helper.group("ERRORS"),
-                "dropped": self._regex_helper.group("DROPPED"),
-                "overruns": self._regex_helper.group("OVERRUNS"),
-                "frame": self._regex_helper.group("FRAME"),
-            }
-
-            raise ParsingDone
+    def _parse_rx_packets(self, match):
+        self._prepare_rx_tx_result_keys()
+        self.current_ret[self.if_name]["RX"]["packets"] = {
+            "packets": match.group("PACKETS"),
+            "errors": match.group("ERRORS"),
+            "dropped": match.group("DROPPED"),
+            "overruns": match.group("OVERRUNS"),
+            "frame": match.group("FRAME"),
+        }
 
     # TX packets:18083 errors:0 dropped:0 overruns:0 carrier:0
     _re_tx_packets = re.compile(
         r"TX packets:(?P<PACKETS>\d+)\s+errors:(?P<ERRORS>\d+)\s+dropped:(?P<DROPPED>\d+)\s+overruns:(?P<OVERRUNS>\d+)\s+carrier:(?P<CARRIER>\d+)")
 
-    def _parse_tx_packets(self, line):
-        if self._regex_helper.search_compiled(Ifconfig._re_tx_packets, line):
-            self._prepare_rx_tx_result_keys()
-            self.current_ret[self.if_name]["TX"]["packets"] = {
-                "packets": self._regex_helper.group("PACKETS"),
-                "errors": self._regex_helper.group("ERRORS"),
-                "dropped": self._regex_helper.group("DROPPED"),
-                "overruns": self._regex_helper.group("OVERRUNS"),
-                "carrier": self._regex_helper.group("CARRIER"),
-            }
-
-            raise ParsingDone
+    def _parse_tx_packets(self, match):
+        self._prepare_rx_tx_result_keys()
+        self.current_ret[self.if_name]["TX"]["packets"] = {
+            "packets": match.group("PACKETS"),
+            "errors": match.group("ERRORS"),
+            "dropped": match.group("DROPPED"),
+            "overruns": match.group("OVERRUNS"),
+            "carrier": match.group("CARRIER"),
+        }
 
     # RX bytes:630550 (615.7 KiB)  TX bytes:2560834 (2.4 MiB)
     _re_rx_tx_bytes = re.compile(r"RX bytes:(?P<RX_BYTES>\d+).*TX bytes:(?P<TX_BYTES>\d+)")
 
-    def _parse_rx_tx_bytes(self, line):
-        if self._regex_helper.search_compiled(Ifconfig._re_rx_tx_bytes, line):
-            self._prepare_rx_tx_result_keys()
-            self.current_ret[self.if_name]["RX"]["bytes"] = {
-                "bytes_raw": self._regex_helper.group("RX_BYTES"),
-            }
-            self.current_ret[self.if_name]["TX"]["bytes"] = {
-                "bytes_raw": self._regex_helper.group("TX_BYTES"),
-            }
-
-            raise ParsingDone
+    def _parse_rx_tx_bytes(self, match):
+        self._prepare_rx_tx_result_keys()
+        self.current_ret[self.if_name]["RX"]["bytes"] = {
+            "bytes_raw": match.group("RX_BYTES"),
+        }
+        self.current_ret[self.if_name]["TX"]["bytes"] = {
+            "bytes_raw": match.group("TX_BYTES"),
+        }
+
+    def _inside_interface(self):
+        return self.if_name is not None
+
+    _line_rules = [
+        LineRule(_re_interface, _parse_interface, stop=False),
+        LineRule(_re_rx_packets, _parse_rx_packets, guard=_inside_interface),
+        LineRule(_re_tx_packets, _parse_tx_packets, guard=_inside_interface),
+        LineRule(_re_rx_tx_bytes, _parse_rx_tx_bytes, guard=_inside_interface),
+        LineRule(_re_content, _parse_content, guard=_inside_interface, stop=False),
+        LineRule(_re_link, _parse_link, guard=_inside_interface),
+        LineRule(_re_ip_v4_brd, _parse_v4_brd, guard=_inside_interface),
+        LineRule(_re_ip_v4, _parse_v4, guard=_inside_interface),
+        LineRule(_re_ip_v6, _parse_v6, guard=_inside_interface),
+    ]
 
 
 COMMAND_OUTPUT = """
@@ -17,6 +17,8 @@ from moler.exceptions import ParsingDone
 class IpRoute(GenericUnixCommand):
     """Unix command ip route"""
 
+    _tables_keys = ("ALL",)  # see columnar_result of CommandTextualGeneric
+
     def __init__(self, connection, prompt=None, newline_chars=None, runner=None, is_ipv6=False, addr_get=None,
                  addr_from=None):
         """
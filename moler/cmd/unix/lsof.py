@@ -17,6 +17,9 @@ class Lsof(GenericUnixCommand):
 
     """Unix lsof command"""
 
+    _records_keys = ("VALUES",)  # see set_result_storage()
+    _tables_keys = ("VALUES",)  # see columnar_result of CommandTextualGeneric
+
     def __init__(self, connection, prompt=None, newline_chars=None, runner=None, options=None):
         """
         Unix lsof command
@@ -12,6 +12,9 @@ from moler.exceptions import ParsingDone
 class Netstat(GenericUnixCommand):
     """Netstat command class."""
 
+    # see columnar_result of CommandTextualGeneric
+    _tables_keys = ("UNIX_SOCKETS", "INTERNET_CONNECTIONS", "GROUP", "INTERFACE", "ROUTING_TABLE")
+
     def __init__(self, connection, options="", prompt=None, newline_chars=None, runner=None):
         """
         Netstat command.
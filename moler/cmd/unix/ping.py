@@ -8,10 +8,12 @@ __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'julia.patacz@nokia.com, marcin.usielski@nokia.com'
 
 import re
+from array import array
 
+from moler.cmd import LineRule
 from moler.cmd.unix.genericunix import GenericUnixCommand
-from moler.exceptions import ParsingDone
 from moler.util.converterhelper import ConverterHelper
+from moler.util.rttstatistics import RttStatistics
 
 
 class Ping(GenericUnixCommand):
@@ -31,6 +33,7 @@ class Ping(GenericUnixCommand):
         self.options = options
         self.destination = destination
         self._converter_helper = ConverterHelper.get_converter_helper()
+        self._rtt_statistics = RttStatistics()
 
     def build_command_string(self):
         """
@@ -52,88 +55,126 @@ class Ping(GenericUnixCommand):
         :param is_full_line: True if line had new line chars, False otherwise
         :return: Nothing
         """
-        if is_full_line:
-            try:
-                self._parse_trans_recv_loss_time_plus_errors(line)
-                self._parse_trans_recv_loss_time(line)
-                self._parse_min_avg_max_mdev_unit_time(line)
-            except ParsingDone:
-                pass  # line has been fully parsed by one of above parse-methods
+        self._parse_line_with_rules(line, is_full_line)
         return super(Ping, self).on_new_line(line, is_full_line)
 
+    def get_rtt_statistics(self):
+        """
+        Return statistics of replies received so far (may be called while ping is running).
+        :return: dict with number of replies, rtt percentiles (in seconds), numbers of duplicated and out of order
+         replies
+        """
+        return self._rtt_statistics.get_statistics()
+
+    # 64 bytes from localhost (127.0.0.1): icmp_seq=1 ttl=64 time=0.047 ms
+    # 64 bytes from 10.0.0.1: icmp_seq=3 ttl=64 time=0.412 ms (DUP!)
+    # 64 bytes from 127.0.0.1: seq=0 ttl=64 time=0.053 ms
+    _re_reply = re.compile(
+        r"\b(?:icmp_)?[rs]eq=(?P<SEQ>\d+)\s+ttl=(?P<TTL>\d+)\s+time=(?P<RTT>[\d\.]+)\s*(?P<UNIT>\w+)(?P<DUP>.*DUP!)?")
+
+    def _parse_reply(self, match):
+        """
+        Parses single reply from the line of command output
+        :param match: Match object of regex found in line of output of command.
+        :return: Nothing
+        """
+        sequence = int(match.group('SEQ'))
+        ttl = int(match.group('TTL'))
+        rtt_seconds = self._converter_helper.to_seconds(float(match.group('RTT')), match.group('UNIT'))
+        duplicated = match.group('DUP') is not None
+        self._rtt_statistics.add_reply(sequence=sequence, ttl=ttl, rtt_seconds=rtt_seconds, duplicated=duplicated,
+                                       keep_series=self.keep_records)
+        if self._streams:
+            self._record_parsed({'sequence': sequence, 'ttl': ttl, 'rtt_seconds': rtt_seconds,
+                                 'duplicated': duplicated})
+
+    def _add_replies_to_ret(self):
+        """
+        Puts series and statistics of replies into result.
+        :return: Nothing
+        """
+        if self._rtt_statistics.replies:
+            self.current_ret.update(self._rtt_statistics.get_statistics())
+            if self.keep_records:
+                self.current_ret['replies_sequence'] = self._rtt_statistics.sequences
+                self.current_ret['replies_ttl'] = self._rtt_statistics.ttls
+                self.current_ret['replies_rtt_seconds'] = self._rtt_statistics.rtts
+
     # 11 packets transmitted, 11 received, 0 % packet loss, time 9999 ms
     _re_trans_recv_loss_time = re.compile(
         r"(?P<PKTS_TRANS>\d+) packets transmitted, (?P<PKTS_RECV>\d+) received, (?P<PKT_LOSS>\S+)% packet loss, time (?P<TIME>\d+)\s*(?P<UNIT>\w+)")
 
-    def _parse_trans_recv_loss_time(self, line):
+    def _parse_trans_recv_loss_time(self, match):
         """
         Parses packets from the line of command output
-        :param line: Line of output of command.
-        :return: Nothing but raises ParsingDone if line has information to handle by this method.
-        """
-        if self._regex_helper.search_compiled(Ping._re_trans_recv_loss_time, line):
-            self.current_ret['packets_transmitted'] = int(self._regex_helper.group('PKTS_TRANS'))
-            self.current_ret['packets_received'] = int(self._regex_helper.group('PKTS_RECV'))
-            self.current_ret['packet_loss'] = int(self._regex_helper.group('PKT_LOSS'))
-            self.current_ret['time'] = int(self._regex_helper.group('TIME'))
-            self.current_ret['packets_time_unit'] = self._regex_helper.group('UNIT')
-            value_in_seconds = self._converter_helper.to_seconds(self.current_ret['time'], self.current_ret['packets_time_unit'])
-            self.current_ret['time_seconds'] = value_in_seconds
-            raise ParsingDone
+        :param match: Match object of regex found in line of output of command.
+        :return: Nothing
+        """
+        self.current_ret['packets_transmitted'] = int(match.group('PKTS_TRANS'))
+        self.current_ret['packets_received'] = int(match.group('PKTS_RECV'))
+        self.current_ret['packet_loss'] = int(match.group('PKT_LOSS'))
+        self.current_ret['time'] = int(match.group('TIME'))
+        self.current_ret['packets_time_unit'] = match.group('UNIT')
+        value_in_seconds = self._converter_helper.to_seconds(self.current_ret['time'], self.current_ret['packets_time_unit'])
+        self.current_ret['time_seconds'] = value_in_seconds
+        self._add_replies_to_ret()
 
     # 4 packets transmitted, 3 received, +1 errors, 25% packet loss, time 3008ms
     _re_trans_recv_loss_time_plus_errors = re.compile(
         r"(?P<PKTS_TRANS>\d+) packets transmitted, (?P<PKTS_RECV>\d+) received, \+?(?P<ERRORS>\d+) errors, (?P<PKT_LOSS>\S+)% packet loss, time (?P<TIME>\d+)\s*(?P<UNIT>\w+)")
 
-    def _parse_trans_recv_loss_time_plus_errors(self, line):
+    def _parse_trans_recv_loss_time_plus_errors(self, match):
         """
         Parses packets from the line of command output
-        :param line: Line of output of command.
-        :return: Nothing but raises ParsingDone if line has information to handle by this method.
-        """
-        if self._regex_helper.search_compiled(Ping._re_trans_recv_loss_time_plus_errors, line):
-            self.current_ret['packets_transmitted'] = int(self._regex_helper.group('PKTS_TRANS'))
-            self.current_ret['packets_received'] = int(self._regex_helper.group('PKTS_RECV'))
-            self.current_ret['errors'] = int(self._regex_helper.group('ERRORS'))
-            self.current_ret['packet_loss'] = int(self._regex_helper.group('PKT_LOSS'))
-            self.current_ret['time'] = int(self._regex_helper.group('TIME'))
-            self.current_ret['packets_time_unit'] = self._regex_helper.group('UNIT')
-            value_in_seconds = self._converter_helper.to_seconds(self.current_ret['time'],
-                                                                 self.current_ret['packets_time_unit'])
-            self.current_ret['time_seconds'] = value_in_seconds
-            raise ParsingDone
+        :param match: Match object of regex found in line of output of command.
+        :return: Nothing
+        """
+        self.current_ret['packets_transmitted'] = int(match.group('PKTS_TRANS'))
+        self.current_ret['packets_received'] = int(match.group('PKTS_RECV'))
+        self.current_ret['errors'] = int(match.group('ERRORS'))
+        self.current_ret['packet_loss'] = int(match.group('PKT_LOSS'))
+        self.current_ret['time'] = int(match.group('TIME'))
+        self.current_ret['packets_time_unit'] = match.group('UNIT')
+        value_in_seconds = self._converter_helper.to_seconds(self.current_ret['time'],
+                                                             self.current_ret['packets_time_unit'])
+        self.current_ret['time_seconds'] = value_in_seconds
+        self._add_replies_to_ret()
 
     # rtt min/avg/max/mdev = 0.033/0.050/0.084/0.015 ms
     _re_min_avg_max_mdev_unit_time = re.compile(
         r"rtt min\/avg\/max\/mdev = (?P<MIN>[\d\.]+)\/(?P<AVG>[\d\.]+)\/(?P<MAX>[\d\.]+)\/(?P<MDEV>[\d\.]+)\s+(?P<UNIT>\w+)")
 
-    def _parse_min_avg_max_mdev_unit_time(self, line):
+    def _parse_min_avg_max_mdev_unit_time(self, match):
         """
         Parses rrt info form the line of command output
-        :param line: Line of output of command
-        :return: Nothing but raises ParsingDone if line has information to handle by this method.
-        """
-        if self._regex_helper.search_compiled(Ping._re_min_avg_max_mdev_unit_time, line):
-            unit = self._regex_helper.group('UNIT')
-            time_min = float(self._regex_helper.group('MIN'))
-            time_min_sec = self._converter_helper.to_seconds(time_min, unit)
-            time_avg = float(self._regex_helper.group('AVG'))
-            time_avg_sec = self._converter_helper.to_seconds(time_avg, unit)
-            time_max = float(self._regex_helper.group('MAX'))
-            time_max_sec = self._converter_helper.to_seconds(time_max, unit)
-            time_mdev = float(self._regex_helper.group('MDEV'))
-            time_mdev_sec = self._converter_helper.to_seconds(time_mdev, unit)
-            self.current_ret['time_unit'] = unit
-            self.current_ret['time_min'] = time_min
-            self.current_ret['time_min_seconds'] = time_min_sec
-            self.current_ret['time_avg'] = time_avg
-            self.current_ret['time_avg_seconds'] = time_avg_sec
-            self.current_ret['time_max'] = time_max
-            self.current_ret['time_max_seconds'] = time_max_sec
-            self.current_ret['time_mdev'] = time_mdev
-            self.current_ret['time_mdev_seconds'] = time_mdev_sec
-
-            raise ParsingDone
+        :param match: Match object of regex found in line of output of command.
+        :return: Nothing
+        """
+        unit = match.group('UNIT')
+        time_min = float(match.group('MIN'))
+        time_min_sec = self._converter_helper.to_seconds(time_min, unit)
+        time_avg = float(match.group('AVG'))
+        time_avg_sec = self._converter_helper.to_seconds(time_avg, unit)
+        time_max = float(match.group('MAX'))
+        time_max_sec = self._converter_helper.to_seconds(time_max, unit)
+        time_mdev = float(match.group('MDEV'))
+        time_mdev_sec = self._converter_helper.to_seconds(time_mdev, unit)
+        self.current_ret['time_unit'] = unit
+        self.current_ret['time_min'] = time_min
+        self.current_ret['time_min_seconds'] = time_min_sec
+        self.current_ret['time_avg'] = time_avg
+        self.current_ret['time_avg_seconds'] = time_avg_sec
+        self.current_ret['time_max'] = time_max
+        self.current_ret['time_max_seconds'] = time_max_sec
+        self.current_ret['time_mdev'] = time_mdev
+        self.current_ret['time_mdev_seconds'] = time_mdev_sec
+
+    _line_rules = [
+        LineRule(_re_reply, _parse_reply),
+        LineRule(_re_trans_recv_loss_time_plus_errors, _parse_trans_recv_loss_time_plus_errors),
+        LineRule(_re_trans_recv_loss_time, _parse_trans_recv_loss_time),
+        LineRule(_re_min_avg_max_mdev_unit_time, _parse_min_avg_max_mdev_unit_time),
+    ]
 
 
 COMMAND_OUTPUT = """
@@ -168,6 +209,16 @@ COMMAND_RESULT = {
     'time_max_seconds': 0.062 * 0.001,
     'time_mdev_seconds': 0.012 * 0.001,
     'time_unit': 'ms',
+    'replies': 6,
+    'replies_duplicated': 0,
+    'replies_out_of_order': 0,
+    'replies_sequence': array('l', [1, 2, 3, 4, 5, 6]),
+    'replies_ttl': array('l', [64, 64, 64, 64, 64, 64]),
+    'replies_rtt_seconds': array('d', [0.047 * 0.001, 0.039 * 0.001, 0.041 * 0.001, 0.035 * 0.001, 0.051 * 0.001,
+                                       0.062 * 0.001]),
+    'rtt_p50_seconds': 0.041 * 0.001,
+    'rtt_p95_seconds': 0.062 * 0.001,
+    'rtt_p99_seconds': 0.062 * 0.001,
 }
 
 COMMAND_OUTPUT_v6 = """ute@debdev:~/moler_int$ ping6 ::1 -w 5
@@ -205,6 +256,16 @@ COMMAND_RESULT_v6 = {
     'time_max_seconds': 0.070 * 0.001,
     'time_mdev_seconds': 0.019 * 0.001,
     'time_unit': 'ms',
+    'replies': 6,
+    'replies_duplicated': 0,
+    'replies_out_of_order': 0,
+    'replies_sequence': array('l', [1, 2, 3, 4, 5, 6]),
+    'replies_ttl': array('l', [64, 64, 64, 64, 64, 64]),
+    'replies_rtt_seconds': array('d', [0.028 * 0.001, 0.042 * 0.001, 0.022 * 0.001, 0.067 * 0.001, 0.066 * 0.001,
+                                       0.070 * 0.001]),
+    'rtt_p50_seconds': 0.042 * 0.001,
+    'rtt_p95_seconds': 0.070 * 0.001,
+    'rtt_p99_seconds': 0.070 * 0.001,
 }
 
 
@@ -242,4 +303,13 @@ COMMAND_RESULT_pipe = {
     'time_max_seconds': 1260.131 * 0.001,
     'time_mdev_seconds': 544.022 * 0.001,
     'time_unit': 'ms',
+    'replies': 3,
+    'replies_duplicated': 0,
+    'replies_out_of_order': 0,
+    'replies_sequence': array('l', [2, 3, 4]),
+    'replies_ttl': array('l', [64, 64, 64]),
+    'replies_rtt_seconds': array('d', [1260 * 0.001, 253 * 0.001, 0.408 * 0.001]),
+    'rtt_p50_seconds': 253 * 0.001,
+    'rtt_p95_seconds': 1260 * 0.001,
+    'rtt_p99_seconds': 1260 * 0.001,
 }
@@ -26,6 +26,8 @@ class Ps(GenericUnixCommand):
 
     """Unix command ps."""
 
+    _tables_keys = (None,)  # see columnar_result of CommandTextualGeneric
+
     def __init__(self, connection=None, options='', prompt=None, newline_chars=None, runner=None):
         """
         Represents Unix command ps.
@@ -9,8 +9,8 @@ __email__ = 'julia.patacz@nokia.com, michal.ernst@nokia.com'
 
 import re
 
+from moler.cmd import LineRule
 from moler.cmd.unix.genericunix import GenericUnixCommand
-from moler.exceptions import ParsingDone
 
 
 class Tcpdump(GenericUnixCommand):
@@ -20,6 +20,7 @@ class Tcpdump(GenericUnixCommand):
         # Parameters defined by calling the command
         self.options = options
         self.packets_counter = 0
+        self._streamed_packets_counter = 0  # packets already passed into streams
 
         self.ret_required = False
 
@@ -30,105 +31,112 @@ class Tcpdump(GenericUnixCommand):
         return cmd
 
     def on_new_line(self, line, is_full_line):
-        if is_full_line:
-            try:
-                self._parse_port_linktype_capture_size(line)
-                self._parse_timestamp_src_dst_details(line)
-                self._parse_timestamp_tos_ttl_id_offset_flags_proto_length(line)
-                self._parse_src_dst_details(line)
-                self._parse_root_delay_root_dipersion_ref_id(line)
-                self._parse_header_timestamp_details(line)
-                self._parse_packets(line)
-            except ParsingDone:
-                pass
+        self._parse_line_with_rules(line, is_full_line)
         return super(Tcpdump, self).on_new_line(line, is_full_line)
 
     # listening on eth0, link-type EN10MB (Ethernet), capture size 262144 bytes
     _re_port_linktype_capture_size = re.compile(
         r"(?P<LISTENING>listening)\s+on\s+(?P<PORT>\S+),\s+(?P<LINK>link-type)\s+(?P<TYPE>.*),\s+(?P<CAPTURE>capture size)\s+(?P<SIZE>.*)")
 
-    def _parse_port_linktype_capture_size(self, line):
-        if self._regex_helper.search_compiled(Tcpdump._re_port_linktype_capture_size, line):
-            self.current_ret[self._regex_helper.group("LISTENING")] = self._regex_helper.group("PORT")
-            self.current_ret[self._regex_helper.group("LINK")] = self._regex_helper.group("TYPE")
-            self.current_ret[self._regex_helper.group("CAPTURE")] = self._regex_helper.group("SIZE")
-            raise ParsingDone
+    def _parse_port_linktype_capture_size(self, match):
+        self.current_ret[match.group("LISTENING")] = match.group("PORT")
+        self.current_ret[match.group("LINK")] = match.group("TYPE")
+        self.current_ret[match.group("CAPTURE")] = match.group("SIZE")
 
     # 13:16:22.176856 IP debdev.ntp > fwdns2.vbctv.in.ntp: NTPv4, Client, length 48
     _re_timestamp_src_dst_details = re.compile(
         r"(?P<TIMESTAMP>\d+:\d+:\d+.\d+)\s+IP\s+(?P<SRC>\S+)\s+>\s+(?P<DEST>\S+):\s+(?P<DETAILS>.*)")
 
-    def _parse_timestamp_src_dst_details(self, line):
-        if self._regex_helper.search_compiled(Tcpdump._re_timestamp_src_dst_details, line):
-            self.packets_counter += 1
-            self.current_ret[str(self.packets_counter)] = {}
-            self.current_ret[str(self.packets_counter)]['timestamp'] = self._regex_helper.group("TIMESTAMP")
-            self.current_ret[str(self.packets_counter)]['source'] = self._regex_helper.group("SRC")
-            self.current_ret[str(self.packets_counter)]['destination'] = self._regex_helper.group("DEST")
-            self.current_ret[str(self.packets_counter)]['details'] = self._regex_helper.group("DETAILS")
-            raise ParsingDone
+    def _parse_timestamp_src_dst_details(self, match):
+        self._packet_parsed()
+        self.packets_counter += 1
+        self.current_ret[str(self.packets_counter)] = {}
+        self.current_ret[str(self.packets_counter)]['timestamp'] = match.group("TIMESTAMP")
+        self.current_ret[str(self.packets_counter)]['source'] = match.group("SRC")
+        self.current_ret[str(self.packets_counter)]['destination'] = match.group("DEST")
+        self.current_ret[str(self.packets_counter)]['details'] = match.group("DETAILS")
 
     # 13:31:33.176710 IP (tos 0xc0, ttl 64, id 4236, offset 0, flags [DF], proto UDP (17), length 76)
 
     _re_timestamp_tos_ttl_id_offset_flags_proto_length = re.compile(
         r"(?P<TIMESTAMP>\d+:\d+:\d+.\d+)\s+IP\s+\(tos\s+(?P<TOS>\S+),\s+ttl\s+(?P<TTL>\S+),\s+id\s+(?P<ID>\S+),\s+offset\s+(?P<OFFSET>\S+),\s+flags\s+(?P<FLAGS>\S+),\s+proto\s+(?P<PROTO>\S+.*\S+),\s+length\s+(?P<LENGTH>\S+)\)")
 
-    def _parse_timestamp_tos_ttl_id_offset_flags_proto_length(self, line):
-        if self._regex_helper.search_compiled(Tcpdump._re_timestamp_tos_ttl_id_offset_flags_proto_length, line):
-            self.packets_counter += 1
-            self.current_ret[str(self.packets_counter)] = {}
-            self.current_ret[str(self.packets_counter)]['timestamp'] = self._regex_helper.group("TIMESTAMP")
-            self.current_ret[str(self.packets_counter)]['tos'] = self._regex_helper.group("TOS")
-            self.current_ret[str(self.packets_counter)]['ttl'] = self._regex_helper.group("TTL")
-            self.current_ret[str(self.packets_counter)]['id'] = self._regex_helper.group("ID")
-            self.current_ret[str(self.packets_counter)]['offset'] = self._regex_helper.group("OFFSET")
-            self.current_ret[str(self.packets_counter)]['flags'] = self._regex_helper.group("FLAGS")
-            self.current_ret[str(self.packets_counter)]['proto'] = self._regex_helper.group("PROTO")
-            self.current_ret[str(self.packets_counter)]['length'] = self._regex_helper.group("LENGTH")
-            raise ParsingDone
+    def _parse_timestamp_tos_ttl_id_offset_flags_proto_length(self, match):
+        self._packet_parsed()
+        self.packets_counter += 1
+        self.current_ret[str(self.packets_counter)] = {}
+        self.current_ret[str(self.packets_counter)]['timestamp'] = match.group("TIMESTAMP")
+        self.current_ret[str(self.packets_counter)]['tos'] = match.group("TOS")
+        self.current_ret[str(self.packets_counter)]['ttl'] = match.group("TTL")
+        self.current_ret[str(self.packets_counter)]['id'] = match.group("ID")
+        self.current_ret[str(self.packets_counter)]['offset'] = match.group("OFFSET")
+        self.current_ret[str(self.packets_counter)]['flags'] = match.group("FLAGS")
+        self.current_ret[str(self.packets_counter)]['proto'] = match.group("PROTO")
+        self.current_ret[str(self.packets_counter)]['length'] = match.group("LENGTH")
 
     # debdev.ntp > ntp.wdc1.us.leaseweb.net.ntp: [bad udp cksum 0x7aab -> 0x9cd3!] NTPv4, length 48
     _re_src_dst_details = re.compile(r"(?P<SRC>\S+)\s+>\s+(?P<DST>\S+):\s+(?P<DETAILS>\S+.*\S+)")
 
-    def _parse_src_dst_details(self, line):
-        if self._regex_helper.search_compiled(Tcpdump._re_src_dst_details, line):
-            self.current_ret[str(self.packets_counter)]['source'] = self._regex_helper.group("SRC")
-            self.current_ret[str(self.packets_counter)]['destination'] = self._regex_helper.group("DST")
-            self.current_ret[str(self.packets_counter)]['details'] = self._regex_helper.group("DETAILS")
-            raise ParsingDone
+    def _parse_src_dst_details(self, match):
+        self.current_ret[str(self.packets_counter)]['source'] = match.group("SRC")
+        self.current_ret[str(self.packets_counter)]['destination'] = match.group("DST")
+        self.current_ret[str(self.packets_counter)]['details'] = match.group("DETAILS")
 
     # Root Delay: 0.000000, Root dispersion: 1.031906, Reference-ID: (unspec)
     _re_root_delay_root_dispersion_ref_id = re.compile(
         r"(?P<ROOT>Root Delay):\s+(?P<DELAY>\S+),\s+(?P<ROOT_2>Root dispersion):\s+(?P<DISPERSION>\S+),\s+(?P<REF>Reference-ID):\s+(?P<ID>\S+)")
 
-    def _parse_root_delay_root_dipersion_ref_id(self, line):
-        if self._regex_helper.search_compiled(Tcpdump._re_root_delay_root_dispersion_ref_id, line):
-            self.current_ret[str(self.packets_counter)][self._regex_helper.group("ROOT")] = self._regex_helper.group(
-                "DELAY")
-            self.current_ret[str(self.packets_counter)][self._regex_helper.group("ROOT_2")] = self._regex_helper.group(
-                "DISPERSION")
-            self.current_ret[str(self.packets_counter)][self._regex_helper.group("REF")] = self._regex_helper.group("ID")
-            raise ParsingDone
+    def _parse_root_delay_root_dipersion_ref_id(self, match):
+        self.current_ret[str(self.packets_counter)][match.group("ROOT")] = match.group(
+            "DELAY")
+        self.current_ret[str(self.packets_counter)][match.group("ROOT_2")] = match.group(
+            "DISPERSION")
+        self.current_ret[str(self.packets_counter)][match.group("REF")] = match.group("ID")
 
     # Reference Timestamp:  0.000000000
     _re_timestamp_header_details = re.compile(r"(?P<TIMESTAMP_HEADER>\S+.*\S+\s+Timestamp):\s+(?P<DETAILS>\S+.*\S+)")
 
-    def _parse_header_timestamp_details(self, line):
-        if self._regex_helper.search_compiled(Tcpdump._re_timestamp_header_details, line):
-            self.current_ret[str(self.packets_counter)][
-                self._regex_helper.group("TIMESTAMP_HEADER")] = self._regex_helper.group("DETAILS")
-            raise ParsingDone
+    def _parse_header_timestamp_details(self, match):
+        self.current_ret[str(self.packets_counter)][
+            match.group("TIMESTAMP_HEADER")] = match.group("DETAILS")
 
     # 5 packets received by filter
     _re_packets = re.compile(
         r"(?P<PCKT>\d+)\s+(?P<GROUP>packets captured|packets received by filter|packets dropped by kernel)")
 
-    def _parse_packets(self, line):
-        if self._regex_helper.search_compiled(Tcpdump._re_packets, line):
-            temp_pckt = self._regex_helper.group('PCKT')
-            temp_group = self._regex_helper.group('GROUP')
-            self.current_ret[temp_group] = temp_pckt
-            raise ParsingDone
+    def _parse_packets(self, match):
+        self._packet_parsed()
+        temp_pckt = match.group('PCKT')
+        temp_group = match.group('GROUP')
+        self.current_ret[temp_group] = temp_pckt
+
+    def _packet_parsed(self):
+        """
+        Pass the last packet into streams. Packet is complete when next packet or summary starts.
+
+        :return: None
+        """
+        if self.packets_counter > self._streamed_packets_counter:
+            self._streamed_packets_counter = self.packets_counter
+            packet = self.current_ret[str(self.packets_counter)]
+            if not self.keep_records:
+                del self.current_ret[str(self.packets_counter)]
+            self._record_parsed(packet)
+
+    def _inside_packet(self):
+        return self.packets_counter > 0
+
+    _line_rules = [
+        LineRule(_re_port_linktype_capture_size, _parse_port_linktype_capture_size),
+        LineRule(_re_timestamp_src_dst_details, _parse_timestamp_src_dst_details),
+        LineRule(_re_timestamp_tos_ttl_id_offset_flags_proto_length,
+                 _parse_timestamp_tos_ttl_id_offset_flags_proto_length),
+        LineRule(_re_src_dst_details, _parse_src_dst_details, guard=_inside_packet),
+        LineRule(_re_root_delay_root_dispersion_ref_id, _parse_root_delay_root_dipersion_ref_id, guard=_inside_packet),
+        LineRule(_re_timestamp_header_details, _parse_header_timestamp_details, literal="Timestamp",
+                 guard=_inside_packet),
+        LineRule(_re_packets, _parse_packets, literal="packets"),
+    ]
 
 
 COMMAND_OUTPUT = """
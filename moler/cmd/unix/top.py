@@ -12,9 +12,12 @@ import re
 from moler.cmd.unix.genericunix import GenericUnixCommand
 from moler.exceptions import CommandFailure
 from moler.exceptions import ParsingDone
+from moler.parser.table_text import TableText
 
 
 class Top(GenericUnixCommand):
+    _tables_keys = ("processes",)  # see columnar_result of CommandTextualGeneric
+
     def __init__(self, connection, options=None, prompt=None, newline_chars=None, runner=None):
         """
         Top command.
@@ -27,6 +30,7 @@ class Top(GenericUnixCommand):
         super(Top, self).__init__(connection=connection, prompt=prompt, newline_chars=newline_chars, runner=runner)
         self.options = options
         self._processes_list_headers = list()
+        self._processes_list_parser = None
         self.current_ret = dict()
 
     def build_command_string(self):
@@ -51,12 +55,12 @@ class Top(GenericUnixCommand):
         if is_full_line:
             try:
                 self._command_failure(line)
+                self._parse_processes_list(line)
                 self._parse_top_row(line)
                 self._parse_task_row(line)
                 self._parse_cpu_row(line)
                 self._parse_memory_rows(line)
                 self._parse_processes_list_headers(line)
-                self._parse_processes_list(line)
             except ParsingDone:
                 pass
         return super(Top, self).on_new_line(line, is_full_line)
@@ -168,6 +172,12 @@ class Top(GenericUnixCommand):
         """
         if self._regex_helper.search_compiled(Top._re_processes_header, line) and not self._processes_list_headers:
             self._processes_list_headers.extend(line.strip().split())
+            converters = dict((header, self._if_number_convert_to_int_or_float)
+                              for header in self._processes_list_headers)
+            self._processes_list_parser = TableText([re.escape(header) for header in self._processes_list_headers],
+                                                    self._processes_list_headers, converters=converters,
+                                                    last_column_free_text=True)
+            self._processes_list_parser.parse(line)
             self.current_ret.update({'processes': list()})
             raise ParsingDone
 
@@ -177,11 +187,11 @@ class Top(GenericUnixCommand):
         :param line: Line of output of command.
         :return: Nothing but raises ParsingDone if line has information to handle by this method.
         """
-        if self._processes_list_headers:
-            processes_info = line.strip().split()
-            processes_info = [self._if_number_convert_to_int_or_float(process_info) for process_info in processes_info]
-            processes_dict = dict(zip(self._processes_list_headers, processes_info))
-            self.current_ret['processes'].append(processes_dict)
+        if self._processes_list_parser:
+            processes_dict = self._processes_list_parser.parse(line)
+            if processes_dict is not None:
+                self.current_ret['processes'].append(processes_dict)
+            raise ParsingDone
 
     def _if_number_convert_to_int_or_float(self, inscription):
         """
@@ -8,6 +8,7 @@ import datetime
 
 from moler.cmd.unix.genericunix import GenericUnixCommand
 from moler.exceptions import ParsingDone
+from moler.parser.table_text import TableText
 
 
 class W(GenericUnixCommand):
@@ -31,6 +32,7 @@ class W(GenericUnixCommand):
         self.current_ret['GENERAL_INFO'] = dict()
         self.current_ret['RESULT'] = list()
         self.headers = list()
+        self._table_parser = None
 
     # -hs -h -sh
     _re_h = re.compile(r"(?P<BEGINNING>-h)\S|(?P<SOLO>-h)|(?P<MIDDLE>h)")
@@ -118,24 +120,13 @@ class W(GenericUnixCommand):
             if not self.headers:
                 for value in re.findall(W._re_header, line):
                     self.headers.append(value[0])
+                self._table_parser = TableText([re.escape(header) for header in self.headers], self.headers,
+                                               convert_values=False, last_column_free_text=True)
+                self._table_parser.parse(line)
                 raise ParsingDone
             else:
-                # Dictionary which is going to be appended to the returned list
-                ret = dict()
-                # List of entries
-                _entries = list()
-                # List of values in WHAT entry
-                _what_entry = list()
-                for value in re.findall(W._re_header, line):
-                    _entries.append(value[0])
-                for what_index in range(len(self.headers) - 1, len(_entries)):
-                    _what_entry.append(_entries[what_index])
-                _what_entry_string = ' '.join(_what_entry)
-                for index in range(len(self.headers)):
-                    if index < len(self.headers) - 1:
-                        ret.update({self.headers[index]: _entries[index]})
-                    else:
-                        ret.update({self.headers[index]: _what_entry_string})
+                # Dictionary which is going to be appended to the returned list, WHAT entry may contain spaces
+                ret = self._table_parser.parse(line)
                 self.current_ret['RESULT'].append(ret)
                 raise ParsingDone
 
@@ -34,6 +34,8 @@ class Command(ConnectionObserver):
         super(Command, self).__init__(connection=connection, runner=runner)
         self.command_string = None
         self.cmd_name = Command.observer_name
+        self.priority = 0  # Commands waiting in connection queue with higher priority are started first. Within the
+        #                    same priority command with the earliest deadline (start_time + timeout) is started first.
 
     def __str__(self):
         cmd_str = self.command_string if self.command_string else '<EMPTY COMMAND STRING>'
@@ -4,11 +4,12 @@ __author__ = 'Marcin Usielski'
 __copyright__ = 'Copyright (C) 2019, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
+import heapq
+import itertools
+import logging
 import threading
 import time
-import logging
 from moler.exceptions import CommandTimeout
-from threading import Thread
 
 
 class CommandScheduler(object):
@@ -16,8 +17,8 @@ class CommandScheduler(object):
     @staticmethod
     def enqueue_starting_on_connection(connection_observer):
         """
-        Waits for free slot and runs command when no other command is in run mode. If connection_observer is not
-         a command then runs immediately.
+        Runs command when no other command is in run mode or puts it into queue of connection. If connection_observer
+         is not a command then runs immediately.
         :param connection_observer: Object of ConnectionObserver to run. Maybe a command or an observer.
         :return: Nothing
         """
@@ -25,13 +26,8 @@ class CommandScheduler(object):
         if not connection_observer.is_command():  # Passed observer, not command.
             scheduler._submit(connection_observer)
             return
-        if scheduler._add_command_to_connection(cmd=connection_observer, wait_for_slot=False):
-            #  We have a free slot available
-            return
-        # We have to wait to finish other command(s) so let's do it in another thread.
-        t1 = Thread(target=scheduler._add_command_to_connection, args=(connection_observer, True))
-        t1.setDaemon(True)
-        t1.start()
+        # If there is no free slot command waits in queue. Slot is passed to command when previous one is removed.
+        scheduler._add_command_to_connection(cmd=connection_observer)
 
     @staticmethod
     def dequeue_running_on_connection(connection_observer):
@@ -58,6 +54,19 @@ class CommandScheduler(object):
             return scheduler._does_it_wait_in_queue(cmd=connection_observer)
         return False
 
+    @staticmethod
+    def get_queue_wait_statistics(connection):
+        """
+        Returns statistics of time commands waited in queue of connection before they got slot.
+
+        :param connection: connection commands are run on.
+        :return: dict with keys: 'started' (number of commands which got slot), 'queued' (how many of them waited in
+         queue), 'timed_out_in_queue' (commands which timed out before they got slot), 'wait_time_total',
+         'wait_time_max' and 'wait_time_avg' (in seconds, counted for all started commands).
+        """
+        scheduler = CommandScheduler._get_scheduler()
+        return scheduler._queue_wait_statistics(connection=connection)
+
     # internal methods and variables
 
     _conn_lock = threading.Lock()
@@ -67,6 +76,11 @@ class CommandScheduler(object):
         with CommandScheduler._conn_lock:
             if CommandScheduler._scheduler is None:
                 self._locks = dict()
+                self._queue_timeouts = list()  # heap of (deadline, sequence_nb, cmd) of commands waiting in queues
+                self._queue_timeouts_condition = threading.Condition()
+                self._sequence = itertools.count()  # to avoid comparing commands for equal deadlines
+                self._slot_handovers = list()  # commands which got slot and wait to be submitted by scheduler thread
+                self._queue_timeouts_thread = None
                 CommandScheduler._scheduler = self
 
     @staticmethod
@@ -75,32 +89,29 @@ class CommandScheduler(object):
             CommandScheduler()
         return CommandScheduler._scheduler
 
-    def _add_command_to_connection(self, cmd, wait_for_slot=True):
+    def _add_command_to_connection(self, cmd):
         """
-        Adds command to execute on connection.
+        Adds command to execute on connection. If there is no free slot then command is put into queue of connection.
         :param cmd: Command object to add to connection
-        :param wait_for_slot: If True then waits till command timeout or there is free slot to execute command. If False
-        then returns immediately regardless there is free slot or not.
-        :return: True if command was marked as current executed, False if command cannot be set as current executed.
+        :return: True if command was marked as current executed, False if command was put into queue.
         """
-        if self._add_command_to_execute(cmd=cmd):
+        connection = cmd.connection
+        lock = self._lock_for_connection(connection)
+        conn_atr = self._locks[connection]
+        with lock:
+            if conn_atr['current_cmd'] is None:
+                conn_atr['current_cmd'] = cmd
+                self._update_wait_statistics(conn_atr, wait_time=0)
+                is_current = True
+            else:
+                conn_atr['queue'].append(cmd)
+                conn_atr['enqueue_times'][cmd] = time.time()
+                is_current = False
+        if is_current:
             self._submit(cmd)
-            return True
         else:
-            if wait_for_slot:
-                self._add_command_to_queue(cmd=cmd)
-                start_time = cmd.start_time
-                if self._wait_for_slot_for_command(cmd=cmd):
-                    self._submit(connection_observer=cmd)
-                    return True
-                # If we are here it means command timeout before it really starts.
-                cmd.set_exception(CommandTimeout(cmd,
-                                                 timeout=cmd.timeout,
-                                                 kind="scheduler.await_done",
-                                                 passed_time=time.time() - start_time))
-                cmd.set_end_of_life()
-                self._remove_command(cmd=cmd)
-        return False
+            self._watch_queue_timeout(cmd)
+        return is_current
 
     def _lock_for_connection(self, connection):
         """
@@ -122,76 +133,92 @@ class CommandScheduler(object):
         ret['lock'] = threading.Lock()
         ret['queue'] = list()
         ret['current_cmd'] = None
+        ret['enqueue_times'] = dict()  # cmd -> time when command was put into queue
+        ret['stats'] = {'started': 0, 'queued': 0, 'timed_out_in_queue': 0, 'wait_time_total': 0.0,
+                        'wait_time_max': 0.0}
         return ret
 
-    def _wait_for_slot_for_command(self, cmd):
-        """
-        Waits for free slot for the command.
-        :param cmd: Command object.
-        :return: True if command was marked as ready to execute, False if timeout.
-        """
-        connection = cmd.connection
-        lock = self._lock_for_connection(connection)
-        start_time = time.time()
-        conn_atr = self._locks[connection]
-        while cmd.timeout >= (time.time() - start_time):
-            time.sleep(0.005)
-            with lock:
-                if conn_atr['current_cmd'] is None and len(conn_atr['queue']) >= 1 and cmd == conn_atr['queue'][0]:
-                    conn_atr['queue'].pop(0)
-                    conn_atr['current_cmd'] = cmd
-                    cmd._log(logging.DEBUG,
-                             ">'{}': added  added cmd ('{}') from queue.".format(
-                                 cmd.connection.name, cmd))
-                    return True
-        return False
-
     def _remove_command(self, cmd):
         """
         Removes command object from queue and/or current executed. It is safe to call this method many times for the
-         same command object.
+         same command object. If command was current executed then slot is passed to the first command from queue.
         :param cmd: Command object
         :return: Nothing.
         """
         connection = cmd.connection
         lock = self._lock_for_connection(connection)
         conn_atr = self._locks[connection]
+        next_cmd = None
         with lock:
             if cmd == conn_atr['current_cmd']:
                 conn_atr['current_cmd'] = None
+                next_cmd = self._take_next_from_queue(conn_atr)
             try:
                 queue = conn_atr['queue']
                 index = queue.index(cmd)
                 queue.pop(index)
             except ValueError:  # command object does not exist in the list
                 pass
+            conn_atr['enqueue_times'].pop(cmd, None)
+        if next_cmd is not None:
+            next_cmd._log(logging.DEBUG,
+                          ">'{}': added  added cmd ('{}') from queue.".format(next_cmd.connection.name, next_cmd))
+            self._hand_over_slot(next_cmd)
 
-    def _add_command_to_execute(self, cmd):
+    def _take_next_from_queue(self, conn_atr):
         """
-        Tries to mark command object as current in run mode .
-        :param cmd: Command object.
-        :return: True if command object was marked as current run, False otherwise.
+        Marks the most urgent not done command from queue as current executed. Command with the highest priority
+         is taken first, within the same priority command with the earliest deadline, then the first queued one.
+         Call it holding lock of connection.
+        :param conn_atr: dict of connection.
+        :return: Command object or None if queue is empty.
         """
-        connection = cmd.connection
-        lock = self._lock_for_connection(connection)
-        conn_atr = self._locks[connection]
-        with lock:
-            if conn_atr['current_cmd'] is None:
-                conn_atr['current_cmd'] = cmd
-                return True
-        return False
+        queue = conn_atr['queue']
+        enqueue_times = conn_atr['enqueue_times']
+        for cmd in [cmd for cmd in queue if cmd.done()]:
+            queue.remove(cmd)
+            enqueue_times.pop(cmd, None)
+        if not queue:
+            return None
+        index = min(range(len(queue)), key=lambda i: self._urgency(queue[i], i))
+        cmd = queue.pop(index)
+        conn_atr['current_cmd'] = cmd
+        enqueue_time = enqueue_times.pop(cmd, None)
+        if enqueue_time is not None:
+            self._update_wait_statistics(conn_atr, wait_time=time.time() - enqueue_time)
+        return cmd
 
-    def _add_command_to_queue(self, cmd):
+    @staticmethod
+    def _urgency(cmd, index):
         """
-        Adds command object to queue fot connection of command.
+        Returns key to sort commands waiting in queue. The smaller key the sooner command gets slot.
         :param cmd: Command object.
+        :param index: position of command in queue.
+        :return: tuple (negated priority, deadline, position in queue).
+        """
+        return -getattr(cmd, 'priority', 0), cmd.start_time + cmd.timeout, index
+
+    def _update_wait_statistics(self, conn_atr, wait_time):
+        """
+        Updates statistics of waiting in queue. Call it holding lock of connection.
+        :param conn_atr: dict of connection.
+        :param wait_time: time command waited for slot.
         :return: Nothing.
         """
-        connection = cmd.connection
+        stats = conn_atr['stats']
+        stats['started'] += 1
+        if wait_time > 0:
+            stats['queued'] += 1
+            stats['wait_time_total'] += wait_time
+            stats['wait_time_max'] = max(stats['wait_time_max'], wait_time)
+
+    def _queue_wait_statistics(self, connection):
         lock = self._lock_for_connection(connection)
         conn_atr = self._locks[connection]
         with lock:
-            conn_atr['queue'].append(cmd)
+            stats = dict(conn_atr['stats'])
+        stats['wait_time_avg'] = stats['wait_time_total'] / stats['started'] if stats['started'] else 0.0
+        return stats
 
     def _does_it_wait_in_queue(self, cmd):
         connection = cmd.connection
@@ -202,6 +229,101 @@ class CommandScheduler(object):
                 return True
         return False
 
+    def _watch_queue_timeout(self, cmd):
+        """
+        Adds command waiting in queue to commands checked for timeout.
+        :param cmd: Command object.
+        :return: Nothing.
+        """
+        with self._queue_timeouts_condition:
+            heapq.heappush(self._queue_timeouts, (cmd.start_time + cmd.timeout, next(self._sequence), cmd))
+            self._start_scheduler_thread()
+            self._queue_timeouts_condition.notify()
+
+    def _hand_over_slot(self, cmd):
+        """
+        Passes command which got slot of connection to scheduler thread to submit it into runner. Slot is freed inside
+         done path of previous command (usually in connection's thread, holding lock of previous command) so next
+         command must not be sent from there.
+        :param cmd: Command object.
+        :return: Nothing.
+        """
+        with self._queue_timeouts_condition:
+            self._slot_handovers.append(cmd)
+            self._start_scheduler_thread()
+            self._queue_timeouts_condition.notify()
+
+    def _start_scheduler_thread(self):
+        """
+        Starts scheduler thread if not running yet. Call it holding _queue_timeouts_condition.
+        :return: Nothing.
+        """
+        if self._queue_timeouts_thread is None:
+            self._queue_timeouts_thread = threading.Thread(target=self._queue_timeouts_loop,
+                                                           name="CommandSchedulerTimeouts")
+            self._queue_timeouts_thread.daemon = True
+            self._queue_timeouts_thread.start()
+
+    def _queue_timeouts_loop(self):
+        """
+        Single thread serving timeouts of all commands waiting in queues and submitting commands which got slot.
+         Sleeps till the nearest deadline or till slot is handed over.
+        :return: Nothing.
+        """
+        while True:
+            with self._queue_timeouts_condition:
+                expired = list()
+                while not expired and not self._slot_handovers:
+                    now = time.time()
+                    while self._queue_timeouts and self._queue_timeouts[0][0] <= now:
+                        expired.append(heapq.heappop(self._queue_timeouts)[2])
+                    if not expired and not self._slot_handovers:
+                        wait_time = (self._queue_timeouts[0][0] - now) if self._queue_timeouts else None
+                        self._queue_timeouts_condition.wait(wait_time)
+                handovers, self._slot_handovers = self._slot_handovers, list()
+            for cmd in handovers:
+                self._submit_handed_over(cmd)
+            for cmd in expired:
+                self._timeout_in_queue(cmd)
+
+    def _submit_handed_over(self, cmd):
+        """
+        Submits command which got slot. If submitting fails (like sending over closed connection) then exception is
+         set on that command (what frees slot for next one).
+        :param cmd: Command object.
+        :return: Nothing.
+        """
+        try:
+            self._submit(connection_observer=cmd)
+        except Exception as exc:
+            cmd._log(logging.WARNING, "'{}' failed to start: {!r}".format(cmd, exc))
+            if not cmd.done():
+                cmd._set_exception_without_done(exc)  # command was not sent so there is no prompt to await
+                cmd._is_done = True
+
+    def _timeout_in_queue(self, cmd):
+        """
+        Sets timeout of command if it still waits in queue.
+        :param cmd: Command object.
+        :return: Nothing.
+        """
+        if not self._does_it_wait_in_queue(cmd=cmd):
+            return  # command got slot or is already done
+        passed_time = time.time() - cmd.start_time
+        if passed_time < cmd.timeout:
+            self._watch_queue_timeout(cmd)  # timeout was extended while command was waiting in queue
+            return
+        # If we are here it means command timeout before it really starts.
+        lock = self._lock_for_connection(cmd.connection)
+        with lock:
+            self._locks[cmd.connection]['stats']['timed_out_in_queue'] += 1
+        cmd.set_exception(CommandTimeout(cmd,
+                                         timeout=cmd.timeout,
+                                         kind="scheduler.await_done",
+                                         passed_time=passed_time))
+        cmd.set_end_of_life()
+        self._remove_command(cmd=cmd)
+
     def _submit(self, connection_observer):
         """
         Submits a connection_observer object (command or observer) in the runner.
@@ -126,11 +126,14 @@ def load_device_from_config(config):
 
         for device_name in config['DEVICES']:
             device_def = config['DEVICES'][device_name]
+            connection_hops = {'CONNECTION_HOPS': device_def.get('CONNECTION_HOPS', {})}
+            if 'RESULT_STORAGE' in device_def:
+                connection_hops['RESULT_STORAGE'] = device_def['RESULT_STORAGE']
             dev_cfg.define_device(
                 name=device_name,
                 device_class=device_def['DEVICE_CLASS'],
                 connection_desc=device_def.get('CONNECTION_DESC', dev_cfg.default_connection),
-                connection_hops={'CONNECTION_HOPS': device_def.get('CONNECTION_HOPS', {})},
+                connection_hops=connection_hops,
                 initial_state=device_def.get('INITIAL_STATE', None),
             )
 
@@ -148,6 +151,9 @@ def load_logger_from_config(config):
         if 'RAW_LOG' in config['LOGGER']:
             if config['LOGGER']['RAW_LOG'] is True:
                 log_cfg.raw_logs_active = True
+        if 'ASYNC_LOG' in config['LOGGER']:
+            if config['LOGGER']['ASYNC_LOG'] is True:
+                log_cfg.async_logs_active = True
         if 'DEBUG_LEVEL' in config['LOGGER']:
             log_cfg.configure_debug_level(level=config['LOGGER']['DEBUG_LEVEL'])
         if 'DATE_FORMAT' in config['LOGGER']:
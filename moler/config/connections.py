@@ -117,6 +117,7 @@ def _register_builtin_connections(connection_factory, moler_conn_class):
 
 def _register_python3_builtin_connections(connection_factory, moler_conn_class):
     from moler.io.asyncio.tcp import AsyncioTcp, AsyncioInThreadTcp
+    from moler.io.raw.tcp import ReactorTcp
 
     def tcp_asyncio_conn(port, host='localhost', name=None, **kwargs):  # kwargs to pass  receive_buffer_size and logger
         mlr_conn = mlr_conn_utf8(moler_conn_class, name=name)
@@ -130,6 +131,12 @@ def _register_python3_builtin_connections(connection_factory, moler_conn_class):
                                      port=port, host=host, **kwargs)  # TODO: add name
         return io_conn
 
+    def tcp_reactor_conn(port, host='localhost', name=None, **kwargs):  # kwargs to pass  receive_buffer_size and logger
+        mlr_conn = mlr_conn_utf8(moler_conn_class, name=name)
+        io_conn = ReactorTcp(moler_connection=mlr_conn,
+                             port=port, host=host, **kwargs)
+        return io_conn
+
     # TODO: unify passing logger to io_conn (logger/logger_name - see above comments)
     connection_factory.register_construction(io_type="tcp",
                                              variant="asyncio",
@@ -137,6 +144,9 @@ def _register_python3_builtin_connections(connection_factory, moler_conn_class):
     connection_factory.register_construction(io_type="tcp",
                                              variant="asyncio-in-thread",
                                              constructor=tcp_asyncio_in_thrd_conn)
+    connection_factory.register_construction(io_type="tcp",
+                                             variant="reactor",
+                                             constructor=tcp_reactor_conn)
 
 
 def _register_builtin_unix_connections(connection_factory, moler_conn_class):
@@ -156,6 +166,7 @@ def _register_builtin_unix_connections(connection_factory, moler_conn_class):
 
 def _register_builtin_py3_unix_connections(connection_factory, moler_conn_class):
     from moler.io.asyncio.terminal import AsyncioTerminal, AsyncioInThreadTerminal
+    from moler.io.raw.terminal import ReactorTerminal
 
     def terminal_asyncio_conn(name=None):
         mlr_conn = mlr_conn_utf8(moler_conn_class, name=name)
@@ -167,6 +178,12 @@ def _register_builtin_py3_unix_connections(connection_factory, moler_conn_class)
         io_conn = AsyncioInThreadTerminal(moler_connection=mlr_conn)  # TODO: add name, logger
         return io_conn
 
+    def terminal_reactor_conn(name=None):
+        # ReactorTerminal works on unicode so moler_connection must do no encoding
+        mlr_conn = mlr_conn_no_encoding(moler_conn_class, name=name)
+        io_conn = ReactorTerminal(moler_connection=mlr_conn)
+        return io_conn
+
     # TODO: unify passing logger to io_conn (logger/logger_name)
     connection_factory.register_construction(io_type="terminal",
                                              variant="asyncio",
@@ -174,3 +191,6 @@ def _register_builtin_py3_unix_connections(connection_factory, moler_conn_class)
     connection_factory.register_construction(io_type="terminal",
                                              variant="asyncio-in-thread",
                                              constructor=terminal_asyncio_in_thrd_conn)
+    connection_factory.register_construction(io_type="terminal",
+                                             variant="reactor",
+                                             constructor=terminal_reactor_conn)
@@ -7,10 +7,13 @@ __author__ = 'Grzegorz Latuszek, Marcin Usielski, Michal Ernst'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
+import atexit
 import codecs
+import collections
 import logging
 import os
 import sys
+import threading
 
 logging_path = os.getcwd()  # Logging path that is used as a prefix for log file paths
 active_loggers = []  # TODO: use set()      # Active loggers created by Moler
@@ -24,6 +27,7 @@ TEST_CASE = 45
 
 debug_level = None  # means: inactive
 raw_logs_active = False
+async_logs_active = False  # if True then file handlers write records inside background writer thread
 write_mode = "a"
 
 
@@ -74,6 +78,10 @@ def want_raw_logs():
     return raw_logs_active
 
 
+def want_async_logs():
+    return async_logs_active
+
+
 def debug_level_or_info_level():
     """
     If debugging is active we want to have details inside logs
@@ -103,7 +111,7 @@ def setup_new_file_handler(logger_name, log_level, log_filename, formatter, filt
     cfh.setFormatter(formatter)
     if filter:
         cfh.addFilter(filter)
-    logger.addHandler(cfh)
+    _add_handler(logger, cfh)
     return cfh
 
 
@@ -141,7 +149,7 @@ def _add_raw_file_handler(logger_name, log_file):
     _prepare_logs_folder(logfile_full_path)
     logger = logging.getLogger(logger_name)
     rfh = RawFileHandler(filename=logfile_full_path, mode='{}b'.format(write_mode))
-    logger.addHandler(rfh)
+    _add_handler(logger, rfh)
 
 
 def _add_raw_trace_file_handler(logger_name, log_file):
@@ -159,7 +167,28 @@ def _add_raw_trace_file_handler(logger_name, log_file):
     # exchange Formatter
     raw_trace_formatter = RawTraceFormatter()
     trace_rfh.setFormatter(raw_trace_formatter)
-    logger.addHandler(trace_rfh)
+    _add_handler(logger, trace_rfh)
+
+
+def _add_handler(logger, handler):
+    """
+    Add handler into Logger. In async logs mode handler is wrapped to write records inside background writer thread.
+    :param logger: Logger object
+    :param handler: Handler object
+    :return: None
+    """
+    if want_async_logs():
+        handler = AsyncHandler(target=handler)
+    logger.addHandler(handler)
+
+
+def flush_async_logs(timeout=None):
+    """
+    Wait till all records logged so far in async logs mode are written and flushed.
+    :param timeout: max time to wait (None means wait till done)
+    :return: None
+    """
+    _async_log_writer.flush(timeout=timeout)
 
 
 def create_logger(name,
@@ -339,6 +368,7 @@ class RawFileHandler(logging.FileHandler):
     def __init__(self, *args, **kwargs):
         """RawFileHandler must use RawDataFormatter and level == RAW_DATA only"""
         super(RawFileHandler, self).__init__(*args, **kwargs)
+        self.flush_each_record = True
         raw_formatter = RawDataFormatter()
         self.setFormatter(raw_formatter)
         self.setLevel(RAW_DATA)
@@ -358,11 +388,121 @@ class RawFileHandler(logging.FileHandler):
             msg = self.format(record)
             stream = self.stream
             stream.write(msg)
-            self.flush()
+            if self.flush_each_record:
+                self.flush()
         except Exception:
             self.handleError(record)
 
 
+class AsyncHandler(logging.Handler):
+    """
+    Handler passing records to background writer thread which emits them by target handler.
+    Logging thread (like connection reading thread) only puts record into queue, formatting and writing into file
+    is done by writer thread. Writer flushes target handlers after each batch of records.
+    """
+
+    def __init__(self, target, writer=None):
+        """
+        :param target: Handler doing real output
+        :param writer: AsyncLogWriter object (common writer if None)
+        """
+        super(AsyncHandler, self).__init__(level=target.level)
+        self.target = target
+        self.filters = target.filters  # filter in logging thread to not queue records target would drop
+        self.writer = writer if writer is not None else _async_log_writer
+        if hasattr(target, 'flush_each_record'):
+            target.flush_each_record = False  # writer flushes once per batch
+
+    def emit(self, record):
+        self.writer.put(self.target, record)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.flush()
+        self.target.close()
+        super(AsyncHandler, self).close()
+
+
+class AsyncLogWriter(object):
+    """
+    Background thread writing log records of AsyncHandlers.
+    Records are put into deque (appending is thread safe without lock) and writer takes them in batches.
+    """
+
+    def __init__(self, flush_interval=0.1):
+        """
+        :param flush_interval: max time (in seconds) record waits in queue before it is written and flushed
+        """
+        self.flush_interval = flush_interval
+        self._records = collections.deque()  # (handler, record) or (None, event set when all before are written)
+        self._wakeup = threading.Event()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    def put(self, handler, record):
+        self._records.append((handler, record))
+        if self._thread is None:
+            self._start()
+
+    def flush(self, timeout=None):
+        """Wait till records put before are written and flushed."""
+        written = threading.Event()
+        self._records.append((None, written))
+        if self._thread is not None and self._thread.is_alive():
+            self._wakeup.set()
+            written.wait(timeout)
+        else:
+            self._write_records()  # no writer thread (not started or stopped) - write in calling thread
+
+    def stop(self):
+        """Stop writer thread writing all records queued so far."""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._write_records()
+
+    def _start(self):
+        with self._thread_lock:
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._loop, name="MolerLogWriter")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _loop(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._write_records()
+
+    def _write_records(self):
+        handlers = set()
+        while True:
+            try:
+                handler, record = self._records.popleft()
+            except IndexError:
+                break
+            if handler is None:
+                self._flush_handlers(handlers)
+                record.set()
+                continue
+            handler.handle(record)
+            handlers.add(handler)
+        self._flush_handlers(handlers)
+
+    @staticmethod
+    def _flush_handlers(handlers):
+        for handler in handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+        handlers.clear()
+
+
 class MultilineWithDirectionFormatter(logging.Formatter):
     """
     We want logs to have non-overlapping areas
@@ -458,7 +598,10 @@ class SpecificLevelFilter(object):
         return logRecord.levelno == self.__level
 
 
+_async_log_writer = AsyncLogWriter()
+
 # actions during import:
+atexit.register(_async_log_writer.stop)
 logging.addLevelName(TRACE, "TRACE")
 logging.addLevelName(RAW_DATA, "RAW_DATA")
 logging.addLevelName(TEST_CASE, "TEST_CASE")
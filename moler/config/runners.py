@@ -32,12 +32,24 @@ def register_builtin_runners(runner_factory):
 
 def _register_builtin_runners(runner_factory):
     from moler.runner import ThreadPoolExecutorRunner
+    from moler.runner_single_thread import RunnerSingleThread
+    from moler.runner_inline import InlineRunner
 
     def thd_runner(executor=None):
         runner = ThreadPoolExecutorRunner(executor=executor)
         return runner
 
+    def single_thd_runner():
+        runner = RunnerSingleThread()
+        return runner
+
+    def inline_runner():
+        runner = InlineRunner()
+        return runner
+
     runner_factory.register_construction(variant="threaded", constructor=thd_runner)
+    runner_factory.register_construction(variant="single-thread", constructor=single_thd_runner)
+    runner_factory.register_construction(variant="inline", constructor=inline_runner)
 
 
 def _register_python3_builtin_runners(runner_factory):
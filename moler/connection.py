@@ -24,7 +24,13 @@ import moler.config.connections as connection_cfg
 from moler.config.loggers import RAW_DATA, TRACE
 from moler.exceptions import WrongUsage
 from moler.helpers import instance_id
-from moler.util.loghelper import log_into_logger
+from moler.helpers import split_into_lines
+from moler.util.loghelper import log_into_logger, is_level_logged
+
+
+def _encode_utf8(data):
+    """Encoder passed with log records of data (raw logs need bytes)."""
+    return data.encode('utf-8')
 
 
 def identity_transformation(data):
@@ -129,19 +135,22 @@ class Connection(object):
             length = len(data)
             msg = "*" * length
 
-        self._log_data(msg=msg, level=logging.INFO,
-                       extra={'transfer_direction': '>', 'encoder': lambda data: data.encode('utf-8')})
-        self._log(level=logging.INFO,
-                  msg=Connection._strip_data(msg),
-                  extra={
-                      'transfer_direction': '>',
-                      'log_name': self.name
-                  },
-                  levels_to_go_up=levels_to_go_up)
-
-        encoded_msg = self.encode(msg)
-        self._log_data(msg=encoded_msg, level=RAW_DATA,
-                       extra={'transfer_direction': '>', 'encoder': lambda data: data.encode('utf-8')})
+        if is_level_logged(self.data_logger, logging.INFO):
+            self._log_data(msg=msg, level=logging.INFO,
+                           extra={'transfer_direction': '>', 'encoder': _encode_utf8})
+        if is_level_logged(self.logger, logging.INFO):
+            self._log(level=logging.INFO,
+                      msg=Connection._strip_data(msg),
+                      extra={
+                          'transfer_direction': '>',
+                          'log_name': self.name
+                      },
+                      levels_to_go_up=levels_to_go_up)
+
+        if is_level_logged(self.data_logger, RAW_DATA):
+            encoded_msg = self.encode(msg)
+            self._log_data(msg=encoded_msg, level=RAW_DATA,
+                           extra={'transfer_direction': '>', 'encoder': _encode_utf8})
 
         encoded_data = self.encode(data)
         self.how2send(encoded_data)
@@ -196,7 +205,7 @@ class Connection(object):
             print(err)  # logging errors should not propagate
 
     def _log(self, level, msg, extra=None, levels_to_go_up=1):
-        if self.logger:
+        if is_level_logged(self.logger, level):
             extra_params = {
                 'log_name': self.name
             }
@@ -220,8 +229,10 @@ class ObservableConnection(Connection):
         # handle that data
     """
 
+    _lines_newline_chars = ("\n", "\r")  # New line chars used when connection splits data into lines
+
     def __init__(self, how2send=None, encoder=identity_transformation, decoder=identity_transformation,
-                 name=None, newline='\n', logger_name=""):
+                 name=None, newline='\n', logger_name="", dispatch_lines=False):
         """
         Create Connection via registering external-IO
 
@@ -230,6 +241,8 @@ class ObservableConnection(Connection):
         :param decoder: callable restoring data from bytes
         :param name: name assigned to connection
         :param logger_name: take that logger from logging
+        :param dispatch_lines: if True then received data is split into lines only once and these lines are shared
+         by all textual observers (see received_lines())
 
         Logger is retrieved by logging.getLogger(logger_name)
         If logger_name == "" - take logger "moler.connection.<name>"
@@ -239,21 +252,46 @@ class ObservableConnection(Connection):
                                                    logger_name=logger_name)
         self._observers = dict()
         self._observers_lock = Lock()
+        self.dispatch_lines = dispatch_lines
+        self._received_lines = (None, None)  # last decoded data and its lines
 
     def data_received(self, data):
         """
         Incoming-IO API:
         external-IO should call this method when data is received
         """
-        self._log_data(msg=data, level=RAW_DATA,
-                       extra={'transfer_direction': '<', 'encoder': lambda data: data.encode('utf-8')})
+        data_logger = self.data_logger
+        if is_level_logged(data_logger, RAW_DATA):
+            self._log_data(msg=data, level=RAW_DATA,
+                           extra={'transfer_direction': '<', 'encoder': _encode_utf8})
 
         decoded_data = self.decode(data)
-        self._log_data(msg=decoded_data, level=logging.INFO,
-                       extra={'transfer_direction': '<', 'encoder': lambda data: data.encode('utf-8')})
-
+        if is_level_logged(data_logger, logging.INFO):
+            self._log_data(msg=decoded_data, level=logging.INFO,
+                           extra={'transfer_direction': '<', 'encoder': _encode_utf8})
+
+        if self.dispatch_lines and isinstance(decoded_data, six.string_types):
+            # one split for all observers, they get lines via received_lines()
+            self._received_lines = (decoded_data,
+                                    split_into_lines(decoded_data, ObservableConnection._lines_newline_chars))
         self.notify_observers(decoded_data)
 
+    def received_lines(self, data, newline_chars=_lines_newline_chars):
+        """
+        Split data passed to observer into lines.
+
+        If connection dispatches lines and data is the one just notified to observers then lines are not split
+        again but taken from connection - the same lines are shared by all observers.
+
+        :param data: data passed to observer
+        :param newline_chars: new line chars used by observer
+        :return: list of tuples (line, is_full_line), line keeps its new line chars
+        """
+        received_data, lines = self._received_lines
+        if (received_data is data) and (newline_chars == ObservableConnection._lines_newline_chars):
+            return lines
+        return split_into_lines(data, newline_chars)
+
     def subscribe(self, observer):
         """
         Subscribe for 'data-received notification'
@@ -284,9 +322,11 @@ class ObservableConnection(Connection):
         """Notify all subscribed observers about data received on connection"""
         # need copy since calling subscribers may change self._observers
         current_subscribers = list(self._observers.values())
+        trace_notifications = is_level_logged(self.logger, TRACE)
         for self_or_none, observer_function in current_subscribers:
             try:
-                self._log(level=TRACE, msg=r'notifying {}({!r})'.format(observer_function, repr(data)))
+                if trace_notifications:
+                    self._log(level=TRACE, msg=r'notifying {}({!r})'.format(observer_function, repr(data)))
                 try:
                     if self_or_none is None:
                         observer_function(data)
@@ -59,6 +59,8 @@ class ConnectionObserver(object):
         #                              during normal timeout. For Runners only!
         self.was_on_timeout_called = False  # Set True if method on_timeout was called. False otherwise. For Runners
         #                                     only!
+        self._done_callbacks = list()  # callables called once when observer becomes done
+        self._done_callbacks_lock = threading.Lock()
 
     def __str__(self):
         return '{}(id:{})'.format(self.__class__.__name__, instance_id(self))
@@ -98,9 +100,12 @@ class ConnectionObserver(object):
 
     @_is_done.setter
     def _is_done(self, value):
+        was_done = self.__is_done
         self.__is_done = value
         if value:
             CommandScheduler.dequeue_running_on_connection(connection_observer=self)
+            if not was_done:
+                self._call_done_callbacks()
 
     @property
     def timeout(self):
@@ -111,7 +116,11 @@ class ConnectionObserver(object):
         # levels_to_go_up=2 : extract caller info to log where .timeout=XXX has been called from
         self._log(logging.DEBUG, "Setting {} timeout to {} [sec]".format(ConnectionObserver.__base_str(self), value),
                   levels_to_go_up=2)
+        prev_timeout = self.__timeout
         self.__timeout = value
+        if self.start_time > 0.0:
+            # lifetime clock is already running - let runner know that deadline has moved
+            self.runner.timeout_change(value - prev_timeout)
 
     def get_logger_name(self):
         if self.connection and hasattr(self.connection, "name"):
@@ -304,6 +313,47 @@ class ConnectionObserver(object):
             raise ResultNotAvailableYet(self)
         return self._result
 
+    def add_done_callback(self, fn):
+        """
+        Attach callable to be called when connection-observer becomes done (result, exception, cancel, end of life).
+
+        Callback is called exactly once with connection-observer as its only argument.
+        If connection-observer is already done callback is called immediately.
+        Callback is called from the thread that made connection-observer done so it should be short and must not
+        wait for other threads.
+
+        :param fn: callable taking connection-observer as parameter
+        :return: None
+        """
+        with self._done_callbacks_lock:
+            if not self.__is_done:
+                self._done_callbacks.append(fn)
+                return
+        fn(self)
+
+    def remove_done_callback(self, fn):
+        """
+        Detach callable attached by add_done_callback().
+
+        :param fn: callable to remove
+        :return: True if callback was removed, False if it was not attached (or has been already called)
+        """
+        with self._done_callbacks_lock:
+            if fn in self._done_callbacks:
+                self._done_callbacks.remove(fn)
+                return True
+        return False
+
+    def _call_done_callbacks(self):
+        with self._done_callbacks_lock:
+            callbacks = self._done_callbacks
+            self._done_callbacks = list()
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as err:
+                self._log(logging.ERROR, "Exception {!r} inside done callback {!r} of {}".format(err, callback, self))
+
     def on_timeout(self):
         """Callback called when observer times out"""
         pass
@@ -318,7 +368,6 @@ class ConnectionObserver(object):
         prev_timeout = self.timeout
         self.timeout = self.timeout + timedelta
         msg = "Extended timeout from %.2f with delta %.2f to %.2f" % (prev_timeout, timedelta, self.timeout)
-        self.runner.timeout_change(timedelta)
         self._log(logging.INFO, msg)
 
     @ClassProperty
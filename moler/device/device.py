@@ -6,20 +6,141 @@ __author__ = 'Grzegorz Latuszek, Marcin Usielski, Michal Ernst'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from moler.config import devices as devices_config
+from moler.exceptions import DeviceFailure
+from moler.exceptions import DevicesCreationFailure
 from moler.instance_loader import create_instance_from_class_fullname
 
 
 class DeviceFactory(object):
     _devices = {}
+    _devices_lock = threading.Lock()
+    _creation_locks = {}  # device name -> lock held while device of that name is created
+    max_workers = 8  # default max number of devices created in parallel by create_all_devices()
+
+    @classmethod
+    def create_all_devices(cls, max_workers=None, timeout=-1):
+        """
+        Create all devices defined in configuration. Devices are created in parallel. Failure of one device doesn't
+        stop creation of other ones.
+
+        :param max_workers: max number of devices created in parallel (DeviceFactory.max_workers if None)
+        :param timeout: max time (in seconds) of creating each device - opening its connection and entering its
+         initial state (-1 means no limit, default timeouts of state changes)
+        :return: dict device name -> (creation time in seconds, list of state changes durations). State change
+         duration is tuple (source state, destination state, seconds).
+        :raise DevicesCreationFailure: if any device was not created or has not entered its initial state (after all
+         other devices are created)
+        """
+        logger = logging.getLogger('moler')
+        device_names = list(devices_config.named_devices)
+        if not device_names:
+            return dict()
+        if max_workers is None:
+            max_workers = cls.max_workers
+        report = dict()
+        failures = dict()
+        creation = _DevicesCreation()
+        start_times = creation.start_times
+        workers_count = min(max_workers, len(device_names))
+        executor = ThreadPoolExecutor(max_workers=workers_count)
+        futures = dict((executor.submit(cls._create_device_with_times, device_name, timeout, creation),
+                        device_name) for device_name in device_names)
+        pending = set(futures)
+        overdue_count = 0  # devices which exceeded timeout - their workers are still busy
+        while pending:
+            done, pending = wait(pending, timeout=cls._time_to_nearest_deadline(pending, futures, start_times,
+                                                                                timeout),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                device_name = futures[future]
+                try:
+                    report[device_name] = future.result()
+                except Exception as exc:
+                    failures[device_name] = exc
+                    logger.error("Device '{}' not created ({}/{}): {!r}".format(
+                        device_name, len(report) + len(failures), len(device_names), exc))
+                else:
+                    logger.info("Device '{}' created ({}/{}) {}".format(
+                        device_name, len(report) + len(failures), len(device_names),
+                        cls._startup_times_info(*report[device_name])))
+            overdue = [future for future in pending if cls._is_overdue(futures[future], start_times, timeout)]
+            overdue_count += len(overdue)
+            if (overdue_count >= workers_count) and not [future for future in pending
+                                                         if futures[future] in start_times]:
+                overdue.extend(pending)  # remaining devices won't start - all workers stuck on overdue devices
+            for future in overdue:
+                device_name = futures[future]
+                future.cancel()
+                if not creation.abandon(device_name):
+                    continue  # device has just been created - its future is done
+                pending.discard(future)
+                failures[device_name] = DeviceFailure(device=device_name,
+                                                      message="not created within {} s".format(timeout))
+                logger.error("Device '{}' not created ({}/{}): {!r}".format(
+                    device_name, len(report) + len(failures), len(device_names), failures[device_name]))
+        executor.shutdown(wait=False)  # don't block on threads of overdue devices - they remove their devices
+        if failures:
+            raise DevicesCreationFailure(failures)
+        return report
+
+    @classmethod
+    def _create_device_with_times(cls, name, timeout, creation):
+        start_time = creation.start(name)
+        device = cls.get_device(name=name, goto_state_timeout=timeout)
+        if not creation.finish(name):
+            cls._remove_abandoned_device(name, device)
+            raise DeviceFailure(device=name, message="created after {} s timeout".format(timeout))
+        if device.current_state != device.initial_state:
+            raise DeviceFailure(device=name, message="state '{}' instead of initial state '{}'".format(
+                device.current_state, device.initial_state))
+        return time.time() - start_time, list(device.state_changes_durations)
 
     @classmethod
-    def create_all_devices(cls):
-        for device_name in devices_config.named_devices:
-            cls.get_device(name=device_name)
+    def _remove_abandoned_device(cls, name, device):
+        """
+        Forget and close device which creation exceeded timeout of create_all_devices().
+
+        :param name: name of device
+        :param device: device object
+        :return: None
+        """
+        with cls._devices_lock:
+            if cls._devices.get(name) is device:
+                del cls._devices[name]
+        device._stop_prompts_observers()
+        device.io_connection.close()
+
+    @staticmethod
+    def _is_overdue(device_name, start_times, timeout):
+        return (timeout > 0) and (device_name in start_times) and (time.time() - start_times[device_name] >= timeout)
+
+    @staticmethod
+    def _time_to_nearest_deadline(pending, futures, start_times, timeout):
+        if timeout <= 0:
+            return None
+        started = [start_times[futures[future]] for future in pending if futures[future] in start_times]
+        if not started:
+            return timeout  # devices are still queued; check again when started ones might be overdue
+        return max(min(started) + timeout - time.time(), 0)
+
+    @staticmethod
+    def _startup_times_info(creation_time, state_changes_durations):
+        info = "in {:.2f} s".format(creation_time)
+        if state_changes_durations:
+            source_state, dest_state, duration = max(state_changes_durations, key=lambda change: change[2])
+            info += ", longest hop '{}' -> '{}': {:.2f} s".format(source_state, dest_state, duration)
+        return info
 
     @classmethod
-    def get_device(cls, name=None, device_class=None, connection_desc=None, connection_hops=None, initial_state=None):
+    def get_device(cls, name=None, device_class=None, connection_desc=None, connection_hops=None, initial_state=None,
+                   goto_state_timeout=-1):
         """
         Return connection instance of given io_type/variant
 
@@ -28,6 +149,7 @@ class DeviceFactory(object):
         :param connection_desc: 'io_type' and 'variant' of device connection
         :param connection_hops: connection hops to create device SM
         :param initial_state: initial state for device e.g. UNIX_REMOTE
+        :param goto_state_timeout: timeout for entering initial state by new device (-1 means default timeouts)
         :return: requested device
         """
         if (not name) and (not device_class):
@@ -35,9 +157,22 @@ class DeviceFactory(object):
         if name and device_class:
             raise AssertionError("Use either 'name' or 'device_class' parameter (not both)")
 
-        if name in cls._devices.keys():
-            return cls._devices[name]
+        if not name:
+            return cls._get_new_device(name, device_class, connection_desc, connection_hops, initial_state,
+                                       goto_state_timeout)
+        with cls._devices_lock:
+            if name in cls._devices:
+                return cls._devices[name]
+            creation_lock = cls._creation_locks.setdefault(name, threading.Lock())
+        with creation_lock:  # the same device may be requested by many threads
+            with cls._devices_lock:
+                if name in cls._devices:
+                    return cls._devices[name]
+            return cls._get_new_device(name, device_class, connection_desc, connection_hops, initial_state,
+                                       goto_state_timeout)
 
+    @classmethod
+    def _get_new_device(cls, name, device_class, connection_desc, connection_hops, initial_state, goto_state_timeout):
         if connection_hops:
             if "CONNECTION_HOPS" not in connection_hops.keys():
                 new_connection_hops = dict()
@@ -54,12 +189,13 @@ class DeviceFactory(object):
             connection_desc = cls._try_select_device_connection_desc(device_class, connection_desc)
 
         device = cls._create_device(name, device_class, connection_desc, connection_hops, initial_state)
-        device.goto_state(state=device.initial_state)
+        device.goto_state(state=device.initial_state, timeout=goto_state_timeout)
 
-        if name:
-            cls._devices[name] = device
-        else:
-            cls._devices[device.name] = device
+        with cls._devices_lock:
+            if name:
+                cls._devices[name] = device
+            else:
+                cls._devices[device.name] = device
 
         return device
 
@@ -101,6 +237,54 @@ class DeviceFactory(object):
 
     @classmethod
     def _clear(cls):
-        for device in cls._devices.values():
-            del device
-        cls._devices = {}
+        with cls._devices_lock:
+            for device in cls._devices.values():
+                del device
+            cls._devices = {}
+            cls._creation_locks = {}
+
+
+class _DevicesCreation(object):
+    def __init__(self):
+        """Status of devices created by worker threads of DeviceFactory.create_all_devices()."""
+        self.start_times = dict()  # device name -> time its creation has started in worker thread
+        self._finished = set()
+        self._abandoned = set()
+        self._lock = threading.Lock()
+
+    def start(self, name):
+        """
+        Mark creation of device as started.
+
+        :param name: name of device
+        :return: start time
+        """
+        start_time = time.time()
+        self.start_times[name] = start_time
+        return start_time
+
+    def finish(self, name):
+        """
+        Mark creation of device as finished (called by worker thread).
+
+        :param name: name of device
+        :return: False if device was abandoned (its creation exceeded timeout), True otherwise
+        """
+        with self._lock:
+            if name in self._abandoned:
+                return False
+            self._finished.add(name)
+            return True
+
+    def abandon(self, name):
+        """
+        Mark device as abandoned - not waited for anymore (called when its creation exceeded timeout).
+
+        :param name: name of device
+        :return: False if device creation has already finished, True otherwise
+        """
+        with self._lock:
+            if name in self._finished:
+                return False
+            self._abandoned.add(name)
+            return True
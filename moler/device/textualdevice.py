@@ -9,11 +9,11 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
 import abc
+import collections
 import functools
+import heapq
 import importlib
-import inspect
 import logging
-import pkgutil
 import re
 import time
 import traceback
@@ -25,6 +25,7 @@ from moler.device.state_machine import StateMachine
 from moler.exceptions import CommandWrongState, DeviceFailure, EventWrongState, DeviceChangeStateFailure
 from moler.helpers import copy_dict
 from moler.helpers import update_dict
+from moler.observers_registry import get_observers_in_package
 
 
 # TODO: name, logger/logger_name as param
@@ -34,6 +35,8 @@ class TextualDevice(object):
 
     not_connected = "NOT_CONNECTED"
     connection_hops = "CONNECTION_HOPS"
+    result_storage_config = "RESULT_STORAGE"
+    max_state_changes_durations = 100  # hops kept in state_changes_durations (aggregates are kept for all hops)
 
     def __init__(self, sm_params=None, name=None, io_connection=None, io_type=None, variant=None,
                  io_constructor_kwargs={}, initial_state=None):
@@ -42,7 +45,8 @@ class TextualDevice(object):
         CAUTION: Device owns (takes over ownership) of connection. It will be open when device "is born" and close when
         device "dies".
 
-        :param sm_params: dict with parameters of state machine for device
+        :param sm_params: dict with parameters of state machine for device. It may also have RESULT_STORAGE key
+         with default result storage of commands (see result_storage attribute).
         :param name: name of device
         :param io_connection: External-IO connection having embedded moler-connection
         :param io_type: type of connection - tcp, udp, ssh, telnet, ...
@@ -67,10 +71,19 @@ class TextualDevice(object):
                                queued=True)
 
         self._state_hops = dict()
+        self._state_transitions = dict()  # source state -> set of destination states of direct transitions
+        self._next_hops = None  # source state -> {destination state: next state}, computed from transitions
+        self._goto_state_methods = dict()  # state -> trigger method entering that state
+        self._state_change_costs = dict()  # (source state, destination state) -> (number of changes, total time)
+        self.route_by_measured_durations = False  # if True then goto_state() prefers hops measured as faster
         self._state_prompts = dict()
-        self._prompts_events = dict()
+        self._prompts_event = None
         self._configurations = dict()
         self._newline_chars = dict()  # key is state, value is chars to send as newline
+        # kwargs of set_result_storage() of commands accumulating records (like {'mode': 'ring', 'max_records': 1000})
+        self.result_storage = sm_params.pop(TextualDevice.result_storage_config, None)
+        # (source state, destination state, duration in seconds) of last hops - oldest ones are dropped
+        self.state_changes_durations = collections.deque(maxlen=self.max_state_changes_durations)
         if io_connection:
             self.io_connection = io_connection
         else:
@@ -83,13 +96,17 @@ class TextualDevice(object):
 
         self._prepare_transitions()
         self._prepare_state_hops()
+        self._prepare_next_hops()
         self._configure_state_machine(sm_params)
         self._prepare_newline_chars()
 
         # TODO: Need test to ensure above sentence for all connection
         self.io_connection.notify(callback=self.on_connection_made, when="connection_made")
         self.io_connection.notify(callback=self.on_connection_lost, when="connection_lost")
+        open_start_time = time.time()
         self.io_connection.open()
+        self.state_changes_durations.append((TextualDevice.not_connected, "CONNECTION_OPEN",
+                                             time.time() - open_start_time))
 
         self._cmdnames_available_in_state = dict()
         self._eventnames_available_in_state = dict()
@@ -219,29 +236,119 @@ class TextualDevice(object):
                 if next_stage_timeout <= 0:
                     is_timeout = True
 
-    def _get_next_state(self, dest_state):
+    def _get_next_state(self, dest_state, source_state=None):
+        if source_state is None:
+            source_state = self.current_state
         next_state = None
-        if self.current_state in self._state_hops.keys():
-            if dest_state in self._state_hops[self.current_state].keys():
-                next_state = self._state_hops[self.current_state][dest_state]
+        if source_state in self._state_hops.keys():
+            if dest_state in self._state_hops[source_state].keys():
+                next_state = self._state_hops[source_state][dest_state]
+
+        if not next_state:  # shortest path computed from transitions
+            if self._next_hops is None:
+                self._prepare_next_hops()
+            next_state = self._next_hops.get(source_state, dict()).get(dest_state)
 
         if not next_state:  # direct transition without hops
             next_state = dest_state
 
         return next_state
 
+    def plan_path(self, source_state, dest_state):
+        """
+        Return path goto_state() would take between states.
+
+        :param source_state: state to start from
+        :param dest_state: destination state
+        :return: tuple (list of states entered one by one - the last one is dest_state, expected duration in seconds).
+         Expected duration is sum of average measured durations of hops, None if any hop was never measured.
+        :raise DeviceFailure: if there is no path between states
+        """
+        hops = list()
+        expected_duration = 0.0
+        state = source_state
+        while state != dest_state:
+            next_state = self._get_next_state(dest_state=dest_state, source_state=state)
+            if (next_state not in self._state_transitions.get(state, ())) or (next_state in hops):
+                exc = DeviceFailure(device=self.__class__.__name__,
+                                    message="No path from state '{}' to state '{}'. Available states: {}".format(
+                                        source_state, dest_state, self.states))
+                self._log(logging.ERROR, exc)
+                raise exc
+            hop_duration = self._get_state_change_duration(state, next_state)
+            if (hop_duration is None) or (expected_duration is None):
+                expected_duration = None
+            else:
+                expected_duration += hop_duration
+            hops.append(next_state)
+            state = next_state
+        return hops, expected_duration
+
+    def _prepare_next_hops(self):
+        """
+        Compute next hop between each pair of states (shortest paths over direct transitions).
+        Hand-written self._state_hops take precedence over computed ones.
+
+        :return: None
+        """
+        next_hops = dict()
+        for source_state in self._state_transitions:
+            next_hops[source_state] = self._shortest_paths_next_hops(source_state)
+        self._next_hops = next_hops
+
+    def _shortest_paths_next_hops(self, source_state):
+        next_hops = dict()
+        costs = {source_state: 0.0}
+        queue = [(0.0, 0, source_state, None)]  # cost, number of hops, state, first hop from source_state
+        while queue:
+            cost, hops_count, state, first_hop = heapq.heappop(queue)
+            if cost > costs.get(state, cost):
+                continue
+            if first_hop is not None:
+                if state in next_hops:
+                    continue
+                next_hops[state] = first_hop
+            for next_state in sorted(self._state_transitions.get(state, ())):
+                next_cost = cost + self._get_state_change_cost(state, next_state)
+                if (next_state not in costs) or (next_cost < costs[next_state]):
+                    costs[next_state] = next_cost
+                    heapq.heappush(queue, (next_cost, hops_count + 1, next_state,
+                                           next_state if first_hop is None else first_hop))
+        return next_hops
+
+    def _get_state_change_cost(self, source_state, dest_state):
+        if self.route_by_measured_durations:
+            duration = self._get_state_change_duration(source_state, dest_state)
+            if duration is not None:
+                return duration
+        return 1.0
+
+    def _get_state_change_duration(self, source_state, dest_state):
+        """
+        :return: average measured duration (in seconds) of change between states, None if not measured yet.
+        """
+        if (source_state, dest_state) in self._state_change_costs:
+            changes_count, total_time = self._state_change_costs[(source_state, dest_state)]
+            return total_time / changes_count
+        return None
+
+    def _add_state_change_duration(self, source_state, dest_state, duration):
+        self.state_changes_durations.append((source_state, dest_state, duration))
+        changes_count, total_time = self._state_change_costs.get((source_state, dest_state), (0, 0.0))
+        self._state_change_costs[(source_state, dest_state)] = (changes_count + 1, total_time + duration)
+        if self.route_by_measured_durations:
+            self._next_hops = None  # recompute with new costs
+
     def _trigger_change_state(self, next_state, timeout, rerun, send_enter_after_changed_state):
         self._log(logging.DEBUG, "Changing state from '%s' into '%s'" % (self.current_state, next_state))
         change_state_method = None
         entered_state = False
         retrying = 0
-        # all state triggers used by SM are methods with names starting from "GOTO_"
-        # for e.g. GOTO_REMOTE, GOTO_CONNECTED
-        for goto_method in self.goto_states_triggers:
-            if "GOTO_{}".format(next_state) == goto_method:
-                change_state_method = getattr(self, goto_method)
+        change_state_method = self._get_change_state_method(next_state)
 
         if change_state_method:
+            source_state = self.current_state
+            change_start_time = time.time()
             while (retrying <= rerun) and (not entered_state) and (self.current_state is not next_state):
                 try:
                     change_state_method(self.current_state, next_state, timeout=timeout)
@@ -261,6 +368,7 @@ class TextualDevice(object):
             self.io_connection.moler_connection.change_newline_seq(self._get_newline(state=next_state))
             if send_enter_after_changed_state:
                 self._send_enter_after_changed_state()
+            self._add_state_change_duration(source_state, next_state, time.time() - change_start_time)
             self._log(logging.DEBUG, "Successfully enter state '{}'".format(next_state))
         else:
             exc = DeviceFailure(
@@ -272,6 +380,16 @@ class TextualDevice(object):
             self._log(logging.ERROR, exc)
             raise exc
 
+    def _get_change_state_method(self, state):
+        if state not in self._goto_state_methods:
+            # all state triggers used by SM are methods with names starting from "GOTO_"
+            # for e.g. GOTO_REMOTE, GOTO_CONNECTED
+            goto_method = "GOTO_{}".format(state)
+            if goto_method not in self.goto_states_triggers:
+                return None
+            self._goto_state_methods[state] = getattr(self, goto_method)
+        return self._goto_state_methods[state]
+
     def on_connection_made(self, connection):
         self._set_state(TextualDevice.connected)
 
@@ -296,21 +414,8 @@ class TextualDevice(object):
         return self.states
 
     def _load_cmds_from_package(self, package_name):
-        available_cmds = dict()
-        basic_module = importlib.import_module(package_name)
-        for importer, modname, is_pkg in pkgutil.iter_modules(basic_module.__path__):
-            module_name = "{}.{}".format(package_name, modname)
-            module = importlib.import_module(module_name)
-            for (cmd_class_name, cmd_module_name) in inspect.getmembers(module, inspect.isclass):
-                if cmd_module_name.__module__ == module_name:
-                    cmd_class_obj = getattr(module, cmd_class_name)
-                    # like:  IpAddr --> ip_addr
-                    cmd_name = cmd_class_obj.observer_name
-                    # like:  IpAddr --> moler.cmd.unix.ip_addr.IpAddr
-                    cmd_class_fullname = "{}.{}".format(module_name, cmd_class_name)
-
-                    available_cmds.update({cmd_name: cmd_class_fullname})
-        return available_cmds
+        # registry is built once per process, command/event modules are imported when object is created
+        return dict(get_observers_in_package(package_name))
 
     def _get_observer_in_state(self, observer_name, observer_type, **kwargs):
         """Return Observable object assigned to obserber_name of given device"""
@@ -380,13 +485,17 @@ class TextualDevice(object):
             observer._validate_start = validate_device_state_before_observer_start
         return observer
 
-    def get_cmd(self, cmd_name, cmd_params=None, check_state=True):
+    def get_cmd(self, cmd_name, cmd_params=None, check_state=True, priority=None, result_storage=None):
         """
         Returns instance of command connected with the device.
         :param cmd_name: name of commands, name of class (without package), for example "cd".
         :param cmd_params: dict with command parameters.
         :param check_state: if True then before execute of command the state of device will be check if the same
          as when command was created. If False the device state is not checked.
+        :param priority: priority of command in queue of connection (higher starts first). If None then default
+         priority of command is used.
+        :param result_storage: dict with kwargs of set_result_storage() of command. If None then result_storage of
+         device is used for commands accumulating records.
         :return: Instance of command
         """
         cmd_params = copy_dict(cmd_params)
@@ -395,6 +504,12 @@ class TextualDevice(object):
         cmd = self.get_observer(observer_name=cmd_name, observer_type=TextualDevice.cmds,
                                 observer_exception=CommandWrongState, check_state=check_state, **cmd_params)
         assert isinstance(cmd, CommandTextualGeneric)
+        if priority is not None:
+            cmd.priority = priority
+        if result_storage is not None:
+            cmd.set_result_storage(**result_storage)
+        elif self.result_storage and cmd.accumulates_records:
+            cmd.set_result_storage(**self.result_storage)
         return cmd
 
     def get_event(self, event_name, event_params=None, check_state=True):
@@ -460,6 +575,8 @@ class TextualDevice(object):
         for source_state in transitions.keys():
             for dest_state in transitions[source_state].keys():
                 self._update_SM_states(dest_state)
+                self._state_transitions.setdefault(source_state, set()).add(dest_state)
+                self._next_hops = None
 
                 single_transition = [
                     {'trigger': self.build_trigger_to_state(dest_state),
@@ -481,33 +598,36 @@ class TextualDevice(object):
     def _close_connection(self, source_state, dest_state, timeout):
         self.io_connection.close()
 
-    def _prompt_observer_callback(self, event, state):
+    def _prompts_observer_callback(self, event):
+        occurrence = event.get_last_occurrence()
+        state = occurrence["state"]
         self._set_state(state)
 
     def _run_prompts_observers(self):
-        for state in self._state_prompts.keys():
-            prompt_event = self.get_event(
-                event_name="wait4prompt",
-                event_params={
-                    "prompt": self._state_prompts[state],
-                    "till_occurs_times": -1
-                }
-            )
-
-            prompt_event.add_event_occurred_callback(
-                callback=self._prompt_observer_callback,
-                callback_params={
-                    "event": prompt_event,
-                    "state": state
-                })
-
-            prompt_event.start()
-            self._prompts_events[state] = prompt_event
+        # One event checks prompts of all states (instead of one event per state)
+        prompts = dict((prompt, state) for state, prompt in self._state_prompts.items())
+        if not prompts:
+            return
+        self._prompts_event = self.get_event(
+            event_name="wait4prompts",
+            event_params={
+                "prompts": prompts,
+                "till_occurs_times": -1
+            }
+        )
+
+        self._prompts_event.add_event_occurred_callback(
+            callback=self._prompts_observer_callback,
+            callback_params={
+                "event": self._prompts_event,
+            })
+
+        self._prompts_event.start()
 
     def _stop_prompts_observers(self):
-        for device_state in self._prompts_events:
-            self._prompts_events[device_state].cancel()
-            self._prompts_events[device_state].remove_event_occurred_callback()
+        if self._prompts_event:
+            self._prompts_event.cancel()
+            self._prompts_event.remove_event_occurred_callback()
 
     def build_trigger_to_state(self, state):
         trigger = "GOTO_{}".format(state)
@@ -8,6 +8,7 @@ __author__ = 'Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
+import threading
 import time
 
 
@@ -19,43 +20,67 @@ class EventAwaiter(object):
         Wait for all events are done or timeout occurs
         :param timeout: time in seconds
         :param events: list of events to check
-        :param interval: interval in seconds between checking events
+        :param interval: not used, waiting is woken by events when they are done. Left for backward compatibility.
         :return: True if all events are done, False otherwise
         """
-        grand_timeout = timeout
-        start_time = time.time()
-        all_done = True
-        while timeout >= 0:
-            time.sleep(interval)
-            all_done = True
-            for event in events:
-                if not event.done():
-                    all_done = False
-                    break
-            if all_done:
-                break
-            timeout = grand_timeout - (time.time() - start_time)
-        return all_done
+        events = list(events)
+        done_events = EventAwaiter._wait_for_done(timeout=timeout, events=events, expected_done=len(events))
+        return len(done_events) == len(events)
 
     @staticmethod
     def wait_for_any(timeout, events, interval=0.001):
         """
         :param timeout: time in seconds
         :param events: list of events to check
-        :param interval: interval in seconds between checking events
+        :param interval: not used, waiting is woken by events when they are done. Left for backward compatibility.
         :return: True if any event is done, False otherwise
         """
-        grand_timeout = timeout
-        start_time = time.time()
-        any_done = False
-        while timeout >= 0 and not any_done:
-            time.sleep(interval)
+        return EventAwaiter.wait_for_first(timeout=timeout, events=events) is not None
+
+    @staticmethod
+    def wait_for_first(timeout, events):
+        """
+        Wait for any event is done or timeout occurs
+        :param timeout: time in seconds
+        :param events: list of events to check
+        :return: event which was done first or None if no event is done
+        """
+        done_events = EventAwaiter._wait_for_done(timeout=timeout, events=list(events), expected_done=1)
+        if done_events:
+            return done_events[0]
+        return None
+
+    @staticmethod
+    def _wait_for_done(timeout, events, expected_done):
+        """
+        Block till expected number of events are done or timeout occurs.
+        :param timeout: time in seconds
+        :param events: list of events to check
+        :param expected_done: number of done events to stop waiting
+        :return: list of done events in order they became done
+        """
+        done_events = list()
+        condition = threading.Condition()
+
+        def _event_done(event):
+            with condition:
+                done_events.append(event)
+                condition.notify()
+
+        for event in events:
+            event.add_done_callback(_event_done)  # called at once if event is already done
+        try:
+            deadline = time.time() + timeout
+            with condition:
+                while len(done_events) < expected_done:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    condition.wait(remaining)
+                return list(done_events)
+        finally:
             for event in events:
-                if event.done():
-                    any_done = True
-                    break
-            timeout = grand_timeout - (time.time() - start_time)
-        return any_done
+                event.remove_done_callback(_event_done)
 
     @staticmethod
     def separate_done_events(events):
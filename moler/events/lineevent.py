@@ -7,6 +7,7 @@ __email__ = 'marcin.usielski@nokia.com, tomasz.krol@nokia.com'
 import datetime
 import re
 
+from moler.events.patternindex import get_pattern_index
 from moler.events.textualevent import TextualEvent
 from moler.exceptions import NoDetectPatternProvided
 from moler.helpers import instance_id, copy_list
@@ -19,6 +20,7 @@ class LineEvent(TextualEvent):
         self.detect_patterns = copy_list(detect_patterns)
         self.process_full_lines_only = False
         self.match = match
+        self._pattern_index = None  # Index of patterns of all LineEvents running on connection
         self._prepare_parameters()
 
     def __str__(self):
@@ -28,11 +30,17 @@ class LineEvent(TextualEvent):
         """Start background execution of command."""
 
         self._validate_start(*args, **kwargs)
+        self._pattern_index = get_pattern_index(self.connection)
+        self._pattern_index.register(self.compiled_patterns)
+        self.add_done_callback(self._unregister_patterns)
         ret = super(LineEvent, self).start(timeout, *args, **kwargs)
         self._is_running = True
 
         return ret
 
+    def _unregister_patterns(self, event):
+        self._pattern_index.unregister(self.compiled_patterns)
+
     def _validate_start(self, *args, **kwargs):
         # check base class invariants first
         super(LineEvent, self)._validate_start(*args, **kwargs)
@@ -81,6 +89,18 @@ class LineEvent(TextualEvent):
     def _parse_line(self, line):
         self.parser(line=line)
 
+    def _search(self, pattern, line):
+        """
+        Search line with pattern. Started event shares searching with other LineEvents running on connection.
+
+        :param pattern: compiled regular expression
+        :param line: line to search
+        :return: match object or None
+        """
+        if self._pattern_index is None:
+            return re.search(pattern, line)
+        return self._pattern_index.search(pattern, line)
+
     def _set_current_ret(self, line, match):
         current_ret = dict()
         current_ret["line"] = line
@@ -100,14 +120,14 @@ class LineEvent(TextualEvent):
 
     def _catch_any(self, line):
         for pattern in self.compiled_patterns:
-            match = re.search(pattern, line)
+            match = self._search(pattern, line)
             if match:
                 self._set_current_ret(line=line, match=match)
                 return
 
     def _catch_all(self, line):
         for index, pattern in enumerate(self.copy_compiled_patterns):
-            match = re.search(pattern, line)
+            match = self._search(pattern, line)
             if match:
                 del self.copy_compiled_patterns[index]
                 self._set_current_ret(line=line, match=match)
@@ -118,7 +138,7 @@ class LineEvent(TextualEvent):
     def _catch_sequence(self, line):
         if self.copy_compiled_patterns:
             pattern = self.copy_compiled_patterns[0]
-            match = re.search(pattern, line)
+            match = self._search(pattern, line)
             if match:
                 del self.copy_compiled_patterns[0]
                 self._set_current_ret(line=line, match=match)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Index of regular expressions of all LineEvents running on one connection.
+
+Every LineEvent subscribed to connection gets the same lines and searches them with its own patterns.
+Most lines don't match any pattern so index checks line once per connection:
+1) literal prefilter - if every pattern requires some literal substring and line contains none of them
+   then no pattern can match,
+2) one combined alternation of all patterns - if it doesn't match then no pattern can match.
+Only when line passes both checks patterns are searched one by one and results are shared by all events.
+"""
+
+__author__ = 'Marcin Usielski, Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com, grzegorz.latuszek@nokia.com'
+
+import re
+import threading
+import weakref
+
+import six
+
+from moler.util.regexliteral import required_literal
+
+_re_backreference = re.compile(r'\\[1-9]|\(\?P=')
+_re_named_group = re.compile(r'(?<!\\)\(\?P<\w+>')
+
+
+def get_pattern_index(connection):
+    """
+    Return pattern index of connection.
+
+    :param connection: connection observers are running on
+    :return: PatternIndex object, the same one for given connection
+    """
+    with PatternIndex._indexes_lock:
+        if connection not in PatternIndex._indexes:
+            PatternIndex._indexes[connection] = PatternIndex()
+        return PatternIndex._indexes[connection]
+
+
+class PatternIndex(object):
+    _indexes = weakref.WeakKeyDictionary()  # connection -> PatternIndex
+    _indexes_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Create empty index of patterns.
+        """
+        self._lock = threading.Lock()
+        self._patterns = dict()  # compiled pattern -> number of registrations
+        self._literals = dict()  # compiled pattern -> required literal (None if pattern has no required literal)
+        self._all_have_literals = False
+        self._combined = list()  # combined alternations of patterns
+        self._has_not_combined = False  # some patterns can't be put into alternation
+        self._is_built = True
+        self._last_line = (None, False, dict())  # line, can match any pattern, results of search per pattern
+
+    def register(self, patterns):
+        """
+        Add patterns to index.
+
+        :param patterns: list of compiled regular expressions
+        :return: None
+        """
+        with self._lock:
+            for pattern in patterns:
+                if pattern in self._patterns:
+                    self._patterns[pattern] += 1
+                else:
+                    self._patterns[pattern] = 1
+                    self._literals[pattern] = required_literal(pattern)
+            self._invalidate()
+
+    def unregister(self, patterns):
+        """
+        Remove patterns from index.
+
+        :param patterns: list of compiled regular expressions passed to register()
+        :return: None
+        """
+        with self._lock:
+            for pattern in patterns:
+                if pattern in self._patterns:
+                    self._patterns[pattern] -= 1
+                    if self._patterns[pattern] <= 0:
+                        del self._patterns[pattern]
+                        del self._literals[pattern]
+            self._invalidate()
+
+    def search(self, pattern, line):
+        """
+        Search line with pattern. Result is shared with all other users of index searching the same line.
+
+        :param pattern: compiled regular expression (registered in index)
+        :param line: line to search
+        :return: match object or None
+        """
+        last_line, may_match, results = self._last_line
+        if (last_line is None) or (last_line != line):
+            may_match = self._may_match(line)
+            results = dict()
+            self._last_line = (line, may_match, results)
+        if not may_match:
+            return None
+        if pattern not in results:
+            literal = self._literals.get(pattern)
+            if literal and literal not in line:
+                results[pattern] = None
+            else:
+                results[pattern] = pattern.search(line)
+        return results[pattern]
+
+    def _invalidate(self):
+        self._is_built = False
+        self._last_line = (None, False, dict())
+
+    def _may_match(self, line):
+        with self._lock:
+            if not self._is_built:
+                self._build()
+            if self._all_have_literals:
+                if not any(literal in line for literal in self._literals.values()):
+                    return False
+            if self._has_not_combined:
+                return True
+            for combined in self._combined:
+                if combined.search(line):
+                    return True
+            return False
+
+    def _build(self):
+        """Build literal prefilter and combined alternations. Call it holding self._lock."""
+        self._all_have_literals = bool(self._literals) and all(self._literals.values())
+        self._has_not_combined = False
+        self._combined = list()
+        sources_by_flags = dict()
+        for pattern in self._patterns:
+            if (not isinstance(pattern.pattern, six.text_type)) or _re_backreference.search(pattern.pattern):
+                self._has_not_combined = True  # backreferences would point to other groups inside alternation
+                continue
+            source = _re_named_group.sub(u'(?:', pattern.pattern)  # the same group names may be used in patterns
+            sources_by_flags.setdefault(pattern.flags, list()).append(u'(?:{})'.format(source))
+        for flags, sources in sources_by_flags.items():
+            try:
+                self._combined.append(re.compile(u'|'.join(sources), flags))
+            except re.error:
+                self._has_not_combined = True
+        self._is_built = True
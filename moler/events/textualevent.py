@@ -7,6 +7,8 @@ __email__ = 'marcin.usielski@nokia.com, michal.ernst@nokia.com'
 import abc
 from moler.event import Event
 from moler.cmd import RegexHelper
+from moler.connection import ObservableConnection
+from moler.helpers import split_into_lines
 
 
 class TextualEvent(Event):
@@ -39,12 +41,22 @@ class TextualEvent(Event):
         :param data: List of strings sent by device
         :return: Nothing
         """
-        lines = data.splitlines(True)
-        for line in lines:
+        if isinstance(self.connection, ObservableConnection):
+            lines = self.connection.received_lines(data, self._newline_chars)
+        else:
+            lines = split_into_lines(data, self._newline_chars)
+        self.lines_received(lines)
+
+    def lines_received(self, lines):
+        """
+        Called with data already split into lines
+        :param lines: List of tuples (line, is_full_line), line with new line chars
+        :return: Nothing
+        """
+        for line, is_full_line in lines:
             if self._last_not_full_line is not None:
                 line = self._last_not_full_line + line
                 self._last_not_full_line = None
-            is_full_line = self.is_new_line(line)
             if is_full_line:
                 line = self._strip_new_lines_chars(line)
             else:
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Event waiting for any of many prompts (like prompts of all states of device).
+
+One event replaces many Wait4prompt events running on the same connection. All prompts are
+checked in one pass over line (see PatternIndex). When many lines come in one chunk of data only
+the last line with any prompt is reported - it shows where device is after that chunk.
+"""
+
+__author__ = 'Marcin Usielski, Michal Ernst'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com, michal.ernst@nokia.com'
+
+import datetime
+import re
+
+from moler.events.patternindex import PatternIndex
+from moler.events.textualevent import TextualEvent
+from moler.exceptions import NoDetectPatternProvided
+from moler.helpers import instance_id
+
+
+class Wait4prompts(TextualEvent):
+    def __init__(self, connection, prompts, till_occurs_times=-1, runner=None):
+        """
+        Event for waiting for any of prompts
+        :param connection: moler connection to device, terminal when command is executed
+        :param prompts: dict, key is prompt regex, value is returned in 'state' of occurrence when prompt is found
+        :param till_occurs_times: number of event occurrence
+        :param runner: Runner to run event
+        """
+        super(Wait4prompts, self).__init__(connection=connection, runner=runner, till_occurs_times=till_occurs_times)
+        self.prompts = dict()  # compiled prompt -> state
+        for prompt, state in prompts.items():
+            if not hasattr(prompt, "match"):  # Not compiled regexp
+                prompt = re.compile(prompt)
+            self.prompts[prompt] = state
+        self._prompts_index = PatternIndex()
+        self._prompts_index.register(list(self.prompts))
+
+    def __str__(self):
+        return '{}({}, id:{})'.format(self.__class__.__name__, [prompt.pattern for prompt in self.prompts],
+                                      instance_id(self))
+
+    def _validate_start(self, *args, **kwargs):
+        # check base class invariants first
+        super(Wait4prompts, self)._validate_start(*args, **kwargs)
+        # then what is needed for event
+        if not self.prompts:
+            raise NoDetectPatternProvided(self)
+
+    def lines_received(self, lines):
+        """
+        Called with data already split into lines. Lines are checked from the last one, first prompt found stops
+        checking.
+        :param lines: List of tuples (line, is_full_line), line with new line chars
+        :return: Nothing
+        """
+        assembled_lines = list()
+        for line, is_full_line in lines:
+            if self._last_not_full_line is not None:
+                line = self._last_not_full_line + line
+                self._last_not_full_line = None
+            if is_full_line:
+                line = self._strip_new_lines_chars(line)
+            else:
+                self._last_not_full_line = line
+            assembled_lines.append((line, is_full_line))
+        for line, is_full_line in reversed(assembled_lines):
+            if self.on_new_line(line, is_full_line):
+                break
+
+    def on_new_line(self, line, is_full_line):
+        """
+        Check line for prompts. If line matches many prompts (like generic prompts shared by states) then the last
+        of them (in order of prompts) gives state - as when every prompt had its own event and each of them set state.
+        :param line: Line to parse, new lines are trimmed
+        :param is_full_line: True if new line character was removed from line, False otherwise
+        :return: True if any prompt was found, False otherwise
+        """
+        found_match, found_state = None, None
+        for prompt, state in self.prompts.items():
+            match = self._prompts_index.search(prompt, line)
+            if match:
+                found_match, found_state = match, state
+        if found_match is None:
+            return False
+        self._prompt_found(line=line, is_full_line=is_full_line, match=found_match, state=found_state)
+        return True
+
+    def _prompt_found(self, line, is_full_line, match, state):
+        last_not_full_line = self._last_not_full_line
+        self.event_occurred(event_data={
+            "line": line,
+            "matched": match.group(0),
+            "groups": match.groups(),
+            "named_groups": match.groupdict(),
+            "state": state,
+            "time": datetime.datetime.now(),
+        })
+        if is_full_line:  # fragment of next line is not parsed yet
+            self._last_not_full_line = last_not_full_line
+
+
+EVENT_OUTPUT = """
+user@host01:~> TERM=xterm-mono telnet -4 host.domain.net 1500
+Login:
+Login:user
+Password:
+Last login: Thu Nov 23 10:38:16 2017 from 127.0.0.1
+Have a lot of fun...
+CLIENT5 [] has just connected!
+host:~ #"""
+
+EVENT_KWARGS = {
+    "prompts": {r'host:.*#': "UNIX_REMOTE", r'user@host01:.*>': "UNIX_LOCAL"},
+    "till_occurs_times": 1
+}
+
+EVENT_RESULT = [
+    {
+        'line': "host:~ #",
+        "groups": (),
+        "named_groups": {},
+        "matched": "host:~ #",
+        "state": "UNIX_REMOTE",
+        'time': datetime.datetime(2019, 1, 14, 13, 12, 48, 224929),
+    }
+]
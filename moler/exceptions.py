@@ -153,3 +153,11 @@ class DeviceChangeStateFailure(DeviceFailure):
         self.device = device
         err_msg = "Exception raised by device '{}' SM when try to changing state: '{}'.".format(device, exception)
         super(DeviceChangeStateFailure, self).__init__(device, err_msg)
+
+
+class DevicesCreationFailure(MolerException):
+    def __init__(self, failures):
+        self.failures = failures  # device name -> exception
+        err_msg = "Failed to create devices: {}.".format(
+            ", ".join("'{}' ({!r})".format(name, failures[name]) for name in sorted(failures)))
+        super(DevicesCreationFailure, self).__init__(err_msg)
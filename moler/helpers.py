@@ -94,6 +94,17 @@ def remove_escape_codes(line):
     return line
 
 
+def split_into_lines(data, newline_chars=("\n", "\r")):
+    """
+    Splits data into lines
+    :param data: String to split
+    :param newline_chars: Chars ending full line
+    :return: List of tuples (line, is_full_line). Line keeps its new line chars, is_full_line is True if line ends
+     with any of newline_chars
+    """
+    return [(line, line.endswith(newline_chars)) for line in data.splitlines(True)]
+
+
 def create_object_from_name(full_class_name, constructor_params):
     name_splitted = full_class_name.split('.')
     module_name = ".".join(name_splitted[:-1])
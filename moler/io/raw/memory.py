@@ -21,7 +21,7 @@ __email__ = 'grzegorz.latuszek@nokia.com'
 import threading
 import time
 import logging
-from six.moves.queue import Queue, Empty
+from six.moves.queue import Queue
 
 from moler.io.io_connection import IOConnection
 from moler.io.raw import TillDoneThread
@@ -172,7 +172,8 @@ class FifoBuffer(IOConnection):
             size2read = len(self.buffer)
         if size2read > 0:
             data = self.buffer[:size2read]
-            self.buffer = self.buffer[size2read:]
+            # bytearray removes bytes from its front by moving its start offset (no copy of remaining bytes)
+            del self.buffer[:size2read]
             self.data_received(data)
             return data
         else:
@@ -205,15 +206,19 @@ class ThreadedFifoBuffer(FifoBuffer):
                                                  logger_name=logger_name)
         self.pulling_thread = None
         self.injections = Queue()
+        self.max_delivery_wait = 0.05  # max time inject() waits till injected data is passed to moler_connection
+        self._delivery_condition = threading.Condition()
+        self._undelivered_injections = 0
 
     def open(self):
         """Start thread pulling data from FIFO buffer."""
         ret = super(ThreadedFifoBuffer, self).open()
-        done = threading.Event()
-        self.pulling_thread = TillDoneThread(target=self.pull_data,
-                                             done_event=done,
-                                             kwargs={'pulling_done': done})
-        self.pulling_thread.start()
+        if self.pulling_thread is None:  # already open connection has its pulling thread
+            done = threading.Event()
+            self.pulling_thread = TillDoneThread(target=self.pull_data,
+                                                 done_event=done,
+                                                 kwargs={'pulling_done': done})
+            self.pulling_thread.start()
         self._log(msg="open {}".format(self), level=logging.INFO)
         self._notify_on_connect()
         return ret
@@ -221,6 +226,8 @@ class ThreadedFifoBuffer(FifoBuffer):
     def close(self):
         """Stop pulling thread."""
         if self.pulling_thread:
+            self.pulling_thread.done_event.set()
+            self.injections.put(None)  # wake up pulling thread
             self.pulling_thread.join()
             self.pulling_thread = None
         super(ThreadedFifoBuffer, self).close()
@@ -236,26 +243,95 @@ class ThreadedFifoBuffer(FifoBuffer):
         :return: None
         """
         for data in input_bytes:
-            self.injections.put((data, delay))
+            self._put_injection(data, delay)
         if not delay:
-            time.sleep(0.05)  # give subsequent read() a chance to get data
+            self._wait_for_delivery()  # give subsequent read() a chance to get data
 
     def _inject_deferred(self):
         if self.deferred_injections:
             for data, delay in self.deferred_injections:
-                self.injections.put((data, delay))
+                self._put_injection(data, delay)
             self.deferred_injections = []
-            time.sleep(0.05)  # give subsequent read() a chance to get data
+            self._wait_for_delivery()  # give subsequent read() a chance to get data
+
+    def _put_injection(self, data, delay):
+        with self._delivery_condition:
+            self._undelivered_injections += 1
+        self.injections.put((data, delay))
+
+    def _wait_for_delivery(self):
+        """Wait (max_delivery_wait at most) till pulling thread passes all injected data into moler_connection."""
+        if threading.current_thread() is self.pulling_thread:
+            return  # injected from inside data_received() - pulling thread delivers it when we return
+        end_time = time.time() + self.max_delivery_wait
+        with self._delivery_condition:
+            while self._undelivered_injections > 0:
+                timeout = end_time - time.time()
+                if timeout <= 0:
+                    break
+                self._delivery_condition.wait(timeout)
 
     def pull_data(self, pulling_done):
         """Pull data from FIFO buffer."""
         while not pulling_done.is_set():
             self.read()  # internally forwards to embedded Moler connection
+            injection = self.injections.get()  # woken by inject() or close()
+            if injection is None:
+                self.injections.task_done()
+                continue
+            data, delay = injection
             try:
-                data, delay = self.injections.get_nowait()
                 if delay:
                     time.sleep(delay)
                 self._inject(data)
+                self.read()
+            finally:
                 self.injections.task_done()
-            except Empty:
-                time.sleep(0.01)  # give FIFO chance to get data
+                with self._delivery_condition:
+                    self._undelivered_injections -= 1
+                    self._delivery_condition.notify_all()
+
+
+class InlineFifoBuffer(FifoBuffer):
+    """
+    FIFO-in-memory connection feeding Moler connection directly inside caller's thread.
+
+    Data injected (or echoed) is passed into moler_connection before inject()/write() returns.
+    No thread, no polling - together with 'inline' runner observer is done (or known as not done)
+    right after injection. Usable for parser tests.
+    """
+    def __init__(self, moler_connection, echo=True, name=None, logger_name=""):
+        """Initialization of FIFO-mem-inline connection."""
+        super(InlineFifoBuffer, self).__init__(moler_connection=moler_connection,
+                                               echo=echo,
+                                               name=name,
+                                               logger_name=logger_name)
+        self._delivering = False
+
+    def open(self):
+        """Nothing to start - data is delivered by inject()/write() itself."""
+        ret = super(InlineFifoBuffer, self).open()
+        self._log(msg="open {}".format(self), level=logging.INFO)
+        self._notify_on_connect()
+        return ret
+
+    def close(self):
+        """Nothing to stop."""
+        super(InlineFifoBuffer, self).close()
+        self._log(msg="closed {}".format(self), level=logging.INFO)
+        self._notify_on_disconnect()
+
+    def _inject(self, data):
+        """Add bytes to end of buffer and pass them into moler_connection."""
+        super(InlineFifoBuffer, self)._inject(data)
+        self._deliver()
+
+    def _deliver(self):
+        if self._delivering:
+            return  # injected from inside data_received() - outer _deliver() passes it after current data
+        self._delivering = True
+        try:
+            while self.buffer:
+                self.read()  # internally forwards to embedded Moler connection
+        finally:
+            self._delivering = False
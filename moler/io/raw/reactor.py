@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+IO reactor - one thread multiplexing reads of many external-IO connections.
+
+Threaded connections pull data inside dedicated thread each (many threads, many idle select calls).
+Reactor registers file descriptors (terminal fd, socket) of all connections in one selector (epoll on Linux)
+and calls readable-callback of connection only when there is data to read.
+Callbacks are run inside reactor thread so they should only read and forward data into moler_connection.
+
+Python 3 only (uses selectors module).
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import logging
+import os
+import selectors
+import threading
+
+
+_reactors = list()
+_reactors_lock = threading.Lock()
+_pool_size = 1
+
+
+def set_pool_size(size):
+    """
+    Set how many reactor threads may be used by connections. Connection is registered in least loaded reactor.
+
+    :param size: max number of reactor threads
+    :return: None
+    """
+    global _pool_size
+    if size < 1:
+        raise ValueError("Reactor pool size must be >= 1 (got {})".format(size))
+    _pool_size = size
+
+
+def get_reactor():
+    """
+    Return reactor to register connection in.
+
+    :return: IoReactor object (least loaded one from pool)
+    """
+    with _reactors_lock:
+        if len(_reactors) < _pool_size:
+            reactor = IoReactor(name="MolerIoReactor-{}".format(len(_reactors)))
+            _reactors.append(reactor)
+            return reactor
+        return min(_reactors[:_pool_size], key=lambda reactor: reactor.registered_count)
+
+
+class IoReactor(object):
+    def __init__(self, name="MolerIoReactor"):
+        """
+        Create reactor. Its thread is started when first file object is registered.
+
+        :param name: name of reactor thread
+        """
+        self.name = name
+        self.logger = logging.getLogger('moler.io.reactor')
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending = list()  # (operation, fileobj, callback, done_event) applied by reactor thread
+        self._registered_count = 0
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_write, False)  # full pipe already wakes reactor up
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ, None)
+        self._thread = None
+        self._stopped = False  # no more registrations accepted
+        self._stop_requested = False  # reactor thread should exit its loop
+
+    @property
+    def registered_count(self):
+        """Number of file objects registered in reactor."""
+        return self._registered_count
+
+    def register(self, fileobj, on_readable):
+        """
+        Start calling on_readable() whenever fileobj has data to read.
+
+        :param fileobj: file descriptor or object with fileno() method
+        :param on_readable: callable without parameters run inside reactor thread. Returns False to stop
+         watching fileobj (like on end of file).
+        :return: None
+        """
+        self._schedule(operation='register', fileobj=fileobj, callback=on_readable)
+
+    def unregister(self, fileobj):
+        """
+        Stop watching fileobj. When called outside reactor thread returns after reactor applied it so
+        on_readable() of fileobj is not running and won't be called any more.
+
+        :param fileobj: file object passed to register()
+        :return: None
+        """
+        self._schedule(operation='unregister', fileobj=fileobj, callback=None)
+
+    def stop(self):
+        """
+        Stop reactor thread and close its selector and wakeup pipe. Registered file objects are not closed.
+        When called outside reactor thread returns after reactor thread has finished.
+
+        :return: None
+        """
+        with _reactors_lock:
+            if self in _reactors:
+                _reactors.remove(self)  # don't give stopped reactor to new connections
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            thread = self._thread
+            if thread is not None:
+                self._pending.append(('stop', None, None, None))
+                self._wakeup()
+        if thread is None:
+            self._close()
+        elif threading.current_thread() is not thread:
+            thread.join()
+
+    def _schedule(self, operation, fileobj, callback):
+        in_reactor_thread = threading.current_thread() is self._thread
+        done = None if in_reactor_thread else threading.Event()
+        with self._lock:
+            if self._stopped:
+                if operation == 'register':
+                    raise RuntimeError("Can't register {} in stopped {}".format(fileobj, self.name))
+                return  # stopped reactor doesn't watch anything
+            self._pending.append((operation, fileobj, callback, done))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name)
+                self._thread.daemon = True
+                self._thread.start()
+            self._wakeup()
+        if done is not None:
+            done.wait()
+
+    def _wakeup(self):
+        # called holding self._lock so pipe is not closed meanwhile
+        try:
+            os.write(self._wakeup_write, b'x')
+        except BlockingIOError:
+            pass
+
+    def _apply_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, list()
+        for operation, fileobj, callback, done in pending:
+            try:
+                if operation == 'register':
+                    self._selector.register(fileobj, selectors.EVENT_READ, callback)
+                    self._registered_count += 1
+                elif operation == 'unregister':
+                    self._selector.unregister(fileobj)
+                    self._registered_count -= 1
+                else:
+                    self._stop_requested = True
+            except (KeyError, ValueError, OSError) as exc:
+                self.logger.warning("Can't {} {} in {}: {!r}".format(operation, fileobj, self.name, exc))
+            if done is not None:
+                done.set()
+
+    def _loop(self):
+        try:
+            while True:
+                self._apply_pending()
+                if self._stop_requested:
+                    break
+                for key, _ in self._selector.select():
+                    if key.data is None:  # wakeup pipe
+                        os.read(self._wakeup_read, 4096)
+                        continue
+                    if self._selector.get_map().get(key.fd) is key:  # not unregistered by previous callback
+                        self._call_on_readable(key)
+        finally:
+            self._close()
+
+    def _close(self):
+        with self._lock:
+            self._selector.close()
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
+
+    def _call_on_readable(self, key):
+        try:
+            keep_watching = key.data()
+        except Exception as exc:
+            self.logger.exception("Reading {} inside {} failed: {!r}".format(key.fileobj, self.name, exc))
+            keep_watching = False
+        if keep_watching is False:
+            self.unregister(key.fileobj)
+            self._apply_pending()
@@ -214,3 +214,59 @@ class ThreadedTcp(Tcp):
                 break
         if self.socket is not None:
             self._close_ignoring_exceptions()
+
+
+class ReactorTcp(Tcp):
+    """
+    TCP connection feeding Moler's connection from IO reactor thread. Python 3 only!
+
+    Reactor thread is shared by many connections so there is no dedicated thread per socket.
+    """
+
+    def __init__(self, moler_connection,
+                 port, host="localhost", receive_buffer_size=64 * 4096,
+                 logger=None):
+        """Initialization of TCP-reactor connection."""
+        super(ReactorTcp, self).__init__(port=port, host=host,
+                                         receive_buffer_size=receive_buffer_size,
+                                         logger=logger)
+        self._reactor = None
+        # make Moler happy (3 requirements) :-)
+        self.moler_connection = moler_connection  # (1)
+        self.moler_connection.how2send = self.send  # (2)
+
+    def open(self):
+        """Open TCP connection & register it in IO reactor."""
+        from moler.io.raw.reactor import get_reactor
+        ret = super(ReactorTcp, self).open()
+        self._reactor = get_reactor()
+        self._reactor.register(self.socket, self._read_data)
+        return ret
+
+    def close(self):
+        """Unregister TCP connection from IO reactor & close it."""
+        if self._reactor:
+            if self.socket is not None:
+                self._reactor.unregister(self.socket)
+            self._reactor = None
+        super(ReactorTcp, self).close()
+
+    def _read_data(self):
+        """
+        Read data available on socket and forward it to moler_connection (called by IO reactor).
+
+        :return: False if connection is closed, True otherwise.
+        """
+        try:
+            data = self.socket.recv(self.receive_buffer_size)
+        except socket.error as serr:
+            self._debug('receive error {!r} on {}'.format(serr, self))
+            data = None
+        if not data:  # remote endpoint disconnected - close socket as ThreadedTcp does
+            self._close_ignoring_exceptions()
+            self._debug('{} disconnected by remote endpoint'.format(self))
+            self._reactor = None  # reactor unregisters socket since we return False
+            return False
+        self._debug('< {}'.format(data))
+        self.moler_connection.data_received(data)  # (3)
+        return True
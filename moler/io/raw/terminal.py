@@ -39,6 +39,7 @@ class ThreadedTerminal(IOConnection):
         self._shell_operable = Event()
         self._export_sent = False
         self.pulling_thread = None
+        self._read_buffer = ""  # data read before shell is operable
 
         self._select_timeout = select_timeout
         self._read_buffer_size = read_buffer_size
@@ -57,11 +58,7 @@ class ThreadedTerminal(IOConnection):
             # need to not replace not unicode data instead of raise exception
             self._terminal.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
 
-            done = Event()
-            self.pulling_thread = TillDoneThread(target=self.pull_data,
-                                                 done_event=done,
-                                                 kwargs={'pulling_done': done})
-            self.pulling_thread.start()
+            self._start_pulling()
             retry = 0
             is_operable = False
 
@@ -76,9 +73,7 @@ class ThreadedTerminal(IOConnection):
 
     def close(self):
         """Close ThreadedTerminal connection & stop pulling thread."""
-        if self.pulling_thread:
-            self.pulling_thread.join()
-            self.pulling_thread = None
+        self._stop_pulling()
         super(ThreadedTerminal, self).close()
 
         if self._terminal and self._terminal.isalive():
@@ -90,9 +85,22 @@ class ThreadedTerminal(IOConnection):
         """Write data into ThreadedTerminal connection."""
         self._terminal.write(data)
 
+    def _start_pulling(self):
+        """Start thread pulling data from terminal."""
+        done = Event()
+        self.pulling_thread = TillDoneThread(target=self.pull_data,
+                                             done_event=done,
+                                             kwargs={'pulling_done': done})
+        self.pulling_thread.start()
+
+    def _stop_pulling(self):
+        """Stop thread pulling data from terminal."""
+        if self.pulling_thread:
+            self.pulling_thread.join()
+            self.pulling_thread = None
+
     def pull_data(self, pulling_done):
         """Pull data from ThreadedTerminal connection."""
-        read_buffer = ""
         reads = []
 
         while not pulling_done.is_set():
@@ -104,22 +112,70 @@ class ThreadedTerminal(IOConnection):
                 pulling_done.set()
 
             if self._terminal.fd in reads:
-                try:
-                    data = self._terminal.read(self._read_buffer_size)
-                    self.logger.debug("<|{}".format(data))
-
-                    if self._shell_operable.is_set():
-                        self.data_received(data)
-                    else:
-                        read_buffer = read_buffer + data
-                        if re.search(self.target_prompt, read_buffer, re.MULTILINE):
-                            self._notify_on_connect()
-                            self._shell_operable.set()
-                            data = re.sub(self.target_prompt, '', read_buffer, re.MULTILINE)
-                            self.data_received(data)
-                        elif not self._export_sent and re.search(self.first_prompt, read_buffer, re.MULTILINE):
-                            self.send(self.set_prompt_cmd)
-                            self._export_sent = True
-                except EOFError:
-                    self._notify_on_disconnect()
+                if not self._read_data():
                     pulling_done.set()
+
+    def _read_data(self):
+        """
+        Read data available on terminal and forward it to moler_connection.
+
+        :return: False if terminal is disconnected, True otherwise.
+        """
+        try:
+            data = self._terminal.read(self._read_buffer_size)
+            self.logger.debug("<|{}".format(data))
+
+            if self._shell_operable.is_set():
+                self.data_received(data)
+            else:
+                self._read_buffer = self._read_buffer + data
+                if re.search(self.target_prompt, self._read_buffer, re.MULTILINE):
+                    self._notify_on_connect()
+                    self._shell_operable.set()
+                    data = re.sub(self.target_prompt, '', self._read_buffer, re.MULTILINE)
+                    self.data_received(data)
+                elif not self._export_sent and re.search(self.first_prompt, self._read_buffer, re.MULTILINE):
+                    self.send(self.set_prompt_cmd)
+                    self._export_sent = True
+        except EOFError:
+            self._notify_on_disconnect()
+            return False
+        return True
+
+
+class ReactorTerminal(ThreadedTerminal):
+    """
+    Works on Unix (like Linux) systems only! Python 3 only!
+
+    ReactorTerminal is shell working under Pty. Its data is read by IO reactor thread shared by many connections
+    instead of dedicated pulling thread.
+    """
+
+    def __init__(self, moler_connection, cmd="/bin/bash", read_buffer_size=4096, first_prompt=r'[%$#]+',
+                 target_prompt=r'^moler_bash#', set_prompt_cmd='export PS1="moler_bash# "\n', dimensions=(100, 300)):
+        """
+        :param moler_connection: Moler's connection to join with
+        :param cmd: command to run terminal
+        :param read_buffer_size: buffer for reading data from terminal
+        :param first_prompt: default terminal prompt on host where Moler is starting
+        :param target_prompt: new prompt which will be set on terminal
+        :param set_prompt_cmd: command to change prompt with new line char on the end of string
+        :param dimensions: dimensions of the psuedoterminal
+        """
+        super(ReactorTerminal, self).__init__(moler_connection=moler_connection, cmd=cmd,
+                                              read_buffer_size=read_buffer_size, first_prompt=first_prompt,
+                                              target_prompt=target_prompt, set_prompt_cmd=set_prompt_cmd,
+                                              dimensions=dimensions)
+        self._reactor = None
+
+    def _start_pulling(self):
+        """Register terminal in IO reactor."""
+        from moler.io.raw.reactor import get_reactor
+        self._reactor = get_reactor()
+        self._reactor.register(self._terminal.fd, self._read_data)
+
+    def _stop_pulling(self):
+        """Unregister terminal from IO reactor."""
+        if self._reactor:
+            self._reactor.unregister(self._terminal.fd)
+            self._reactor = None
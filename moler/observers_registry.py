@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Registry of commands and events available in packages (like moler.cmd.unix).
+
+Registry maps observer_name into class fullname, like: 'ip_addr' --> 'moler.cmd.unix.ip_addr.IpAddr'.
+It is built once per process for each package by reading source code of package modules, so modules of
+commands/events are not imported here. They are imported when command/event object is created.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import ast
+import importlib
+import inspect
+import io
+import os
+import pkgutil
+import threading
+
+from moler.helpers import camel_case_to_lower_case_underscore
+
+_observers_in_package = dict()  # package name -> {observer_name: class fullname}
+_registry_lock = threading.Lock()
+_blocks_at_module_level = ('If', 'Try', 'TryExcept', 'TryFinally', 'ExceptHandler', 'With')
+
+
+def get_observers_in_package(package_name):
+    """
+    Return commands/events defined in package.
+
+    :param package_name: name of package with modules of commands/events, like 'moler.cmd.unix'
+    :return: dict {observer_name: class fullname}. Don't modify it - it is shared by all callers.
+    """
+    with _registry_lock:
+        if package_name not in _observers_in_package:
+            _observers_in_package[package_name] = _find_observers_in_package(package_name)
+        return _observers_in_package[package_name]
+
+
+def clear():
+    """Forget registered packages (next get_observers_in_package() reads them again)."""
+    with _registry_lock:
+        _observers_in_package.clear()
+
+
+def _find_observers_in_package(package_name):
+    observers = dict()
+    package = importlib.import_module(package_name)
+    for importer, modname, is_pkg in pkgutil.iter_modules(package.__path__):
+        module_name = "{}.{}".format(package_name, modname)
+        class_names = None
+        source_path = _module_source_path(package.__path__, modname)
+        if source_path:
+            class_names = _class_names_from_source(source_path)
+        if class_names is None:  # no source or can't parse it
+            class_names = _class_names_from_import(module_name)
+        for class_name in class_names:
+            # like:  IpAddr --> ip_addr    (the same as ConnectionObserver.observer_name)
+            observer_name = camel_case_to_lower_case_underscore(class_name)
+            # like:  IpAddr --> moler.cmd.unix.ip_addr.IpAddr
+            observers[observer_name] = "{}.{}".format(module_name, class_name)
+    return observers
+
+
+def _module_source_path(package_paths, modname):
+    for package_path in package_paths:
+        source_path = os.path.join(package_path, "{}.py".format(modname))
+        if os.path.isfile(source_path):
+            return source_path
+    return None
+
+
+def _class_names_from_source(source_path):
+    """Return names of classes defined at top level of module (also inside top level if/try blocks)."""
+    try:
+        with io.open(source_path, 'rb') as source_file:
+            tree = ast.parse(source_file.read(), filename=source_path)
+    except (IOError, SyntaxError, ValueError):
+        return None
+    class_names = list()
+    statements = list(tree.body)
+    while statements:
+        statement = statements.pop(0)
+        if isinstance(statement, ast.ClassDef):
+            class_names.append(statement.name)
+        elif type(statement).__name__ in _blocks_at_module_level:
+            for block in ('body', 'orelse', 'finalbody', 'handlers'):
+                statements.extend(getattr(statement, block, None) or [])
+    return class_names
+
+
+def _class_names_from_import(module_name):
+    module = importlib.import_module(module_name)
+    return [class_name for (class_name, class_obj) in inspect.getmembers(module, inspect.isclass)
+            if class_obj.__module__ == module_name]
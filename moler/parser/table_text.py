@@ -2,6 +2,7 @@
 """
 Last modification: adding support for EPC tables and partially empty tables changes till 23.05.2018
                    added adjustements for project requirements
+                   everything compiled once, values cut by offsets of columns (found in header line)
 Commad TableText is parsing Linux Command to according to headers and columns (adjusted)
 For initialization it is getting 4 parameters (2 required 2 optional)
 Required parameters:
@@ -11,7 +12,12 @@ Optional parameters:
 _skip --> regexp for skipping line
 _finish --> regexp for finishing parsing (next parse execution will not give any line)
 Value_splitter --> value for splitting values in line by default 1+ spaces
-WARNING ==> in current version no special signs or spaces are allowed in Name field (header key regexp)
+converters --> dict key -> function converting value of column (by default convert_data_to_type)
+convert_values --> if False then values of columns without converter are kept as strings
+last_column_free_text --> if True then values are not assigned by positions of headers - line is split into as many
+                          values as there are columns, only last column may contain splitter (like command of process);
+                          line with less values than columns is not a row of table (parse() returns None)
+Column of value is found by end position of value: value belongs to column if it ends before header of next column.
 """
 
 __author__ = 'Rosinski Dariusz'
@@ -19,28 +25,38 @@ __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'dariusz.rosinski@nokia.com'
 
 import re
+from bisect import bisect_right
 
 
 class TableText:
 
     def __init__(self, _header_regexps, _header_keys, _skip='',
-                 _finish='', value_splitter=r'\s+'):
+                 _finish='', value_splitter=r'\s+', converters=None, convert_values=True, last_column_free_text=False):
         self._header_regexps = _header_regexps  # array of regexps defining header parts
-        self._header_keys = _header_keys  # array of keys returned for matched header parts
+        self._header_keys = list(_header_keys)  # array of keys returned for matched header parts
         self._skip = _skip  # regexp to be used to find lines that should be skipped
         self._finish = _finish  # regexp that shows we have finished table processing
         self._finish_found = 0  # flag for matching finish regexp
         self._found = None
         self._value_splitter = value_splitter
+        self._converters = converters if converters is not None else dict()  # key -> function converting value
+        self._convert_values = convert_values
+        self._last_column_free_text = last_column_free_text
 
         self.header_regexp_groups = self.build_hdr_groups()
         self.header_positions = []  # array of "column position" of header
+        self._columns_boundaries = []  # start positions of headers except first one (end of previous column)
+        self._re_header = re.compile(self.header_regexp_groups)
+        self._re_skip = re.compile(_skip) if _skip != '' else None
+        self._re_finish = re.compile(_finish) if _finish != '' else None
+        self._re_value_splitter = re.compile(value_splitter)
+        self._column_converters = [self._get_converter(key) for key in self._header_keys]
 
     def build_hdr_groups(self):
         '''
         Function for building group of headers. If not enough keys defined name COL_x will be added at the end
-        :return: regexp allowing to read headers group with column names in format (?P<name>regexp) what allows to
-        read assign correct name for matched value
+        :return: regexp allowing to read headers group with column in format (?P<_col_index>regexp) what allows to
+        read position of each header
         '''
         hdr_groups = ''
         amount_of_keys = len(self._header_keys)
@@ -51,9 +67,8 @@ class TableText:
                 self._header_keys.append("COL_" + str(index))
         for index in range(amount_of_regexps):
             regexp = self._header_regexps[index]
-            name = self._header_keys[index]
-            # add dictionary keys to regexp
-            group_re = '(?P<' + name + '>' + regexp + ')'
+            # groups are named by index since keys may contain chars not allowed in names of groups (like %CPU)
+            group_re = '(?P<_col_{}>{})'.format(index, regexp)
             hdr_groups += '.*' + group_re
         return hdr_groups
 
@@ -63,99 +78,70 @@ class TableText:
         :return: returns result dictionary according to your header regexps set during initialization
                  returns None when nothing was found or headers when values were found
         '''
-        result = dict()
         # looking for finish pareser. If found stop processing
-        if re.match(r'^\s*$', data):
+        if not data.strip():
             return None
-        finish = self._finish
-        if finish != '' and re.search(finish, data):
+        if self._re_finish is not None and self._re_finish.search(data):
             self._finish_found = True
         if self._finish_found:
             return None
         # looking for skip keyword
-        skip = self._skip
-        if skip != '' and re.search(skip, data):
+        if self._re_skip is not None and self._re_skip.search(data):
             return None
-        hdr_regexp = self.header_regexp_groups
-        compiled_header_re = re.compile(hdr_regexp)
         # finding header in line until headers are found
         if not self.header_positions:
-            header_search_result = re.search(compiled_header_re, data)
-            if header_search_result is not None:
-                groups_found = header_search_result.groupdict()
-                for index in range(0, len(self._header_keys), 1):
-                    hdr_name = self._header_keys[index]
-                    hdr_value = groups_found[hdr_name]
+            self._parse_header(data)
+            return None
+        if self._last_column_free_text:
+            return self._parse_values_in_order(data)
+        return self._parse_values_by_positions(data)
+
+    def _parse_header(self, data):
+        header_search_result = self._re_header.search(data)
+        if header_search_result is not None:
+            for index in range(len(self._header_regexps)):
+                hdr_value = header_search_result.group('_col_{}'.format(index))
+                try:
                     hdr_value_searched = re.search(r'\b' + hdr_value + r'\b', data)
-                    self.header_positions.append(hdr_value_searched)
-        else:
-            header_keys_number = len(self._header_keys)
-            # split values into table of values
-            split_values = re.split(self._value_splitter, str.strip(str(data)))
-            # connect values and end of them in order to manage them correclty
-            split_values_positions = self.split_with_end_position(split_values, data)
-            value_index = 0
-            data_key = self._header_keys
-            for header_index in range(0, header_keys_number, 1):
-                res, value_index = self.get_value_for_header(header_index,
-                                                             split_values_positions, value_index)
-                result[data_key[header_index]] = res
-            return result
-
-    def get_value_for_header(self, current_header_position, values, start_value_index):
-        '''
-        :param current_header_position: matched headers positions (get with re.search(regexp, line)) for which search
-            will take place
-        :param values: values connected into list
-        :param start_value_index: current start from which search will take place
-        :return: Returns found value for specific header
-        '''
-        value_index = 0
-        connected_value = ''
-        if current_header_position + 1 < len(self.header_positions):
-            next_header_position = self.header_positions[current_header_position + 1]
-            # for values that stayed in search
-            for i in range(len(values[start_value_index:])):
-                # check if value end is on position of start of next header
-                if values[start_value_index + i]['end'] >= next_header_position.start():
-                    if not connected_value:
-                        connected_value = ' '
-                    break
+                except re.error:
+                    hdr_value_searched = None
+                if hdr_value_searched is not None:
+                    self.header_positions.append(hdr_value_searched.start())
                 else:
-                    connected_value += " " + values[start_value_index + i]['value']
-                    value_index += 1
-            # if values were connected then set it to data value in other case set only passed value for index
-            if connected_value:
-                data_value = connected_value
-                value_index -= 1
-            else:
-                data_value = ''
-        else:
-            for i in range(len(values[start_value_index:])):
-                connected_value += " " + values[start_value_index + i]["value"]
-            data_value = connected_value
-        data_value = str.strip(str(data_value))
-        return self.convert_data_to_type(data_value), start_value_index + value_index + 1
+                    self.header_positions.append(header_search_result.start('_col_{}'.format(index)))
+            self._columns_boundaries = self.header_positions[1:]
 
-    @staticmethod
-    def split_with_end_position(values, data):
-        '''
-        :param values: values splitted from data
-        :param data: data full line with values in raw form
-        :return: returns list of dictionary where each dict contains 2 keys 'value' and 'end' which is end position of
-            string
-        '''
-        current_value = values[0]
-        current_end = re.search(r'[\b\s]??' + current_value + r'[\b\s]??', data).end()
-        result = list()
-        result.append({'value': current_value, 'end': current_end})
-        for i in range(1, len(values), 1):
-            current_value = values[i]
-            current_search = re.search(r'[\b\s]??' + re.escape(values[i]) + r'[\b\s]??', data[current_end:])
-            current_end += current_search.end()
-            result.append({'value': current_value, 'end': current_end})
+    def _parse_values_by_positions(self, data):
+        columns_values = [[] for _ in self._header_keys]
+        last_column = len(self._header_keys) - 1
+        boundaries = self._columns_boundaries
+        value_end = 0
+        # split values into table of values, column of value is found by end position of value in line
+        for value in self._re_value_splitter.split(data.strip()):
+            value_end = data.find(value, value_end) + len(value)
+            column = bisect_right(boundaries, value_end)
+            columns_values[column if column < last_column else last_column].append(value)
+        return self._build_result(" ".join(values).strip() for values in columns_values)
+
+    def _parse_values_in_order(self, data):
+        values = self._re_value_splitter.split(data.strip(), len(self._header_keys) - 1)
+        if len(values) < len(self._header_keys):
+            return None
+        return self._build_result(values)
+
+    def _build_result(self, values):
+        result = dict()
+        for key, converter, value in zip(self._header_keys, self._column_converters, values):
+            result[key] = converter(value) if converter is not None else value
         return result
 
+    def _get_converter(self, key):
+        if key in self._converters:
+            return self._converters[key]
+        if self._convert_values:
+            return self.convert_data_to_type
+        return None
+
     @staticmethod
     def convert_data_to_type(data):
         # when casting wrong type Value Error will be raised
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Runner without any thread - connection-observers are fed inside caller's thread.
+
+Intended for connections delivering data directly inside thread calling inject()/write()
+(like moler.io.raw.memory.InlineFifoBuffer): submit() subscribes observer and sends command,
+data injected afterwards is parsed before injection returns. So, when caller comes to await
+observer it is either done or it will never become done - there is nobody else to feed it.
+Such observer is timed out at once instead of awaiting its timeout.
+
+Usable for parser tests (cmds_events_doc checks) - no thread pool, no ticks.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+
+from moler.runner import ConnectionObserverRunner
+from moler.runner import his_remaining_time
+from moler.runner import result_for_runners
+from moler.runner import time_out_observer
+
+
+class InlineRunner(ConnectionObserverRunner):
+    def __init__(self):
+        """Create runner feeding connection-observers inside caller's thread."""
+        self._in_shutdown = False
+        self.logger = logging.getLogger('moler.runner.inline')
+        self.logger.debug("created")
+
+    def shutdown(self):
+        """Nothing to cleanup - runner has no threads."""
+        self._in_shutdown = True
+
+    def submit(self, connection_observer):
+        """
+        Subscribe connection observer for data and send its command (if it is command).
+        Returns Future that is done when connection_observer is done.
+        """
+        assert connection_observer.start_time > 0.0  # connection-observer lifetime should already been started
+        remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                              from_start_time=connection_observer.start_time)
+        self.logger.debug("go inline: {!r} - {}".format(connection_observer, msg))
+
+        observer_lock = threading.Lock()  # same API as CancellableFuture of threaded runner
+        connection_observer_future = Future()
+        connection_observer_future.observer_lock = observer_lock
+        connection_observer_future.set_running_or_notify_cancel()
+
+        subscribed_data_receiver = self._start_feeding(connection_observer, observer_lock)
+        connection_observer.add_done_callback(partial(self._observer_done_callback, connection_observer_future,
+                                                      subscribed_data_receiver))
+        if connection_observer.is_command():
+            connection_observer.send_command()  # response may be parsed (and observer done) before send returns
+        return connection_observer_future
+
+    def wait_for(self, connection_observer, connection_observer_future, timeout=None):
+        """
+        Return at once - observer not done yet has no chance to get data while caller waits so it is timed out.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :param timeout: Max time (in float seconds) you want to await before you give up. If None then taken from connection_observer
+        :return: None
+        """
+        if connection_observer.done():
+            self.logger.debug("go foreground: {} is already done".format(connection_observer))
+            return None
+        self._time_out(connection_observer, timeout=timeout if timeout else connection_observer.timeout)
+        return None
+
+    def wait_for_iterator(self, connection_observer, connection_observer_future):
+        """
+        Version of wait_for() intended to be used by Python3 to implement iterable/awaitable object.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :return: iterator
+        """
+        if not connection_observer.done():
+            self._time_out(connection_observer, timeout=connection_observer.timeout)
+        while not connection_observer_future.done():
+            yield None
+        res = result_for_runners(connection_observer)
+        raise StopIteration(res)  # Python 2 compatibility
+
+    def feed(self, connection_observer):
+        """
+        Feeds connection_observer with data to let it become done.
+
+        Nothing to do here - data is pushed into observer by connection via secure_data_received().
+        """
+        pass
+
+    def timeout_change(self, timedelta):
+        """
+        Call this method to notify runner that timeout has been changed in observer.
+        Nothing to do here - runner doesn't track time.
+
+        :param timedelta: delta timeout in float seconds
+        :return: Nothing
+        """
+        pass
+
+    def _start_feeding(self, connection_observer, observer_lock):
+        """
+        Start feeding connection_observer by establishing data-channel from connection to observer.
+        """
+
+        def secure_data_received(data):
+            try:
+                if connection_observer.done() or self._in_shutdown:
+                    return  # even not unsubscribed secure_data_received() won't pass data to done observer
+                with observer_lock:
+                    connection_observer.data_received(data)
+
+            except Exception as exc:
+                # observers should not raise exceptions during data parsing
+                # but if they do so - we fix it
+                self.logger.exception("{} failed on data {!r}".format(connection_observer, data))
+                with observer_lock:
+                    connection_observer.set_exception(exc)
+
+        moler_conn = connection_observer.connection
+        self.logger.debug("subscribing for data {}".format(connection_observer))
+        moler_conn.subscribe(secure_data_received)
+        connection_observer._log(logging.INFO, "{} started".format(connection_observer.get_long_desc()))
+        return secure_data_received  # to know what to unsubscribe
+
+    def _observer_done_callback(self, connection_observer_future, subscribed_data_receiver, connection_observer):
+        # Called inside set_result()/set_exception() - maybe holding observer_lock, so we must not take it here.
+        connection_observer.connection.unsubscribe(subscribed_data_receiver)
+        connection_observer._log(logging.INFO, "{} finished".format(connection_observer.get_short_desc()))
+        self.logger.debug("{} finished".format(connection_observer))
+        connection_observer_future.set_result(None)
+
+    def _time_out(self, connection_observer, timeout):
+        passed = time.time() - connection_observer.start_time
+        time_out_observer(connection_observer=connection_observer,
+                          timeout=timeout, passed_time=passed,
+                          runner_logger=self.logger, kind="await_done")
+        if not connection_observer.done():
+            # on_timeout() might have sent something breaking command - its output is already parsed
+            connection_observer.set_end_of_life()
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+Runner using single timer thread for all connection-observers.
+
+Data path is the same as for ThreadPoolExecutorRunner - observer is subscribed to connection
+and gets data inside connection's thread via secure_data_received().
+The difference is in time path: instead of one polling thread per observer we have one
+timer thread sleeping on heap of deadlines. It wakes up only when nearest deadline passes
+or when some observer changes its timeout.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski, Michal Ernst'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.ernst@nokia.com'
+
+import atexit
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+
+from moler.runner import ConnectionObserverRunner
+from moler.runner import his_remaining_time
+from moler.runner import result_for_runners
+from moler.runner import time_out_observer
+
+
+class _ObserverFeed(object):
+    """Runner's bookkeeping of single submitted connection-observer."""
+
+    def __init__(self, connection_observer, future, observer_lock):
+        self.connection_observer = connection_observer
+        self.future = future
+        self.observer_lock = observer_lock
+        self.subscribed_data_receiver = None
+        self.terminating_start_time = None  # set when observer enters terminating phase
+        self.finished = False
+
+    def deadline(self):
+        """
+        :return: time (as from time.time()) when runner should check this observer again
+        """
+        observer = self.connection_observer
+        if self.terminating_start_time is not None:
+            return self.terminating_start_time + observer.terminating_timeout
+        return observer.start_time + observer.timeout
+
+
+class RunnerSingleThread(ConnectionObserverRunner):
+    def __init__(self):
+        """Create runner with single timer thread serving timeouts of all submitted connection-observers."""
+        self._in_shutdown = False
+        self.logger = logging.getLogger('moler.runner.single-thread')
+        self._timers = list()  # heap of (deadline, sequence_nb, feed)
+        self._timers_condition = threading.Condition()
+        self._timers_changed = False  # some observer changed its timeout - deadlines must be recalculated
+        self._finished_feeds_in_heap = 0
+        self._sequence = itertools.count()  # to avoid comparing feeds for equal deadlines
+        self._timer_thread = threading.Thread(target=self._timer_loop, name="RunnerSingleThread")
+        self._timer_thread.daemon = True
+        self._timer_thread.start()
+        self.logger.debug("created")
+        atexit.register(self.shutdown)
+
+    def shutdown(self):
+        """Cleanup used resources - cancel all running connection-observers and stop timer thread."""
+        if self._in_shutdown:
+            return
+        self.logger.debug("shutting down")
+        with self._timers_condition:
+            self._in_shutdown = True
+            feeds = [feed for (_, _, feed) in self._timers if not feed.finished]
+            self._timers = list()
+            self._timers_condition.notify()
+        for feed in feeds:
+            self.logger.debug("shutdown so cancelling {}".format(feed.connection_observer))
+            feed.connection_observer.cancel()
+            self._feed_finished(feed)
+        if self._timer_thread is not threading.current_thread():
+            self._timer_thread.join(timeout=1.0)
+
+    def submit(self, connection_observer):
+        """
+        Submit connection observer to background execution.
+        Returns Future that could be used to await for connection_observer done.
+        """
+        assert connection_observer.start_time > 0.0  # connection-observer lifetime should already been started
+        observer_timeout = connection_observer.timeout
+        remain_time, msg = his_remaining_time("remaining", timeout=observer_timeout,
+                                              from_start_time=connection_observer.start_time)
+        self.logger.debug("go background: {!r} - {}".format(connection_observer, msg))
+
+        observer_lock = threading.Lock()  # against threads race write-access to observer
+        connection_observer_future = Future()
+        connection_observer_future.observer_lock = observer_lock  # same API as CancellableFuture of threaded runner
+        connection_observer_future.set_running_or_notify_cancel()
+        feed = _ObserverFeed(connection_observer, connection_observer_future, observer_lock)
+
+        feed.subscribed_data_receiver = self._start_feeding(connection_observer, observer_lock)
+        self._schedule(feed)
+        connection_observer.add_done_callback(partial(self._observer_done_callback, feed))
+        if connection_observer.is_command():
+            connection_observer.send_command()
+        return connection_observer_future
+
+    def wait_for(self, connection_observer, connection_observer_future, timeout=None):
+        """
+        Await for connection_observer running in background or timeout.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :param timeout: Max time (in float seconds) you want to await before you give up. If None then taken from connection_observer
+        :return:
+        """
+        if connection_observer.done():
+            self.logger.debug("go foreground: {} is already done".format(connection_observer))
+            return None
+
+        max_timeout = timeout
+        observer_timeout = connection_observer.timeout
+        # we count timeout from now if timeout is given; else we use .start_time and .timeout of observer
+        start_time = time.time() if max_timeout else connection_observer.start_time
+        await_timeout = max_timeout if max_timeout else observer_timeout
+        if max_timeout:
+            remain_time, msg = his_remaining_time("await max.", timeout=max_timeout, from_start_time=start_time)
+        else:
+            remain_time, msg = his_remaining_time("remaining", timeout=observer_timeout, from_start_time=start_time)
+        self.logger.debug("go foreground: {} - {}".format(connection_observer, msg))
+
+        # Future may be still None (command waiting in commands queue) - we don't need it.
+        # Completion event is set whoever makes observer done: data path, timer thread or commands queue.
+        observer_done = threading.Event()
+        done_callback = partial(_set_event, observer_done)
+        connection_observer.add_done_callback(done_callback)
+        try:
+            if max_timeout:
+                if not observer_done.wait(remain_time):
+                    self._wait_for_time_out(connection_observer, timeout=await_timeout)
+                    if (not connection_observer.done()) and (connection_observer.terminating_timeout > 0.0):
+                        self._start_terminating(connection_observer)
+                        observer_done.wait(connection_observer.terminating_timeout)
+            else:
+                eol_remain_time = remain_time + connection_observer.terminating_timeout
+                while (not observer_done.is_set()) and (eol_remain_time > 0.0):
+                    observer_done.wait(eol_remain_time)
+                    # observer may change its timeout while we are waiting
+                    already_passed = time.time() - connection_observer.start_time
+                    eol_timeout = connection_observer.timeout + connection_observer.terminating_timeout
+                    eol_remain_time = eol_timeout - already_passed
+                if not observer_done.is_set():
+                    self._wait_for_time_out(connection_observer, timeout=await_timeout)
+            if not connection_observer.done():
+                connection_observer.set_end_of_life()
+        finally:
+            connection_observer.remove_done_callback(done_callback)
+        self._await_observer_released(connection_observer)
+        return None
+
+    @staticmethod
+    def _await_observer_released(connection_observer):
+        # Done-callback fires inside set_result()/set_exception() so thread that made observer done
+        # may still be inside observer code (ex. timer thread calling on_timeout() after set_exception()).
+        # That thread holds observer_lock - wait till it releases observer.
+        future = connection_observer._future
+        if future:
+            with future.observer_lock:
+                pass
+
+    def wait_for_iterator(self, connection_observer, connection_observer_future):
+        """
+        Version of wait_for() intended to be used by Python3 to implement iterable/awaitable object.
+
+        Note: we don't have timeout parameter here. If you want to await with timeout please do use timeout machinery
+        of selected parallelism.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :return: iterator
+        """
+        while not connection_observer_future.done():
+            yield None
+        res = result_for_runners(connection_observer)
+        raise StopIteration(res)  # Python 2 compatibility
+
+    def feed(self, connection_observer):
+        """
+        Feeds connection_observer with data to let it become done.
+
+        Nothing to do here - data is pushed into observer by connection via secure_data_received()
+        and time is tracked by timer thread of runner.
+        """
+        pass
+
+    def timeout_change(self, timedelta):
+        """
+        Call this method to notify runner that timeout has been changed in observer
+        :param timedelta: delta timeout in float seconds
+        :return: Nothing
+        """
+        with self._timers_condition:
+            self._timers_changed = True
+            self._timers_condition.notify()
+
+    def _start_feeding(self, connection_observer, observer_lock):
+        """
+        Start feeding connection_observer by establishing data-channel from connection to observer.
+        """
+
+        def secure_data_received(data):
+            try:
+                if connection_observer.done() or self._in_shutdown:
+                    return  # even not unsubscribed secure_data_received() won't pass data to done observer
+                with observer_lock:
+                    connection_observer.data_received(data)
+
+            except Exception as exc:
+                # observers should not raise exceptions during data parsing
+                # but if they do so - we fix it
+                self.logger.exception("{} failed on data {!r}".format(connection_observer, data))
+                with observer_lock:
+                    connection_observer.set_exception(exc)
+            finally:
+                if connection_observer.done() and not connection_observer.cancelled():
+                    if connection_observer._exception:
+                        self.logger.debug("{} raised: {!r}".format(connection_observer, connection_observer._exception))
+                    else:
+                        self.logger.debug("{} returned: {}".format(connection_observer, connection_observer._result))
+
+        moler_conn = connection_observer.connection
+        self.logger.debug("subscribing for data {}".format(connection_observer))
+        with observer_lock:
+            moler_conn.subscribe(secure_data_received)
+            # after subscription we have data path so observer is started
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            connection_observer._log(logging.INFO, "{} started, {}".format(connection_observer.get_long_desc(), msg))
+        return secure_data_received  # to know what to unsubscribe
+
+    def _observer_done_callback(self, feed, connection_observer):
+        # Called from thread making observer done - maybe connection thread holding observer_lock,
+        # so we must not take observer_lock here.
+        self._feed_finished(feed)
+
+    def _feed_finished(self, feed):
+        with self._timers_condition:
+            if feed.finished:
+                return
+            feed.finished = True
+            self._finished_feeds_in_heap += 1
+            if self._finished_feeds_in_heap > len(self._timers) // 2:
+                self._timers_changed = True  # time to remove garbage from heap
+                self._timers_condition.notify()
+        connection_observer = feed.connection_observer
+        connection_observer.connection.unsubscribe(feed.subscribed_data_receiver)
+        connection_observer._log(logging.INFO, "{} finished".format(connection_observer.get_short_desc()))
+        self.logger.debug("{} finished".format(connection_observer))
+        feed.future.set_result(None)
+
+    def _schedule(self, feed):
+        with self._timers_condition:
+            heapq.heappush(self._timers, (feed.deadline(), next(self._sequence), feed))
+            self._timers_condition.notify()
+
+    def _rebuild_timers(self):
+        """Recalculate all deadlines and drop finished feeds. Call it holding _timers_condition."""
+        self._timers = [(feed.deadline(), seq, feed) for (_, seq, feed) in self._timers if not feed.finished]
+        heapq.heapify(self._timers)
+        self._finished_feeds_in_heap = 0
+        self._timers_changed = False
+
+    def _pop_expired_feeds(self):
+        """Wait for nearest deadline and return feeds that reached it. Call it holding _timers_condition."""
+        while not self._in_shutdown:
+            if self._timers_changed:
+                self._rebuild_timers()
+            now = time.time()
+            expired = list()
+            while self._timers and (self._timers[0][0] <= now):
+                _, _, feed = heapq.heappop(self._timers)
+                if feed.finished:
+                    self._finished_feeds_in_heap -= 1
+                else:
+                    expired.append(feed)
+            if expired:
+                return expired
+            wait_time = (self._timers[0][0] - now) if self._timers else None
+            self._timers_condition.wait(wait_time)
+        return list()
+
+    def _timer_loop(self):
+        while not self._in_shutdown:
+            with self._timers_condition:
+                expired = self._pop_expired_feeds()
+            # observers' code (on_timeout(), set_end_of_life()) runs without holding timers lock
+            for feed in expired:
+                self._handle_deadline(feed)
+
+    def _handle_deadline(self, feed):
+        connection_observer = feed.connection_observer
+        if connection_observer.done():
+            self._feed_finished(feed)
+            return
+        now = time.time()
+        if feed.deadline() > now:
+            self._schedule(feed)  # timeout got extended after heap entry was created
+            return
+        if feed.terminating_start_time is None:
+            with feed.observer_lock:
+                time_out_observer(connection_observer,
+                                  timeout=connection_observer.timeout,
+                                  passed_time=now - connection_observer.start_time,
+                                  runner_logger=self.logger)
+            if not connection_observer.done():
+                # command after timeout may still need time to break itself
+                connection_observer.in_terminating = True
+                feed.terminating_start_time = now
+                self._schedule(feed)
+        else:
+            self.logger.info("{} underlying real command failed to finish during {} seconds. It will be forcefully"
+                             " terminated".format(connection_observer, connection_observer.terminating_timeout))
+            connection_observer.set_end_of_life()
+
+    def _start_terminating(self, connection_observer):
+        connection_observer.in_terminating = True
+        with self._timers_condition:
+            for (_, _, feed) in self._timers:
+                if (feed.connection_observer is connection_observer) and (feed.terminating_start_time is None):
+                    feed.terminating_start_time = time.time()
+                    self._timers_changed = True
+                    self._timers_condition.notify()
+                    break
+
+    def _wait_for_time_out(self, connection_observer, timeout):
+        passed = time.time() - connection_observer.start_time
+        future = connection_observer._future
+        if future:
+            with future.observer_lock:
+                time_out_observer(connection_observer=connection_observer,
+                                  timeout=timeout, passed_time=passed,
+                                  runner_logger=self.logger, kind="await_done")
+        else:
+            # sorry, we don't have lock yet (it is created by runner.submit()
+            time_out_observer(connection_observer=connection_observer,
+                              timeout=timeout, passed_time=passed,
+                              runner_logger=self.logger, kind="await_done")
+
+
+def _set_event(event, connection_observer):
+    event.set()
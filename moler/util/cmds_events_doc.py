@@ -9,7 +9,9 @@ __email__ = 'grzegorz.latuszek@nokia.com', 'michal.ernst@nokia.com', 'michal.pli
 
 import collections
 import sys
+import time
 from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from importlib import import_module
 from os import walk, sep
@@ -19,14 +21,21 @@ from pprint import pformat
 from moler.command import Command
 from moler.event import Event
 from moler.helpers import compare_objects
+from moler.runner_factory import get_runner
 
 
-def _buffer_connection():
-    """External-io based on memory FIFO-buffer"""
+def _buffer_connection(inline=False):
+    """
+    External-io based on memory FIFO-buffer
+
+    :param inline: if True then injected data is passed to observers inside caller's thread (InlineFifoBuffer),
+     else it is passed by pulling thread (ThreadedFifoBuffer)
+    """
+    from moler.io.raw.memory import InlineFifoBuffer
     from moler.io.raw.memory import ThreadedFifoBuffer
     from moler.connection import ObservableConnection
 
-    class RemoteConnection(ThreadedFifoBuffer):
+    class RemoteConnection(InlineFifoBuffer if inline else ThreadedFifoBuffer):
         def remote_inject_response(self, input_strings, delay=0.0):
             """
             Simulate remote endpoint that sends response.
@@ -80,8 +89,10 @@ def _walk_moler_python_files(path, *args):
                 yield in_moler_path
 
 
-def _walk_moler_commands(path, base_class):
-    for fname in _walk_moler_python_files(path=path):
+def _walk_moler_commands(path, base_class, modules=None):
+    if modules is None:
+        modules = _walk_moler_python_files(path=path)
+    for fname in modules:
         pkg_name = fname.replace(".py", "")
         parts = pkg_name.split(sep)
         pkg_name = ".".join(parts)
@@ -98,15 +109,17 @@ def _walk_moler_commands(path, base_class):
                 yield moler_module, cls
 
 
-def _walk_moler_nonabstract_commands(path, base_class):
+def _walk_moler_nonabstract_commands(path, base_class, modules=None):
     """
     We don't require COMMAND_OUTPUT/COMMAND_RESULT for base classes
     however, they should be abstract to block their instantiation.
 
     :param path: path to python module
     :type path: str
+    :param modules: paths of modules to take commands from (all modules from path if None)
+    :type modules: list(str)
     """
-    for moler_module, moler_class in _walk_moler_commands(path, base_class):
+    for moler_module, moler_class in _walk_moler_commands(path, base_class, modules=modules):
         try:
             _ = moler_class()
         except TypeError as err:
@@ -170,12 +183,14 @@ def _get_doc_variant(test_data, variant, observer_type):
     return cmd_output, cmd_kwargs, cmd_result
 
 
-def _create_command(moler_class, moler_connection, cmd_kwargs):
+def _create_command(moler_class, moler_connection, cmd_kwargs, runner=None):
     """Can we construct instance with given params?"""
     arguments = ", ".join(["{}={}".format(param, value) for (param, value) in cmd_kwargs.items()])
     constructor_str = "{}({})".format(moler_class.__name__, arguments)
     try:
         moler_cmd = moler_class(connection=moler_connection, **cmd_kwargs)
+        if runner is not None:
+            moler_cmd.runner = runner  # not all constructors accept runner parameter
         return moler_cmd, constructor_str
     except Exception as err:
         error_msg = "Can't create command instance via {} : {}".format(constructor_str, str(err))
@@ -252,65 +267,115 @@ def check_cmd_or_event(path2cmds):
     return observer_type, base_class
 
 
-def check_if_documentation_exists(path2cmds):
+def _check_documentation_of_modules(path2cmds, modules=None):
     """
-    Check if documentation exists and has proper structure.
+    Check documentation of commands (or events) from given modules.
+    May run inside worker process of parallel check - report is returned to be merged by caller.
 
     :param path2cmds: relative path to comands directory
-    :type path2cmds: str
-    :return: True if all checks passed
-    :rtype: bool
+    :param modules: paths of modules (as from _walk_moler_python_files) to check, all from path2cmds if None
+    :return: dict with keys: 'number_of_command_found', 'wrong_commands' (list of class names), 'errors_found'
+     (list of messages) and 'timings' (list of (module.class name, seconds of its check))
     """
     observer_type, base_class = check_cmd_or_event(path2cmds)
-    wrong_commands = {}
+    runner = get_runner(variant="inline")  # parsing of documented output is known right after its injection
+    wrong_commands = collections.OrderedDict()
     errors_found = []
-    print()
+    timings = []
     number_of_command_found = 0
-    for moler_module, moler_class in _walk_moler_nonabstract_commands(path=path2cmds, base_class=base_class):
+    for moler_module, moler_class in _walk_moler_nonabstract_commands(path=path2cmds, base_class=base_class,
+                                                                      modules=modules):
         number_of_command_found += 1
         print("processing: {}".format(moler_class))
+        start_time = time.time()
+        errors = _check_documentation_of_class(moler_module, moler_class, observer_type, base_class, runner)
+        timings.append(("{}.{}".format(moler_module.__name__, moler_class.__name__), time.time() - start_time))
+        if errors:
+            wrong_commands[moler_class.__name__] = 1
+            errors_found.extend(errors)
+    return {'number_of_command_found': number_of_command_found, 'wrong_commands': list(wrong_commands),
+            'errors_found': errors_found, 'timings': timings}
+
 
-        test_data = _retrieve_command_documentation(moler_module, observer_type)
+def _check_documentation_of_class(moler_module, moler_class, observer_type, base_class, runner):
+    """Check all documented variants of command (or event) class, return list of errors."""
+    test_data = _retrieve_command_documentation(moler_module, observer_type)
+
+    error_msg = _validate_documentation_existence(moler_module, test_data, observer_type)
+    if error_msg:
+        return [error_msg]
+
+    errors_found = []
+    for variant in test_data:
+        error_msgs = _validate_documentation_consistency(moler_module, test_data, variant, observer_type)
+        if error_msgs:
+            errors_found.extend(error_msgs)
+            continue
+
+        cmd_output, cmd_kwargs, cmd_result = _get_doc_variant(test_data, variant, observer_type)
+
+        buffer_io = _buffer_connection(inline=True)
+        try:
+            moler_cmd, creation_str = _create_command(moler_class,
+                                                      buffer_io.moler_connection,
+                                                      cmd_kwargs,
+                                                      runner=runner)
+        except Exception as err:
+            errors_found.append(str(err))
+            continue
 
-        error_msg = _validate_documentation_existence(moler_module, test_data, observer_type)
+        error_msg = _run_command_parsing_test(moler_cmd, creation_str,
+                                              buffer_io,
+                                              cmd_output, cmd_result,
+                                              variant,
+                                              base_class,
+                                              observer_type)
         if error_msg:
-            wrong_commands[moler_class.__name__] = 1
             errors_found.append(error_msg)
-            continue
+    return errors_found
 
-        for variant in test_data:
-            error_msgs = _validate_documentation_consistency(moler_module, test_data, variant, observer_type)
-            if error_msgs:
-                wrong_commands[moler_class.__name__] = 1
-                errors_found.extend(error_msgs)
-                continue
 
-            cmd_output, cmd_kwargs, cmd_result = _get_doc_variant(test_data, variant, observer_type)
+def _check_documentation_in_processes(path2cmds, processes):
+    """Split modules into shards checked by pool of processes (each worker imports only modules of its shard)."""
+    modules = list(_walk_moler_python_files(path2cmds))
+    shards = [modules[shard_nb::processes] for shard_nb in range(processes)]
+    shards = [shard for shard in shards if shard]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_check_documentation_of_modules, [path2cmds] * len(shards), shards))
 
-            buffer_io = _buffer_connection()
-            try:
-                moler_cmd, creation_str = _create_command(moler_class,
-                                                          buffer_io.moler_connection,
-                                                          cmd_kwargs)
-            except Exception as err:
-                wrong_commands[moler_class.__name__] = 1
-                errors_found.append(str(err))
-                continue
 
-            error_msg = _run_command_parsing_test(moler_cmd, creation_str,
-                                                  buffer_io,
-                                                  cmd_output, cmd_result,
-                                                  variant,
-                                                  base_class,
-                                                  observer_type)
-            if error_msg:
-                wrong_commands[moler_class.__name__] = 1
-                errors_found.append(error_msg)
+def _print_timings(timings, observer_type):
+    print("Time of {} checks (slowest first):".format(observer_type.lower()))
+    for observer_name, duration in sorted(timings, key=lambda timing: timing[1], reverse=True):
+        print("    {:>8.3f} s  {}".format(duration, observer_name))
+
+
+def check_if_documentation_exists(path2cmds, processes=1):
+    """
+    Check if documentation exists and has proper structure.
+
+    :param path2cmds: relative path to comands directory
+    :type path2cmds: str
+    :param processes: number of worker processes checking modules in parallel (1 = check inside current process)
+    :type processes: int
+    :return: True if all checks passed
+    :rtype: bool
+    """
+    observer_type, base_class = check_cmd_or_event(path2cmds)
+    print()
+    if processes > 1:
+        reports = _check_documentation_in_processes(path2cmds, processes)
+    else:
+        reports = [_check_documentation_of_modules(path2cmds)]
+    number_of_command_found = sum(report['number_of_command_found'] for report in reports)
+    wrong_commands = [class_name for report in reports for class_name in report['wrong_commands']]
+    errors_found = [error for report in reports for error in report['errors_found']]
+    _print_timings([timing for report in reports for timing in report['timings']], observer_type)
 
     if errors_found:
         print("\n".join(errors_found))
         msg = "Following {} have incorrect documentation:".format(observer_type.lower())
-        err_msg = "{}\n    {}".format(msg, "\n    ".join(wrong_commands.keys()))
+        err_msg = "{}\n    {}".format(msg, "\n    ".join(wrong_commands))
         print(err_msg)
         return False
     if number_of_command_found == 0:
@@ -324,6 +389,7 @@ def check_if_documentation_exists(path2cmds):
 if __name__ == '__main__':
     parser = ArgumentParser(description="Moler's Command(s) autotest")
     parser.add_argument('-c', '--cmd_filename', required=True, help='python module implementing given command')
+    parser.add_argument('-p', '--processes', type=int, default=1, help='number of processes checking in parallel')
     options = parser.parse_args()
 
     if not exists(options.cmd_filename):
@@ -331,4 +397,4 @@ if __name__ == '__main__':
         parser.print_help()
         exit()
     else:
-        check_if_documentation_exists(path2cmds=options.cmd_filename)
+        check_if_documentation_exists(path2cmds=options.cmd_filename, processes=options.processes)
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar table of rows - compact result of commands listing many rows (processes, sockets, routes).
+
+List of dicts repeats the same keys in every row. ColumnarTable keeps one column per key:
+- integer column: array of 64-bit integers,
+- float column: array of doubles,
+- any other column: categorical - array of codes + list of distinct values (each string stored once).
+Column starts as integer/float one and becomes categorical when value of other type comes into it.
+
+Aggregations work on columns (predicates of categorical columns are evaluated once per distinct value):
+
+    processes = top_cmd()['processes']  # ColumnarTable when top_cmd.columnar_result = True
+    processes.group_by('USER', 'RES', aggregate='sum')
+    processes.filter(S='R', **{'%CPU': lambda cpu: cpu > 50.0}).to_records()
+"""
+
+__author__ = 'Marcin Usielski, Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com, grzegorz.latuszek@nokia.com'
+
+from array import array
+from collections import OrderedDict
+
+import six
+
+from moler.exceptions import WrongUsage
+
+_int_typecode = 'q' if six.PY3 else 'l'
+_code_typecode = 'l'
+
+
+class _Missing(object):
+    """Marks that row has no value (no key) in column."""
+
+    def __repr__(self):
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+class _Column(object):
+    def __init__(self, rows_count=0):
+        self.kind = None  # 'int', 'float' or 'category', None till first value
+        self.values = None  # array of numbers or of codes of categories
+        self.categories = list()  # distinct values of categorical column
+        self._codes = dict()  # (type of value, value) -> code
+        if rows_count:
+            self._to_category()
+            for _ in range(rows_count):
+                self.append(MISSING)
+
+    def append(self, value):
+        if self.kind is None:
+            self._start(value)
+        if self.kind == 'category':
+            self.values.append(self._code(value))
+        elif self._fits(value):
+            try:
+                self.values.append(value)
+                return
+            except OverflowError:  # int out of 64 bits
+                self._to_category()
+                self.values.append(self._code(value))
+        else:
+            self._to_category()
+            self.values.append(self._code(value))
+
+    def _start(self, value):
+        if type(value) in six.integer_types:
+            self.kind = 'int'
+            self.values = array(_int_typecode)
+        elif type(value) is float:
+            self.kind = 'float'
+            self.values = array('d')
+        else:
+            self.kind = 'category'
+            self.values = array(_code_typecode)
+
+    def _fits(self, value):
+        if self.kind == 'int':
+            return type(value) in six.integer_types
+        return type(value) is float
+
+    def _code(self, value):
+        key = (type(value), value)  # 1, 1.0 and True are equal but are different categories
+        try:
+            return self._codes[key]
+        except KeyError:
+            code = len(self.categories)
+            self.categories.append(value)
+            self._codes[key] = code
+            return code
+        except TypeError:  # not hashable value (like list) is not shared with other rows
+            self.categories.append(value)
+            return len(self.categories) - 1
+
+    def _to_category(self):
+        values = list(self.values) if self.values is not None else list()
+        self.kind = 'category'
+        self.values = array(_code_typecode)
+        for value in values:
+            self.values.append(self._code(value))
+
+    def __getitem__(self, index):
+        if self.kind == 'category':
+            return self.categories[self.values[index]]
+        return self.values[index]
+
+    def __iter__(self):
+        if self.kind == 'category':
+            categories = self.categories
+            return (categories[code] for code in self.values)
+        return iter(self.values)
+
+    def matching_rows(self, condition):
+        """Return indexes of rows which values are equal to condition (or for which callable condition is True)."""
+        if self.kind == 'category':
+            if callable(condition):
+                matching_codes = set(code for code, value in enumerate(self.categories)
+                                     if value is not MISSING and condition(value))
+            else:
+                matching_codes = set(code for code, value in enumerate(self.categories) if value == condition)
+            return [row for row, code in enumerate(self.values) if code in matching_codes]
+        if callable(condition):
+            return [row for row, value in enumerate(self.values) if condition(value)]
+        return [row for row, value in enumerate(self.values) if value == condition]
+
+    def take(self, rows):
+        column = _Column()
+        column.kind = self.kind
+        column.values = array(self.values.typecode, (self.values[row] for row in rows))
+        if self.kind == 'category':
+            column.categories = list(self.categories)  # rows added to taken column must not change source one
+            column._codes = dict(self._codes)
+        return column
+
+
+class ColumnarTable(object):
+    _aggregates = ('count', 'sum', 'min', 'max', 'mean')
+
+    def __init__(self, records=None):
+        """
+        Create table.
+
+        :param records: iterable of rows (dicts) to put into table
+        """
+        self._columns = OrderedDict()  # name -> _Column
+        self._rows_count = 0
+        if records is not None:
+            self.extend(records)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Create table from rows.
+
+        :param records: iterable of rows (dicts)
+        :return: ColumnarTable
+        """
+        return cls(records=records)
+
+    def append(self, record):
+        """
+        Add row at end of table.
+
+        :param record: dict column name -> value
+        :return: None
+        """
+        for name in record:
+            if name not in self._columns:
+                self._columns[name] = _Column(rows_count=self._rows_count)
+        for name, column in self._columns.items():
+            column.append(record.get(name, MISSING))
+        self._rows_count += 1
+
+    def extend(self, records):
+        """
+        Add rows at end of table.
+
+        :param records: iterable of rows (dicts)
+        :return: None
+        """
+        for record in records:
+            self.append(record)
+
+    @property
+    def columns(self):
+        """Names of columns."""
+        return list(self._columns)
+
+    def column(self, name):
+        """
+        Return values of column.
+
+        :param name: name of column
+        :return: array for integer/float column, list for other ones (MISSING where row has no value)
+        """
+        column = self._get_column(name)
+        if column.kind == 'category':
+            return list(column)
+        return array(column.values.typecode, column.values)
+
+    def __len__(self):
+        return self._rows_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._rows_count
+        if not 0 <= index < self._rows_count:
+            raise IndexError("ColumnarTable index out of range")
+        return self._record(index)
+
+    def __iter__(self):
+        for index in range(self._rows_count):
+            yield self._record(index)
+
+    def _record(self, index):
+        record = dict()
+        for name, column in self._columns.items():
+            value = column[index]
+            if value is not MISSING:
+                record[name] = value
+        return record
+
+    def to_records(self):
+        """
+        Return rows as list of dicts (the same as result of command without columnar_result).
+
+        :return: list of dicts
+        """
+        return list(self)
+
+    def filter(self, **conditions):
+        """
+        Return table with rows meeting all conditions.
+
+        :param conditions: column name -> value (row must have equal value) or callable (row value -> bool).
+         For categorical columns callable is called once per distinct value.
+        :return: ColumnarTable
+        """
+        rows = None
+        for name, condition in conditions.items():
+            matching_rows = self._get_column(name).matching_rows(condition)
+            rows = matching_rows if rows is None else sorted(set(rows).intersection(matching_rows))
+        if rows is None:
+            rows = range(self._rows_count)
+        return self.take(rows)
+
+    def take(self, rows):
+        """
+        Return table with selected rows.
+
+        :param rows: indexes of rows
+        :return: ColumnarTable
+        """
+        rows = list(rows)
+        table = ColumnarTable()
+        for name, column in self._columns.items():
+            table._columns[name] = column.take(rows)
+        table._rows_count = len(rows)
+        return table
+
+    def group_by(self, key, value=None, aggregate='count'):
+        """
+        Aggregate values of column in groups of rows with the same value of key column.
+
+        :param key: name of column grouping rows (like 'USER')
+        :param value: name of aggregated column (like 'RES'), not needed for 'count'
+        :param aggregate: 'count', 'sum', 'min', 'max' or 'mean'
+        :return: dict value of key column -> aggregated value
+        """
+        if aggregate not in ColumnarTable._aggregates:
+            raise WrongUsage("Aggregate '{}' is not supported. Possible choices: {}".format(
+                aggregate, ColumnarTable._aggregates))
+        key_column = self._get_column(key)
+        if aggregate == 'count':
+            groups = dict()
+            for key_value in key_column:
+                groups[key_value] = groups.get(key_value, 0) + 1
+            return groups
+        if value is None:
+            raise WrongUsage("Aggregate '{}' requires value column".format(aggregate))
+        groups = dict()
+        for key_value, row_value in zip(key_column, self._get_column(value)):
+            if row_value is MISSING:
+                continue
+            groups.setdefault(key_value, list()).append(row_value)
+        if aggregate == 'mean':
+            return dict((key_value, sum(values) / float(len(values))) for key_value, values in groups.items())
+        function = {'sum': sum, 'min': min, 'max': max}[aggregate]
+        return dict((key_value, function(values)) for key_value, values in groups.items())
+
+    def sum(self, name):
+        """
+        Sum values of column (rows without value are skipped).
+
+        :param name: name of column
+        :return: sum
+        """
+        column = self._get_column(name)
+        if column.kind == 'category':
+            return sum(value for value in column if value is not MISSING)
+        return sum(column.values)
+
+    def _get_column(self, name):
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise WrongUsage("No column '{}' in table. Columns: {}".format(name, self.columns))
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnarTable):
+            return self.to_records() == other.to_records()
+        if isinstance(other, list):
+            return self.to_records() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}(rows={}, columns={})".format(self.__class__.__name__, self._rows_count, self.columns)
@@ -53,6 +53,40 @@ def find_caller(levels_to_go_up=0):
     return rv
 
 
+def is_level_logged(logger, level):
+    """
+    Check if record of given level would be stored by any handler of logger (or its parents).
+    Use it to skip building messages nobody will see.
+
+    Handlers are checked at every call (no caching) so handlers added/changed outside of Moler
+    (logging.basicConfig, dictConfig, pytest caplog) are also taken into account.
+
+    :param logger: logger to check (None means no logging)
+    :param level: logging level
+    :return: True if record of that level would be handled
+    """
+    if (logger is None) or (not logger.isEnabledFor(level)):
+        return False
+    return _has_handler_for_level(logger, level)
+
+
+def _has_handler_for_level(logger, level):
+    found_handlers = False
+    current = logger
+    while current:
+        for handler in current.handlers:
+            found_handlers = True
+            if level >= handler.level:
+                return True
+        if not current.propagate:
+            break
+        current = current.parent
+    if not found_handlers:
+        last_resort = getattr(logging, 'lastResort', None)  # Python 3 handler used when there is no handler
+        return (last_resort is not None) and (level >= last_resort.level)
+    return False
+
+
 def error_into_logger(logger, msg, extra=None, levels_to_go_up=0):
     log_into_logger(logger, logging.ERROR, msg, extra=extra, levels_to_go_up=levels_to_go_up)
 
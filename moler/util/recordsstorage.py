@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Storages of records accumulated by commands in their result (like lines of cat, paths found by find).
+
+Commands producing huge outputs (cat of big log, find /) may keep their records in:
+'memory' - list with all records (default),
+'ring' - collections.deque keeping only last max_records records,
+'disk' - SpilledRecords: records written into temporary file, result holds only offsets of records and reads
+         them lazily (via mmap) when accessed. File has no name in directory (POSIX) or is deleted on close
+         (Windows) so it never outlives process.
+"""
+
+__author__ = 'Marcin Usielski, Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com, grzegorz.latuszek@nokia.com'
+
+import json
+import mmap
+import tempfile
+import threading
+from array import array
+from collections import deque
+
+import six
+
+from moler.exceptions import WrongUsage
+
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2
+    from collections import Sequence
+
+STORAGE_MODES = ('memory', 'ring', 'disk')
+
+
+def create_records_storage(mode='memory', max_records=None, directory=None):
+    """
+    Create empty storage of records.
+
+    :param mode: 'memory', 'ring' or 'disk'
+    :param max_records: max number of records kept by 'ring' storage
+    :param directory: directory for file of 'disk' storage (system temporary directory if None)
+    :return: list, deque or SpilledRecords
+    """
+    if mode not in STORAGE_MODES:
+        raise WrongUsage("Records storage '{}' is not supported. Possible choices: {}".format(mode, STORAGE_MODES))
+    if mode == 'ring':
+        if (max_records is None) or (max_records < 1):
+            raise WrongUsage("'ring' records storage requires max_records >= 1 (got {})".format(max_records))
+        return deque(maxlen=max_records)
+    if mode == 'disk':
+        return SpilledRecords(directory=directory)
+    return list()
+
+
+class SpilledRecords(Sequence):
+    _offset_typecode = 'q' if six.PY3 else 'l'
+
+    def __init__(self, directory=None):
+        """
+        Sequence of records kept in file. Each record is one line of JSON, only offsets of lines are kept in memory.
+        File is removed by system when sequence is closed, garbage collected or process exits.
+
+        :param directory: directory for file (system temporary directory if None)
+        """
+        self._file = tempfile.TemporaryFile(mode='w+b', prefix='moler_records_', suffix='.jsonl', dir=directory)
+        self._offsets = array(self._offset_typecode, [0])  # record i is between _offsets[i] and _offsets[i+1]
+        self._mmap = None
+        self._flushed = True
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        """
+        Write record at end of file.
+
+        :param record: record serializable to JSON (string, number, dict or list of them)
+        :return: None
+        """
+        data = json.dumps(record).encode('utf-8') + b"\n"
+        with self._lock:
+            self._file.write(data)
+            self._offsets.append(self._offsets[-1] + len(data))
+            self._flushed = False
+
+    def extend(self, records):
+        """
+        Write records at end of file.
+
+        :param records: iterable of records
+        :return: None
+        """
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SpilledRecords index out of range")
+        with self._lock:
+            start, end = self._offsets[index], self._offsets[index + 1]
+            data = self._mapped(end)[start:end]
+        return json.loads(data.decode('utf-8'))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (Sequence, deque)) and not isinstance(other, six.string_types):
+            return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}(records={})".format(self.__class__.__name__, len(self))
+
+    def _mapped(self, end):
+        if not self._flushed:
+            self._file.flush()
+            self._flushed = True
+        if (self._mmap is None) or (len(self._mmap) < end):
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self):
+        """
+        Close (so remove) file with records. Records are not accessible after close.
+
+        :return: None
+        """
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            if not self._file.closed:
+                self._file.close()
+            self._offsets = array(self._offset_typecode, [0])
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:  # interpreter may be shutting down
+            pass
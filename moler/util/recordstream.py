@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Stream of records parsed by running command.
+
+Long running commands (tcpdump, ping, tail -f, ...) may pass each parsed record (like one packet) into stream
+as soon as record is parsed. Consumer iterates over stream while command is still running:
+
+    for packet in tcpdump_cmd.stream():
+        handle(packet)
+
+Stream has bounded buffer. When consumer is slower than command then policy given by when_full is used:
+'block' - command waits till consumer takes record (backpressure; connection is not processing data then),
+'drop_oldest' - the oldest buffered record is dropped,
+'drop_newest' - new record is dropped.
+"""
+
+__author__ = 'Marcin Usielski, Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com, grzegorz.latuszek@nokia.com'
+
+import threading
+from collections import deque
+
+from moler.exceptions import WrongUsage
+
+
+class RecordStream(object):
+    _policies = ('block', 'drop_oldest', 'drop_newest')
+
+    def __init__(self, max_buffered=1000, when_full='drop_oldest'):
+        """
+        Create stream of records.
+
+        :param max_buffered: max number of records waiting for consumer
+        :param when_full: what to do with new record when buffer is full: 'block', 'drop_oldest' or 'drop_newest'
+        """
+        if when_full not in RecordStream._policies:
+            raise WrongUsage("'{}' is not supported. Possible choices: {}".format(when_full, RecordStream._policies))
+        if max_buffered < 1:
+            raise WrongUsage("max_buffered must be >= 1 (got {})".format(max_buffered))
+        self.max_buffered = max_buffered
+        self.when_full = when_full
+        self.dropped = 0  # number of records dropped because buffer was full
+        self._records = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._exception = None
+
+    def put(self, record):
+        """
+        Pass record to consumer. Called by command when record is parsed.
+
+        :param record: parsed record
+        :return: None
+        """
+        with self._condition:
+            if self._closed:
+                return
+            if len(self._records) >= self.max_buffered:
+                if self.when_full == 'drop_newest':
+                    self.dropped += 1
+                    return
+                elif self.when_full == 'drop_oldest':
+                    self._records.popleft()
+                    self.dropped += 1
+                else:
+                    while (len(self._records) >= self.max_buffered) and (not self._closed):
+                        self._condition.wait()
+                    if self._closed:
+                        return
+            self._records.append(record)
+            self._condition.notify_all()
+
+    def close(self, exception=None):
+        """
+        Close stream. Records already buffered are still given to consumer.
+
+        :param exception: exception raised to consumer after last record (like command timeout)
+        :return: None
+        """
+        with self._condition:
+            if not self._closed:
+                self._closed = True
+                self._exception = exception
+            self._condition.notify_all()
+
+    def closed(self):
+        """
+        :return: True if no more records will come into stream.
+        """
+        return self._closed
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._condition:
+            while (not self._records) and (not self._closed):
+                self._condition.wait()
+            if self._records:
+                record = self._records.popleft()
+                self._condition.notify_all()  # wake up command blocked by full buffer
+                return record
+            if self._exception is not None:
+                exception, self._exception = self._exception, None
+                raise exception
+            raise StopIteration
+
+    next = __next__  # Python 2
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        """
+        Asynchronous iteration (async for record in stream). Waiting for record is done inside executor thread.
+
+        :return: awaitable returning next record
+        """
+        import asyncio
+
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(None, self._next_or_stop_async_iteration)
+
+    def _next_or_stop_async_iteration(self):
+        try:
+            return self.__next__()
+        except StopIteration:
+            raise StopAsyncIteration  # noqa: F821 - Python 3 only, as async for
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
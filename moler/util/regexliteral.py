@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Literals required by regular expressions - used to reject lines by cheap substring checks before searching regex.
+"""
+
+__author__ = 'Marcin Usielski, Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com, grzegorz.latuszek@nokia.com'
+
+import re
+
+import six
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+
+def required_literal(pattern):
+    """
+    Find literal that must be present in line matching pattern.
+
+    :param pattern: compiled regular expression
+    :return: longest literal string or None if there is no such one
+    """
+    if (pattern.flags & re.IGNORECASE) or (not isinstance(pattern.pattern, six.text_type)):
+        return None
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:  # parser is internal module of re, so don't let it break event
+        return None
+    # top level items of parsed pattern are sequence so each top level literal is required
+    longest = u''
+    current = list()
+    for op, value in parsed:
+        if op == sre_parse.LITERAL:
+            current.append(value)
+        else:
+            current = list()
+        if len(current) > len(longest):
+            longest = u''.join([six.unichr(char) for char in current])
+    return longest or None
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Round trip time statistics of replies (ping).
+"""
+
+__author__ = 'Julia Patacz, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'julia.patacz@nokia.com, marcin.usielski@nokia.com'
+
+import math
+from array import array
+
+
+class RttStatistics(object):
+    """
+    Replies (like of ping) kept in arrays (no object per reply). Percentiles are taken from histogram of rtts with
+    log-scale buckets (each bucket 1% wider than previous one) updated as replies come - so they are available at any
+    time, memory doesn't grow with number of replies and percentile is accurate up to bucket width (exact when all
+    rtts of bucket are equal).
+    """
+
+    min_rtt = 1e-6  # [s] rtts up to that value fall into first bucket
+    bucket_growth = 1.01
+
+    def __init__(self):
+        self.sequences = array('l')
+        self.ttls = array('l')
+        self.rtts = array('d')  # [s]
+        self._buckets = dict()  # bucket index -> [number of rtts, sum of rtts]
+        self.replies = 0
+        self.duplicated = 0
+        self.out_of_order = 0
+        self._max_sequence = -1
+
+    def add_reply(self, sequence, ttl, rtt_seconds, duplicated=False, keep_series=True):
+        """
+        Adds reply.
+        :param sequence: icmp sequence number of reply
+        :param ttl: ttl of reply
+        :param rtt_seconds: round trip time in seconds
+        :param duplicated: True if ping marked reply as duplicated (DUP!)
+        :param keep_series: False to update statistics only (without keeping sequence/ttl/rtt of reply)
+        :return: Nothing
+        """
+        self.replies += 1
+        if duplicated:
+            self.duplicated += 1
+        elif sequence < self._max_sequence:
+            self.out_of_order += 1
+        self._max_sequence = max(self._max_sequence, sequence)
+        if keep_series:
+            self.sequences.append(sequence)
+            self.ttls.append(ttl)
+            self.rtts.append(rtt_seconds)
+        index = self._bucket_index(rtt_seconds)
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            self._buckets[index] = [1, rtt_seconds]
+        else:
+            bucket[0] += 1
+            bucket[1] += rtt_seconds
+
+    def percentile(self, percent):
+        """
+        Returns rtt percentile (nearest rank) - mean rtt of histogram bucket holding reply of that rank.
+        :param percent: percent of replies with rtt lower or equal to returned one, like 95
+        :return: rtt in seconds, None if there are no replies
+        """
+        replies = self.replies
+        if replies == 0:
+            return None
+        rank = min(max(int(math.ceil(percent / 100.0 * replies)), 1), replies)
+        counted = 0
+        for index in sorted(self._buckets):
+            count, rtt_sum = self._buckets[index]
+            counted += count
+            if counted >= rank:
+                return rtt_sum / count
+
+    def _bucket_index(self, rtt_seconds):
+        if rtt_seconds <= self.min_rtt:
+            return 0
+        return int(math.log(rtt_seconds / self.min_rtt, self.bucket_growth)) + 1
+
+    def get_statistics(self):
+        """
+        Returns statistics of replies.
+        :return: dict
+        """
+        return {
+            'replies': self.replies,
+            'replies_duplicated': self.duplicated,
+            'replies_out_of_order': self.out_of_order,
+            'rtt_p50_seconds': self.percentile(50),
+            'rtt_p95_seconds': self.percentile(95),
+            'rtt_p99_seconds': self.percentile(99),
+        }
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of ObservableConnection data dispatching.
+
+Measures how many chunks per second ObservableConnection.data_received() can pass to 1, 10 and 100 observers
+with Moler logging configured as usual (main log + device log inside temporary folder).
+
+Run it from repository root:  PYTHONPATH=. python test/benchmarks/bench_connection_observers.py
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import shutil
+import sys
+import tempfile
+import time
+
+import moler.config.loggers as m_logger
+from moler.connection import ObservableConnection
+
+
+class CountingObserver(object):
+    def __init__(self):
+        self.received = 0
+
+    def data_received(self, data):
+        self.received += 1
+
+
+def chunks_per_second(observers_count, chunks_count=2000):
+    connection = ObservableConnection(name="bench_{}".format(observers_count))
+    m_logger.configure_device_logger(connection.name)
+    observers = [CountingObserver() for _ in range(observers_count)]
+    for observer in observers:
+        connection.subscribe(observer.data_received)
+    chunk = "64 bytes from 127.0.0.1: icmp_seq=1 ttl=64 time=0.047 ms\n"
+    start_time = time.time()
+    for _ in range(chunks_count):
+        connection.data_received(chunk)
+    duration = time.time() - start_time
+    assert all(observer.received == chunks_count for observer in observers)
+    return chunks_count / duration
+
+
+def main(observers_counts=(1, 10, 100)):
+    logs_dir = tempfile.mkdtemp()
+    try:
+        m_logger.set_logging_path(logs_dir)
+        m_logger.configure_moler_main_logger()
+        for observers_count in observers_counts:
+            print("{:>4} observers: {:>10.0f} chunks/sec".format(observers_count, chunks_per_second(observers_count)))
+    finally:
+        shutil.rmtree(logs_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
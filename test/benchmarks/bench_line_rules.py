@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of declarative line rules of commands (LineRules) against method-chain parsing.
+
+Commands converted to _line_rules (Ping, Tcpdump, Ifconfig) are fed with their documentation fixtures
+(COMMAND_OUTPUT<variant>/COMMAND_KWARGS<variant>) and measured in lines/sec (best of given number of runs):
+- rules: parsing as command does it (literal prefilter, no exceptions),
+- method chain: the same rules applied the way chains of _parse_xxx methods did it before conversion - every regex
+  searched in order by RegexHelper and ParsingDone raised when line is parsed.
+Results of both ways are checked to be equal.
+
+Run it from repository root:  PYTHONPATH=. python test/benchmarks/bench_line_rules.py
+                              PYTHONPATH=. python test/benchmarks/bench_line_rules.py -c ping -r 30
+"""
+
+__author__ = 'Marcin Usielski, Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com, grzegorz.latuszek@nokia.com'
+
+import importlib
+import sys
+import time
+from argparse import ArgumentParser
+
+from moler.cmd import _class_function
+from moler.connection import ObservableConnection
+from moler.exceptions import ParsingDone
+
+COMMANDS = (('ping', 'Ping'), ('tcpdump', 'Tcpdump'), ('ifconfig', 'Ifconfig'))
+
+
+class MethodChainParsing(object):
+    def _parse_line_with_rules(self, line, is_full_line):
+        """Apply _line_rules as chain of _parse_xxx methods did: search each regex in order, stop by ParsingDone."""
+        applied = False
+        try:
+            for rule in self._line_rules:
+                if rule.full_lines_only and not is_full_line:
+                    continue
+                guard = _class_function(self.__class__, rule.guard)
+                if guard is not None and not guard(self):
+                    continue
+                if self._regex_helper.search_compiled(rule.regex, line):
+                    _class_function(self.__class__, rule.handler)(self, self._regex_helper.get_match())
+                    applied = True
+                    if rule.stop:
+                        raise ParsingDone
+        except ParsingDone:
+            pass
+        return applied
+
+
+def fixtures(module):
+    """
+    Return documented outputs of command module.
+
+    :param module: module of command
+    :return: list of (COMMAND_OUTPUT, COMMAND_KWARGS) of all variants
+    """
+    variants = [attr[len("COMMAND_OUTPUT"):] for attr in dir(module) if attr.startswith("COMMAND_OUTPUT")]
+    return [(getattr(module, "COMMAND_OUTPUT" + variant), getattr(module, "COMMAND_KWARGS" + variant, {}))
+            for variant in sorted(variants)]
+
+
+def _create_command(command_class, kwargs):
+    command = command_class(connection=ObservableConnection(how2send=lambda data: None), **kwargs)
+    command.command_string  # builds regex of echo detecting start of output
+    return command
+
+
+def lines_per_second(command_class, outputs, runs_count):
+    """
+    Parse all outputs runs_count times (by new commands each time - their construction is not measured).
+
+    :param command_class: class of command
+    :param outputs: list of (COMMAND_OUTPUT, COMMAND_KWARGS)
+    :param runs_count: number of runs
+    :return: lines/sec of best run, results of commands (of last run)
+    """
+    lines_count = sum(output.count("\n") + 1 for output, _ in outputs)
+    best_duration = None
+    for _ in range(runs_count):
+        commands = [_create_command(command_class, kwargs) for _, kwargs in outputs]  # not measured
+        start_time = time.time()
+        for command, (output, _) in zip(commands, outputs):
+            command.data_received(output)
+        duration = time.time() - start_time
+        if (best_duration is None) or (duration < best_duration):
+            best_duration = duration
+    results = [command.current_ret for command in commands]
+    return lines_count / best_duration, results
+
+
+def run(names=None, runs_count=15):
+    """
+    Compare rules with method-chain parsing.
+
+    :param names: names of modules relative to moler.cmd.unix (like 'ping'), all converted commands if None
+    :param runs_count: number of runs (best one is reported)
+    :return: dict command name -> (lines/sec of method chain, lines/sec of rules)
+    """
+    report = dict()
+    for module_name, class_name in COMMANDS:
+        if (names is not None) and (module_name not in names):
+            continue
+        module = importlib.import_module("moler.cmd.unix.{}".format(module_name))
+        command_class = getattr(module, class_name)
+        chain_class = type("MethodChain{}".format(class_name), (MethodChainParsing, command_class), {})
+        outputs = fixtures(module)
+        chain_speed, chain_results = lines_per_second(chain_class, outputs, runs_count)
+        rules_speed, rules_results = lines_per_second(command_class, outputs, runs_count)
+        status = "" if chain_results == rules_results else " (DIFFERENT RESULTS)"
+        print("{:<10} method chain {:>10.0f} lines/sec, rules {:>10.0f} lines/sec, x{:.2f}{}".format(
+            class_name, chain_speed, rules_speed, rules_speed / chain_speed, status))
+        report[class_name] = (chain_speed, rules_speed)
+    return report
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Throughput of line rules against method-chain parsing")
+    parser.add_argument('-c', '--commands', nargs='+', help="modules relative to moler.cmd.unix (like ping)")
+    parser.add_argument('-r', '--runs', type=int, default=15, help="number of runs, best one is reported")
+    options = parser.parse_args(argv)
+
+    run(names=options.commands, runs_count=options.runs)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
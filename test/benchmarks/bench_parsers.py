@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmark of command parsers built from their documentation fixtures.
+
+Every command module documents its output as COMMAND_OUTPUT<variant>/COMMAND_KWARGS<variant>. For each command
+the variant with longest output is taken, its body (lines between echo of command and final prompt, without lines
+matching prompt of command) is replicated to requested number of lines and fed into data_received() of command
+in chunks of given size - as connection does it. Reported per command: lines/sec and bytes/sec (of output parsed till command got done), peak of traced
+memory and number of memory blocks still allocated after parsing (Python 3 only - measured in separate pass since
+tracemalloc slows parsing down). Commands done before end of output (by other done-conditions than prompt)
+or failed are reported but not compared with previous run.
+
+Results may be stored as JSON and compared with results of previous run (no network, no devices needed).
+
+Run it from repository root:  PYTHONPATH=. python test/benchmarks/bench_parsers.py --lines 10000 1000000
+                              PYTHONPATH=. python test/benchmarks/bench_parsers.py -c unix.cat unix.ps -o new.json
+                              PYTHONPATH=. python test/benchmarks/bench_parsers.py -o new.json --compare old.json
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import gc
+import importlib
+import inspect
+import json
+import pkgutil
+import platform
+import sys
+import time
+from argparse import ArgumentParser
+
+import moler.cmd
+from moler.cmd.commandtextualgeneric import CommandTextualGeneric
+from moler.connection import ObservableConnection
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+def discover_commands(names=None):
+    """
+    Find commands with documented output.
+
+    :param names: names of modules relative to moler.cmd (like 'unix.cat'), all if None
+    :return: list of (name, command class, COMMAND_OUTPUT, COMMAND_KWARGS) - longest output of module
+    """
+    commands = list()
+    for _, module_name, is_package in pkgutil.walk_packages(moler.cmd.__path__, prefix="moler.cmd."):
+        name = module_name[len("moler.cmd."):]
+        if is_package or ((names is not None) and (name not in names)):
+            continue
+        module = importlib.import_module(module_name)
+        variants = [attr[len("COMMAND_OUTPUT"):] for attr in dir(module) if attr.startswith("COMMAND_OUTPUT")]
+        if not variants:
+            continue
+        variant = max(variants, key=lambda variant: getattr(module, "COMMAND_OUTPUT" + variant).count("\n"))
+        output = getattr(module, "COMMAND_OUTPUT" + variant)
+        kwargs = getattr(module, "COMMAND_KWARGS" + variant, {})
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if (cls.__module__ == module_name) and issubclass(cls, CommandTextualGeneric) and \
+                    not inspect.isabstract(cls):
+                commands.append(("{}.{}".format(name, cls.__name__), cls, output, kwargs))
+    return commands
+
+
+def replicate_output(output, lines_count, re_prompt=None):
+    """
+    Build output of lines_count lines: echo of command, body of documented output repeated, final prompt.
+
+    :param output: documented output (COMMAND_OUTPUT)
+    :param lines_count: number of lines of returned output
+    :param re_prompt: compiled regex of prompt of command - body lines matching it are dropped (they would finish
+     command at first repetition of body)
+    :return: str
+    """
+    lines = output.strip().splitlines()  # some outputs have whitespace after final prompt
+    echo, body, prompt = lines[0], lines[1:-1], lines[-1]
+    if re_prompt is not None:
+        body = [line for line in body if not re_prompt.search(line)]
+    if not body:
+        body = [""]
+    body_lines_count = max(lines_count - 2, 1)
+    repeat = body_lines_count // len(body) + 1
+    replicated_body = (body * repeat)[:body_lines_count]
+    return "\n".join([echo] + replicated_body + [prompt])
+
+
+def _chunks(text, chunk_size):
+    return [text[start:start + chunk_size] for start in range(0, len(text), chunk_size)]
+
+
+def _create_command(command_class, kwargs):
+    connection = ObservableConnection(how2send=lambda data: None)  # commands may answer (like passwords)
+    return command_class(connection=connection, **kwargs)
+
+
+def _feed(command_class, kwargs, chunks):
+    command = _create_command(command_class, kwargs)
+    command.command_string  # builds regex of echo detecting start of output
+    fed_chunks = 0
+    start_time = time.time()
+    for chunk in chunks:
+        command.data_received(chunk)
+        fed_chunks += 1
+        if command.done():
+            break
+    duration = time.time() - start_time
+    return command, duration, fed_chunks
+
+
+def measure(command_class, kwargs, text, chunk_size):
+    """
+    Feed text into new command in chunks.
+
+    :param command_class: class of command
+    :param kwargs: arguments of command constructor
+    :param text: output to parse
+    :param chunk_size: number of characters of single data_received()
+    :return: dict with measurement
+    """
+    chunks = _chunks(text, chunk_size)
+    command, duration, fed_chunks = _feed(command_class, kwargs, chunks)
+    parsed_text = "".join(chunks[:fed_chunks])  # command may be done before end of output
+    lines_count = parsed_text.count("\n") + 1
+    bytes_count = len(parsed_text.encode("utf-8"))
+    result = {'lines': lines_count, 'bytes': bytes_count, 'seconds': duration,
+              'lines_per_sec': lines_count / duration if duration else None,
+              'bytes_per_sec': bytes_count / duration if duration else None,
+              'done': command.done(), 'done_before_end': fed_chunks < len(chunks), 'error': None,
+              'peak_memory_bytes': None, 'retained_blocks': None}
+    if command.done() and command._exception:
+        result['error'] = repr(command._exception)
+    del command
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        blocks_before = sys.getallocatedblocks()
+        command, _, _ = _feed(command_class, kwargs, chunks)
+        result['retained_blocks'] = sys.getallocatedblocks() - blocks_before
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del command
+    return result
+
+
+def run(names=None, sizes=(10000,), chunk_size=4096):
+    """
+    Run benchmark of all discovered commands.
+
+    :param names: names of modules relative to moler.cmd (like 'unix.cat'), all if None
+    :param sizes: numbers of lines of parsed outputs
+    :param chunk_size: number of characters of single data_received()
+    :return: dict (JSON serializable) with environment info and results per size and command
+    """
+    results = dict()
+    for command_name, command_class, output, kwargs in discover_commands(names):
+        for lines_count in sizes:
+            key = "{}@{}".format(command_name, lines_count)
+            try:
+                re_prompt = _create_command(command_class, kwargs)._re_prompt
+                results[key] = measure(command_class, kwargs, replicate_output(output, lines_count, re_prompt),
+                                       chunk_size)
+            except Exception as err:
+                results[key] = {'error': repr(err)}
+            _print_result(key, results[key])
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'chunk_size': chunk_size,
+            'sizes': list(sizes), 'results': results}
+
+
+def _print_result(key, result):
+    if result.get('lines_per_sec') is None:
+        print("{:<48} ERROR {}".format(key, result.get('error')))
+        return
+    memory = "" if result['peak_memory_bytes'] is None else \
+        " peak {:>10} B, {:>8} blocks retained".format(result['peak_memory_bytes'], result['retained_blocks'])
+    status = "" if result['done'] else " (not done)"
+    if result['done_before_end']:
+        status = " (done after {} lines)".format(result['lines'])
+    if result['error']:
+        status = " ({})".format(result['error'])
+    print("{:<48} {:>10.0f} lines/sec {:>12.0f} B/sec{}{}".format(key, result['lines_per_sec'],
+                                                                   result['bytes_per_sec'], memory, status))
+
+
+def compare(old_report, new_report, threshold=0.2):
+    """
+    Compare throughput of two runs. Commands done before end of output or failed (in any run) are skipped since
+    they parsed different amount of output than requested.
+
+    :param old_report: result of run() (as loaded from JSON)
+    :param new_report: result of run()
+    :param threshold: relative drop of lines/sec reported as regression
+    :return: list of (key, old lines/sec, new lines/sec) of regressed commands
+    """
+    regressions = list()
+    for key, new_result in sorted(new_report['results'].items()):
+        old_result = old_report['results'].get(key)
+        if not old_result or not old_result.get('lines_per_sec') or not new_result.get('lines_per_sec'):
+            continue
+        if any(result.get('done_before_end') or result.get('error') for result in (old_result, new_result)):
+            print("{:<48} skipped (not parsed till end of output)".format(key))
+            continue
+        ratio = new_result['lines_per_sec'] / old_result['lines_per_sec']
+        print("{:<48} x{:.2f}".format(key, ratio))
+        if ratio < 1.0 - threshold:
+            regressions.append((key, old_result['lines_per_sec'], new_result['lines_per_sec']))
+    return regressions
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Throughput of Moler command parsers fed with replicated COMMAND_OUTPUT")
+    parser.add_argument('-c', '--commands', nargs='+', help="modules relative to moler.cmd (like unix.cat)")
+    parser.add_argument('-l', '--lines', nargs='+', type=int, default=[10000], help="lines of parsed output")
+    parser.add_argument('-s', '--chunk-size', type=int, default=4096, help="characters of single data_received()")
+    parser.add_argument('-o', '--output', help="JSON file to store results")
+    parser.add_argument('--compare', help="JSON file with results of previous run")
+    parser.add_argument('--threshold', type=float, default=0.2, help="relative drop of lines/sec being regression")
+    options = parser.parse_args(argv)
+
+    report = run(names=options.commands, sizes=options.lines, chunk_size=options.chunk_size)
+    if options.output:
+        with open(options.output, "w") as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+    if options.compare:
+        with open(options.compare) as report_file:
+            old_report = json.load(report_file)
+        regressions = compare(old_report, report, threshold=options.threshold)
+        for key, old_speed, new_speed in regressions:
+            print("REGRESSION {}: {:.0f} -> {:.0f} lines/sec".format(key, old_speed, new_speed))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of prompt detection inside textual commands.
+
+Feeds large outputs (COMMAND_OUTPUT of cat, find and dmesg repeated many times) into existing commands and measures
+how many lines per second they parse - with PromptHint checks (as commands run) and with prompt regex searched in
+every line (as before PromptHint).
+
+Run it from repository root:  PYTHONPATH=. python test/benchmarks/bench_prompt_detection.py
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import importlib
+import sys
+import time
+
+from moler.cmd.commandtextualgeneric import CommandTextualGeneric
+from moler.connection import ObservableConnection
+
+
+def _search_prompt_in_every_line(command, line):
+    return bool(command._regex_helper.search_compiled(command._re_prompt, line))
+
+
+def _output_lines(output, repeat):
+    lines = output.strip("\n").splitlines()
+    body = lines[1:-1]  # without echo of command and final prompt
+    return [lines[0]] + body * repeat
+
+
+def _longest_output_variant(module):
+    """Return (COMMAND_OUTPUT, COMMAND_KWARGS) of variant with most lines."""
+    variants = [name[len("COMMAND_OUTPUT"):] for name in dir(module) if name.startswith("COMMAND_OUTPUT")]
+    variant = max(variants, key=lambda variant: getattr(module, "COMMAND_OUTPUT" + variant).count("\n"))
+    return getattr(module, "COMMAND_OUTPUT" + variant), getattr(module, "COMMAND_KWARGS" + variant)
+
+
+def lines_per_second(command_name, repeat):
+    module = importlib.import_module("moler.cmd.unix.{}".format(command_name))
+    class_name = "".join(part.capitalize() for part in command_name.split("_"))
+    output, kwargs = _longest_output_variant(module)
+    command = getattr(module, class_name)(connection=ObservableConnection(), **kwargs)
+    lines = _output_lines(output, repeat)
+    start_time = time.time()
+    for line in lines:
+        command.on_new_line(line, is_full_line=True)
+    duration = time.time() - start_time
+    assert not command.done()
+    return len(lines) / duration
+
+
+def main(command_names=('cat', 'find', 'dmesg'), repeat=2000):
+    for command_name in command_names:
+        with_hint = lines_per_second(command_name, repeat)
+        original_method = CommandTextualGeneric.is_end_of_cmd_output
+        CommandTextualGeneric.is_end_of_cmd_output = _search_prompt_in_every_line
+        try:
+            without_hint = lines_per_second(command_name, repeat)
+        finally:
+            CommandTextualGeneric.is_end_of_cmd_output = original_method
+        print("{:>6}: {:>10.0f} lines/sec with prompt hint, {:>10.0f} lines/sec with regex only (x{:.2f})".format(
+            command_name, with_hint, without_hint, with_hint / without_hint))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks of Moler's own overhead: runners, connections and devices.
+
+Measured for each runner variant (threaded, single-thread, asyncio, asyncio-in-thread - the ones available):
+- dispatch latency: from data passed into connection till it reaches data_received() of observer; data is passed
+  directly into ObservableConnection.data_received(), into in-memory connection (ThreadedFifoBuffer.inject())
+  and into TCP connection (ThreadedTcp) from server running on local loopback,
+- start latency: from observer.start() till observer gets data sent just after start() returned,
+- observers scaling: chunks/sec dispatched by connection for growing number of running observers
+  and the number of observers at which deliveries/sec drop below half of the best one,
+- echo command: from start till done of command that is done by echo of its own command string
+  (in-memory connection with echo and TCP echo server on local loopback).
+And once: time of device construction (UnixLocal, UnixRemote) on in-memory connection.
+
+Results may be stored as JSON to track Moler's overhead over time (no network needed, only local loopback).
+
+Run it from repository root:  PYTHONPATH=. python test/benchmarks/bench_runners.py
+                              PYTHONPATH=. python test/benchmarks/bench_runners.py -r threaded -o runners.json
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import json
+import platform
+import socket
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+
+from moler.command import Command
+from moler.connection import ObservableConnection
+from moler.connection_observer import ConnectionObserver
+from moler.io.raw.memory import ThreadedFifoBuffer
+from moler.io.raw.tcp import ThreadedTcp
+from moler.runner_factory import RunnerFactory
+from moler.runner_factory import get_runner
+
+RUNNER_VARIANTS = ('threaded', 'single-thread', 'asyncio', 'asyncio-in-thread')
+
+
+class TimingObserver(ConnectionObserver):
+    def __init__(self, connection=None, runner=None):
+        """Observer remembering when it got last data; done by 'end' line."""
+        super(TimingObserver, self).__init__(connection=connection, runner=runner)
+        self.received_at = None
+        self.received_count = 0
+        self.got_data = threading.Event()
+
+    def data_received(self, data):
+        self.received_at = time.time()
+        self.received_count += 1
+        if "end" in data:
+            self.set_result(self.received_count)
+        self.got_data.set()
+
+
+class EchoCommand(Command):
+    def __init__(self, connection=None, runner=None):
+        """Command done when echo of its command string comes back."""
+        super(EchoCommand, self).__init__(connection=connection, runner=runner)
+        self.command_string = "echo_only"
+
+    def data_received(self, data):
+        if self.command_string in data:
+            self.set_result(True)
+
+
+class LoopbackServer(threading.Thread):
+    def __init__(self, echo=False):
+        """TCP server on local loopback serving single client; echoes client's data if echo is True."""
+        super(LoopbackServer, self).__init__(name="LoopbackServer")
+        self.daemon = True
+        self.echo = echo
+        self._listening_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listening_socket.bind(("127.0.0.1", 0))
+        self._listening_socket.listen(1)
+        self.port = self._listening_socket.getsockname()[1]
+        self.client_socket = None
+        self.client_connected = threading.Event()
+
+    def run(self):
+        self.client_socket, _ = self._listening_socket.accept()
+        self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.client_connected.set()
+        while self.echo:
+            try:
+                data = self.client_socket.recv(4096)
+            except socket.error:
+                break
+            if not data:
+                break
+            self.client_socket.sendall(data)
+
+    def send(self, data):
+        self.client_socket.sendall(data)
+
+    def close(self):
+        for sock in (self.client_socket, self._listening_socket):
+            if sock is not None:
+                try:
+                    sock.close()
+                except socket.error:
+                    pass
+
+
+def _utf8_connection():
+    return ObservableConnection(encoder=lambda data: data.encode("utf-8"),
+                                decoder=lambda data: data.decode("utf-8"))
+
+
+class _Io(object):
+    """Way of passing data into Moler connection: 'direct', 'memory' or 'tcp'."""
+
+    def __init__(self, kind, echo=False):
+        self.kind = kind
+        self.moler_connection = _utf8_connection()
+        self.ext_io = None
+        self.server = None
+        if kind == 'memory':
+            self.ext_io = ThreadedFifoBuffer(moler_connection=self.moler_connection, echo=echo)
+        elif kind == 'tcp':
+            self.server = LoopbackServer(echo=echo)
+            self.server.start()
+            self.ext_io = ThreadedTcp(moler_connection=self.moler_connection, port=self.server.port, host="127.0.0.1")
+
+    def __enter__(self):
+        if self.ext_io is not None:
+            self.ext_io.open()
+        if self.server is not None:
+            self.server.client_connected.wait(2.0)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.server is not None:
+            self.server.close()
+        if self.ext_io is not None:
+            self.ext_io.close()
+        return False
+
+    def send(self, text):
+        """Pass text as if it came from remote end of connection."""
+        if self.kind == 'direct':
+            self.moler_connection.data_received(text.encode("utf-8"))
+        elif self.kind == 'memory':
+            self.ext_io.inject([text.encode("utf-8")])
+        else:
+            self.server.send(text.encode("utf-8"))
+
+
+def _stats(samples):
+    """Return dict of statistics (in microseconds) of samples (in seconds)."""
+    if not samples:
+        return {'count': 0}
+    samples = sorted(samples)
+    count = len(samples)
+    return {'count': count,
+            'mean_us': 1e6 * sum(samples) / count,
+            'p50_us': 1e6 * samples[count // 2],
+            'p99_us': 1e6 * samples[min(count - 1, int(count * 0.99))],
+            'max_us': 1e6 * samples[-1]}
+
+
+def dispatch_latency(variant, io_kind, samples_count=200):
+    """Latency from passing data into connection till observer gets it."""
+    latencies = list()
+    with _Io(io_kind) as io:
+        observer = TimingObserver(connection=io.moler_connection, runner=get_runner(variant))
+        observer.start(timeout=30)
+        for _ in range(samples_count):
+            observer.got_data.clear()
+            sent_at = time.time()
+            io.send("data\n")
+            if observer.got_data.wait(1.0):
+                latencies.append(observer.received_at - sent_at)
+        io.send("end\n")
+        observer.await_done(timeout=2.0)
+    return _stats(latencies)
+
+
+def start_latency(variant, samples_count=50):
+    """Latency from observer.start() till observer gets data sent just after start() returned."""
+    submit_times, latencies = list(), list()
+    moler_conn = _utf8_connection()
+    for _ in range(samples_count):
+        observer = TimingObserver(connection=moler_conn, runner=get_runner(variant))
+        started_at = time.time()
+        observer.start(timeout=30)
+        submit_times.append(time.time() - started_at)
+        moler_conn.data_received(b"end\n")
+        if observer.got_data.wait(1.0):
+            latencies.append(observer.received_at - started_at)
+        observer.await_done(timeout=2.0)
+    return {'start_call': _stats(submit_times), 'till_data_received': _stats(latencies)}
+
+
+def observers_scaling(variant, max_observers=256, chunks_count=200):
+    """Chunks/sec dispatched by connection to growing number of observers."""
+    points = list()
+    observers_count = 1
+    while observers_count <= max_observers:
+        moler_conn = _utf8_connection()
+        observers = [TimingObserver(connection=moler_conn, runner=get_runner(variant))
+                     for _ in range(observers_count)]
+        for observer in observers:
+            observer.start(timeout=60)
+        start_time = time.time()
+        for _ in range(chunks_count):
+            moler_conn.data_received(b"data\n")
+        duration = time.time() - start_time
+        moler_conn.data_received(b"end\n")
+        for observer in observers:
+            observer.await_done(timeout=5.0)
+        points.append({'observers': observers_count, 'chunks_per_sec': chunks_count / duration,
+                       'deliveries_per_sec': chunks_count * observers_count / duration})
+        observers_count *= 2
+    best = max(point['deliveries_per_sec'] for point in points)
+    degraded = [point['observers'] for point in points if point['deliveries_per_sec'] < best / 2]
+    return {'points': points, 'degrades_at_observers': degraded[0] if degraded else None}
+
+
+def echo_command(variant, io_kind, samples_count=50):
+    """Time from start till done of command finished by echo of its command string."""
+    durations = list()
+    with _Io(io_kind, echo=True) as io:
+        for _ in range(samples_count):
+            command = EchoCommand(connection=io.moler_connection, runner=get_runner(variant))
+            start_time = time.time()
+            command(timeout=2.0)
+            durations.append(time.time() - start_time)
+    return _stats(durations)
+
+
+def device_construction(samples_count=10):
+    """Time of constructing devices on in-memory connection."""
+    from moler.device.unixlocal import UnixLocal
+    from moler.device.unixremote import UnixRemote
+
+    sm_params = {"CONNECTION_HOPS": {"UNIX_LOCAL": {"UNIX_REMOTE": {
+        "execute_command": "ssh", "command_params": {"host": "remote_host", "login": "remote_login",
+                                                     "password": "passwd", "expected_prompt": "remote#"}}}}}
+    results = dict()
+    for device_class, params in ((UnixLocal, None), (UnixRemote, sm_params)):
+        durations = list()
+        for _ in range(samples_count):
+            io_connection = ThreadedFifoBuffer(moler_connection=_utf8_connection())
+            start_time = time.time()
+            device_class(io_connection=io_connection, sm_params=params)
+            durations.append(time.time() - start_time)
+            io_connection.close()
+        results[device_class.__name__] = _stats(durations)
+    return results
+
+
+def _measure(name, function, *args):
+    try:
+        result = function(*args)
+    except Exception as err:
+        result = {'error': repr(err)}
+    print("{:<48} {}".format(name, json.dumps(result, sort_keys=True)))
+    return result
+
+
+def _shutdown_runners(variants):
+    """Stop observers still running in background (like prompts observers of devices) to let process exit."""
+    for variant in variants:
+        try:
+            get_runner(variant).shutdown()
+        except Exception as err:
+            print("{:<48} {}".format("shutdown {}".format(variant), repr(err)))
+
+
+def run(variants=RUNNER_VARIANTS, io_kinds=('direct', 'memory', 'tcp'), max_observers=256):
+    """
+    Run all benchmarks.
+
+    :param variants: runner variants to measure (not registered ones are skipped)
+    :param io_kinds: ways of passing data into connection ('direct', 'memory', 'tcp')
+    :param max_observers: max number of observers on connection in observers scaling benchmark
+    :return: dict (JSON serializable) with environment info and results
+    """
+    available = RunnerFactory.available_variants()
+    variants = [variant for variant in variants if variant in available]
+    results = {'dispatch_latency': {}, 'start_latency': {}, 'observers_scaling': {}, 'echo_command': {}}
+    for variant in variants:
+        results['dispatch_latency'][variant] = dict(
+            (io_kind, _measure("dispatch {} {}".format(variant, io_kind), dispatch_latency, variant, io_kind))
+            for io_kind in io_kinds)
+        results['start_latency'][variant] = _measure("start {}".format(variant), start_latency, variant)
+        results['observers_scaling'][variant] = _measure("observers {}".format(variant), observers_scaling,
+                                                         variant, max_observers)
+        results['echo_command'][variant] = dict(
+            (io_kind, _measure("echo command {} {}".format(variant, io_kind), echo_command, variant, io_kind))
+            for io_kind in io_kinds if io_kind != 'direct')
+    results['device_construction'] = _measure("device construction", device_construction)
+    _shutdown_runners(set(variants) | {'threaded'})  # devices run their prompts observers on default runner
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'results': results}
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Overhead of Moler runners, connections and devices")
+    parser.add_argument('-r', '--runners', nargs='+', default=list(RUNNER_VARIANTS), help="runner variants")
+    parser.add_argument('-i', '--io', nargs='+', default=['direct', 'memory', 'tcp'], help="direct, memory, tcp")
+    parser.add_argument('-m', '--max-observers', type=int, default=256, help="max observers on connection")
+    parser.add_argument('-o', '--output', help="JSON file to store results")
+    options = parser.parse_args(argv)
+
+    report = run(variants=options.runners, io_kinds=options.io, max_observers=options.max_observers)
+    if options.output:
+        with open(options.output, "w") as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of TableText parser.
+
+Measures how many rows per second TableText parses from 10 000 rows tables: ps -ef like table (values assigned to
+columns by positions of headers), top like table (last column is free text) and the same tables passed through
+Ps and Top commands.
+
+Run it from repository root:  PYTHONPATH=. python test/benchmarks/bench_table_text.py
+"""
+
+__author__ = 'Dariusz Rosinski, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'dariusz.rosinski@nokia.com, marcin.usielski@nokia.com'
+
+import sys
+import time
+
+from moler.cmd.unix.ps import Ps
+from moler.cmd.unix.top import Top
+from moler.connection import ObservableConnection
+from moler.parser.table_text import TableText
+
+PS_HEADER = "UID        PID  PPID  C STIME TTY          TIME CMD"
+PS_ROW = "root      {:<5}     1  0  2017 ?        00:00:00 /usr/sbin/sshd -D -o Port={}"
+TOP_HEADER = "  PID USER      PR  NI    VIRT    RES    SHR S %CPU %MEM     TIME+ COMMAND"
+TOP_ROW = "{:>5} root      20   0  138888   4500   3316 S  0.0  0.2   0:01.93 systemd --switched-root --system"
+
+
+def _rows(row_format, rows_count):
+    return [row_format.format(nr, nr) for nr in range(rows_count)]
+
+
+def _rows_per_second(parse, header, rows):
+    parse(header)
+    start_time = time.time()
+    for row in rows:
+        parse(row)
+    return len(rows) / (time.time() - start_time)
+
+
+def table_text_rows_per_second(header, rows, last_column_free_text):
+    headers = header.split()
+    table = TableText(headers, list(headers), last_column_free_text=last_column_free_text)
+    return _rows_per_second(table.parse, header, rows)
+
+
+def command_rows_per_second(command, header, rows):
+    return _rows_per_second(lambda line: command.on_new_line(line, is_full_line=True), header, rows)
+
+
+def main(rows_count=10000):
+    ps_rows = _rows(PS_ROW, rows_count)
+    top_rows = _rows(TOP_ROW, rows_count)
+    ps_cmd = Ps(connection=ObservableConnection())
+    ps_cmd._cmd_output_started = True
+    top_cmd = Top(connection=ObservableConnection())
+    top_cmd._cmd_output_started = True
+    results = [
+        ("TableText by positions", table_text_rows_per_second(PS_HEADER, ps_rows, last_column_free_text=False)),
+        ("TableText free text", table_text_rows_per_second(TOP_HEADER, top_rows, last_column_free_text=True)),
+        ("Ps command", command_rows_per_second(ps_cmd, PS_HEADER, ps_rows)),
+        ("Top command", command_rows_per_second(top_cmd, TOP_HEADER, top_rows)),
+    ]
+    for name, rows_per_second in results:
+        print("{:>24}: {:>10.0f} rows/sec ({} rows)".format(name, rows_per_second, rows_count))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
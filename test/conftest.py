@@ -113,6 +113,7 @@ moler.config.loggers.set_write_mode(mode="write")
 moler.config.loggers.configure_moler_main_logger()
 moler.config.loggers.configure_runner_logger(runner_name="thread-pool")
 moler.config.loggers.configure_runner_logger(runner_name="asyncio")
+moler.config.loggers.configure_runner_logger(runner_name="single-thread")
 
 
 # --------------------------- test/test_cmds_doc.py resources ---------------------------
@@ -68,6 +68,81 @@ def test_connection_observer_behaves_like_future(net_down_detector_and_ping_outp
         ext_io.join()
 
 
+def test_inline_runner_feeds_connection_observer_inside_injecting_thread(net_down_detector_and_ping_output):
+    from moler.connection import ObservableConnection
+    from moler.io.raw.memory import InlineFifoBuffer
+    from moler.runner_factory import get_runner
+
+    connection_observer, ping_lines = net_down_detector_and_ping_output
+    connection_observer.runner = get_runner(variant="inline")
+    connection_observer.connection = ObservableConnection(decoder=lambda data: data.decode("utf-8"))
+    ext_io = InlineFifoBuffer(moler_connection=connection_observer.connection)
+    with ext_io.open():
+        connection_observer.start()
+        ext_io.inject([line.encode("utf-8") for line in ping_lines])
+        assert connection_observer.done()  # no await needed - data was parsed inside inject()
+        start_time = time.time()
+        result = connection_observer.await_done(timeout=2.0)
+        assert (time.time() - start_time) < 0.1
+        assert result == connection_observer.result()
+
+
+def test_inline_runner_times_out_not_done_observer_without_waiting(net_down_detector):
+    from moler.exceptions import ConnectionObserverTimeout
+    from moler.connection import ObservableConnection
+    from moler.io.raw.memory import InlineFifoBuffer
+    from moler.runner_factory import get_runner
+
+    net_down_detector.runner = get_runner(variant="inline")
+    net_down_detector.connection = ObservableConnection(decoder=lambda data: data.decode("utf-8"))
+    ext_io = InlineFifoBuffer(moler_connection=net_down_detector.connection)
+    with ext_io.open():
+        net_down_detector.start(timeout=5.0)
+        ext_io.inject([b"64 bytes from 10.0.2.15: icmp_req=1 ttl=64 time=0.080 ms\n"])
+        start_time = time.time()
+        with pytest.raises(ConnectionObserverTimeout):
+            net_down_detector.await_done()
+        assert (time.time() - start_time) < 0.1
+    assert net_down_detector.done()
+
+
+def test_inline_runner_logs_stacktrace_of_observer_failing_on_data(net_down_detector):
+    import logging
+    from moler.connection import ObservableConnection
+    from moler.io.raw.memory import InlineFifoBuffer
+    from moler.runner_factory import get_runner
+
+    class RecordsHandler(logging.Handler):
+        def __init__(self):
+            super(RecordsHandler, self).__init__()
+            self.records = list()
+
+        def emit(self, record):
+            self.records.append(record)
+
+    def failing_data_received(data):
+        raise ValueError("can't parse {}".format(data))
+
+    net_down_detector.data_received = failing_data_received
+    net_down_detector.runner = get_runner(variant="inline")
+    net_down_detector.connection = ObservableConnection(decoder=lambda data: data.decode("utf-8"))
+    ext_io = InlineFifoBuffer(moler_connection=net_down_detector.connection)
+    handler = RecordsHandler()
+    runner_logger = logging.getLogger('moler.runner.inline')
+    runner_logger.addHandler(handler)
+    try:
+        with ext_io.open():
+            net_down_detector.start()
+            ext_io.inject([b"garbage\n"])
+    finally:
+        runner_logger.removeHandler(handler)
+    assert net_down_detector.done()
+    with pytest.raises(ValueError):
+        net_down_detector.result()
+    error_records = [record for record in handler.records if record.levelno == logging.ERROR]
+    assert error_records[0].exc_info[0] is ValueError
+
+
 # TODO: tests for error cases
 
 
@@ -246,11 +246,36 @@ def test_can_send_data_into_ext_io_from_moler_connection(memory_connection_witho
         assert b'command to be echoed' == received_data
 
 
+def test_threaded_connection_delivers_injections_without_polling_delay():
+    from moler.connection import ObservableConnection
+    from moler.io.raw.memory import ThreadedFifoBuffer
+
+    received_data = bytearray()
+
+    def receiver(data):
+        received_data.extend(data)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe(receiver)
+    connection = ThreadedFifoBuffer(moler_connection=moler_conn)
+    with connection.open():
+        pulling_thread = connection.pulling_thread
+        connection.open()  # reopening doesn't start second pulling thread
+        assert connection.pulling_thread is pulling_thread
+        start_time = time.time()
+        for nr in range(20):
+            connection.inject([b"msg%d\n" % nr])
+        duration = time.time() - start_time
+    assert b"".join(b"msg%d\n" % nr for nr in range(20)) == received_data
+    assert duration < 20 * connection.max_delivery_wait
+    assert not pulling_thread.is_alive()
+
+
 # TODO: tests for error cases raising Exceptions - if any?
 # --------------------------- resources ---------------------------
 
 
-@pytest.fixture(params=['FifoBuffer', 'ThreadedFifoBuffer'])
+@pytest.fixture(params=['FifoBuffer', 'ThreadedFifoBuffer', 'InlineFifoBuffer'])
 def memory_connection_class(request):
     class_name = request.param
     module = importlib.import_module('moler.io.raw.memory')
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Testing IO reactor multiplexing reads of many connections inside one thread.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 4), reason="reactor uses selectors module")
+
+
+def test_reactor_reads_many_sockets_inside_one_thread(socket_pairs):
+    from moler.io.raw.reactor import IoReactor
+    reactor = IoReactor()
+    reading_threads = set()
+    received = dict()
+    all_received = threading.Event()
+
+    def make_reader(sock):
+        def on_readable():
+            reading_threads.add(threading.current_thread())
+            received[sock] = sock.recv(1024)
+            if len(received) == len(socket_pairs):
+                all_received.set()
+        return on_readable
+
+    for reading_end, _ in socket_pairs:
+        reactor.register(reading_end, make_reader(reading_end))
+    for nb, (_, writing_end) in enumerate(socket_pairs):
+        writing_end.send("data {}".format(nb).encode("utf-8"))
+
+    assert all_received.wait(timeout=2) is True
+    assert len(reading_threads) == 1
+    assert received[socket_pairs[3][0]] == b"data 3"
+    for reading_end, _ in socket_pairs:
+        reactor.unregister(reading_end)
+    assert reactor.registered_count == 0
+
+
+def test_reactor_stops_watching_when_reader_returns_false(socket_pairs):
+    from moler.io.raw.reactor import IoReactor
+    reactor = IoReactor()
+    reading_end, writing_end = socket_pairs[0]
+    calls = list()
+    called = threading.Event()
+
+    def on_readable():
+        calls.append(reading_end.recv(1024))
+        called.set()
+        return False
+
+    reactor.register(reading_end, on_readable)
+    writing_end.send(b"first")
+    assert called.wait(timeout=2) is True
+    called.clear()
+    writing_end.send(b"second")
+    assert called.wait(timeout=0.2) is False
+    assert calls == [b"first"]
+    assert reactor.registered_count == 0
+
+
+def test_stopped_reactor_closes_its_thread_and_wakeup_pipe(socket_pairs):
+    from moler.io.raw.reactor import IoReactor
+    reactor = IoReactor()
+    reading_end, writing_end = socket_pairs[0]
+    reactor.register(reading_end, lambda: reading_end.recv(1024))
+    reactor_thread = reactor._thread
+    wakeup_fds = (reactor._wakeup_read, reactor._wakeup_write)
+
+    reactor.stop()
+
+    assert reactor_thread.is_alive() is False
+    for fd in wakeup_fds:
+        with pytest.raises(OSError):
+            os.fstat(fd)
+    with pytest.raises(RuntimeError):
+        reactor.register(writing_end, lambda: None)
+    reactor.stop()  # stopping again does nothing
+
+
+def test_reactor_tcp_closes_socket_disconnected_by_remote_endpoint():
+    from moler.connection import ObservableConnection
+    from moler.io.raw.tcp import ReactorTcp
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    connection = ReactorTcp(moler_connection=ObservableConnection(), port=server.getsockname()[1], host="127.0.0.1")
+    connection.open()
+    client_socket, _ = server.accept()
+    client_socket.close()
+    server.close()
+
+    start_time = time.time()
+    while (connection.socket is not None) and (time.time() - start_time < 2):
+        time.sleep(0.01)
+    assert connection.socket is None
+    assert connection._reactor is None
+    connection.close()
+
+
+@pytest.yield_fixture()
+def socket_pairs():
+    pairs = [socket.socketpair() for _ in range(5)]
+    yield pairs
+    for reading_end, writing_end in pairs:
+        reading_end.close()
+        writing_end.close()
@@ -10,6 +10,7 @@ __author__ = 'Grzegorz Latuszek'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com'
 
+import sys
 import time
 import importlib
 import pytest
@@ -101,7 +102,12 @@ def test_can_receive_binary_data_from_connection(tcp_connection_class,
 # --------------------------- resources ---------------------------
 
 
-@pytest.fixture(params=['io.raw.tcp.ThreadedTcp'])
+tcp_connection_classes = ['io.raw.tcp.ThreadedTcp']
+if sys.version_info >= (3, 4):  # reactor uses selectors module
+    tcp_connection_classes.append('io.raw.tcp.ReactorTcp')
+
+
+@pytest.fixture(params=tcp_connection_classes)
 def tcp_connection_class(request):
     module_name, class_name = request.param.rsplit('.', 1)
     module = importlib.import_module('moler.{}'.format(module_name))
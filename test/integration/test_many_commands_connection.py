@@ -7,7 +7,9 @@ __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
 import pytest
+import threading
 import time
+from array import array
 from moler.event_awaiter import EventAwaiter
 from moler.exceptions import CommandTimeout
 from moler.command_scheduler import CommandScheduler
@@ -71,6 +73,82 @@ def test_timeout_before_command_sent(buffer_connection, command_output_and_expec
     assert ping_ret == expected_result
 
 
+def test_queued_commands_get_slot_without_helper_threads(buffer_connection):
+    from moler.cmd.unix.whoami import Whoami
+    whoami_cmds = [Whoami(connection=buffer_connection.moler_connection) for _ in range(20)]
+    whoami_cmds[0].start(timeout=2)
+    threads_before = threading.active_count()
+    for whoami_cmd in whoami_cmds[1:]:
+        whoami_cmd.start(timeout=2)
+    # at most one thread guarding timeouts of all queued commands
+    assert threading.active_count() <= threads_before + 1
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=whoami_cmds[1]) is True
+    whoami_cmds[0].cancel()
+    # slot is passed to next command at once, it is submitted by scheduler thread
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=whoami_cmds[1]) is False
+    start_time = time.time()
+    while whoami_cmds[1]._future is None and time.time() - start_time < 1:
+        time.sleep(0.001)
+    assert whoami_cmds[1]._future is not None
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=whoami_cmds[2]) is True
+    for whoami_cmd in whoami_cmds[1:]:
+        whoami_cmd.cancel()
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=whoami_cmds[-1]) is False
+
+
+def test_queued_command_gets_exception_when_it_cannot_be_sent(buffer_connection,
+                                                               command_output_and_expected_result_uptime_whoami):
+    from moler.cmd.unix.uptime import Uptime
+    from moler.cmd.unix.whoami import Whoami
+
+    class NotSendableWhoami(Whoami):
+        def send_command(self):
+            raise IOError("connection closed")
+
+    command_output, expected_result = command_output_and_expected_result_uptime_whoami
+    uptime_cmd = Uptime(connection=buffer_connection.moler_connection)
+    not_sendable_cmd = NotSendableWhoami(connection=buffer_connection.moler_connection)
+    whoami_cmd = Whoami(connection=buffer_connection.moler_connection)
+    uptime_cmd.start(timeout=2)
+    not_sendable_cmd.start(timeout=2)
+    whoami_cmd.start(timeout=2)
+    time.sleep(0.05)
+    buffer_connection.moler_connection.data_received(command_output[0].encode("utf-8"))
+    assert EventAwaiter.wait_for_all(timeout=2, events=[uptime_cmd, not_sendable_cmd]) is True
+    assert uptime_cmd.result() == expected_result[0]  # failure of next command doesn't leak into previous one
+    with pytest.raises(IOError):
+        not_sendable_cmd.result()
+    time.sleep(0.05)
+    buffer_connection.moler_connection.data_received(command_output[1].encode("utf-8"))
+    assert whoami_cmd.await_done(timeout=2) == expected_result[1]
+
+
+def test_queued_commands_get_slot_by_priority_and_deadline(buffer_connection):
+    from moler.cmd.unix.whoami import Whoami
+    running_cmd = Whoami(connection=buffer_connection.moler_connection)
+    late_cmd = Whoami(connection=buffer_connection.moler_connection)
+    early_cmd = Whoami(connection=buffer_connection.moler_connection)
+    important_cmd = Whoami(connection=buffer_connection.moler_connection)
+    important_cmd.priority = 5
+    running_cmd.start(timeout=2)
+    late_cmd.start(timeout=3)
+    early_cmd.start(timeout=2)
+    important_cmd.start(timeout=4)
+    running_cmd.cancel()
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=important_cmd) is False
+    important_cmd.cancel()
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=early_cmd) is False
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=late_cmd) is True
+    early_cmd.cancel()
+    assert CommandScheduler.is_waiting_for_execution(connection_observer=late_cmd) is False
+    late_cmd.cancel()
+    stats = CommandScheduler.get_queue_wait_statistics(buffer_connection.moler_connection)
+    assert stats['started'] == 4
+    assert stats['queued'] == 3
+    assert stats['timed_out_in_queue'] == 0
+    assert 0 < stats['wait_time_max'] <= stats['wait_time_total']
+
+
 @pytest.fixture
 def command_output_and_expected_result_ping():
     data = (
@@ -107,6 +185,16 @@ host:~ # """
         'time_max_seconds': 0.062 * 0.001,
         'time_mdev_seconds': 0.012 * 0.001,
         'time_unit': 'ms',
+        'replies': 6,
+        'replies_duplicated': 0,
+        'replies_out_of_order': 0,
+        'replies_sequence': array('l', [1, 2, 3, 4, 5, 6]),
+        'replies_ttl': array('l', [64, 64, 64, 64, 64, 64]),
+        'replies_rtt_seconds': array('d', [0.047 * 0.001, 0.039 * 0.001, 0.041 * 0.001, 0.035 * 0.001, 0.051 * 0.001,
+                                           0.062 * 0.001]),
+        'rtt_p50_seconds': 0.041 * 0.001,
+        'rtt_p95_seconds': 0.062 * 0.001,
+        'rtt_p99_seconds': 0.062 * 0.001,
     }
     return data, result
 
@@ -68,6 +68,19 @@ def test_documentation_exists():
     assert check_if_documentation_exists(events_path) is True
 
 
+def test_documentation_exists_checked_in_parallel_processes(capsys):
+    from moler.util.cmds_events_doc import check_if_documentation_exists
+
+    dir_path = path.dirname(path.realpath(__file__))
+    moler_dir_path = path.dirname(dir_path)
+    events_path = path.join(moler_dir_path, "moler", "events")
+
+    assert check_if_documentation_exists(events_path, processes=2) is True
+    output = capsys.readouterr().out
+    assert "Time of event checks (slowest first):" in output
+    assert "processed events have correct documentation" in output
+
+
 def test_buffer_connection_returns_threadconnection_with_moler_conn():
     from moler.io.raw.memory import ThreadedFifoBuffer
     from moler.connection import ObservableConnection
@@ -214,6 +214,69 @@ def test_command_is_running_after_sending_command_string(do_nothing_command__for
     ping.start()  # start the command-future
 
 
+def test_line_rules_are_applied_in_order_with_guards_and_stop():
+    import re
+    from moler.cmd import LineRule, LineRules
+
+    class Parsed(object):
+        in_table = False
+        found = []
+
+    parsed = Parsed()
+    rules = LineRules([
+        LineRule(re.compile(r"^TABLE$"), lambda cmd, match: setattr(cmd, 'in_table', True)),
+        LineRule(re.compile(r"(?P<KEY>\w+)=(?P<VALUE>\w+)"), lambda cmd, match: cmd.found.append(match.groups()),
+                 guard=lambda cmd: cmd.in_table, stop=False),
+        LineRule(re.compile(r"(?P<ANY>\w+)"), lambda cmd, match: cmd.found.append(match.group('ANY')), literal="x"),
+    ])
+
+    assert rules.parse(parsed, "a=xb", is_full_line=True) is True  # guarded rule skipped
+    assert rules.parse(parsed, "TABLE", is_full_line=True) is True
+    assert rules.parse(parsed, "a=xb", is_full_line=True) is True  # both rules (first doesn't stop)
+    assert rules.parse(parsed, "a=b", is_full_line=True) is True  # last rule skipped by literal prefilter
+    assert rules.parse(parsed, "c=xd", is_full_line=False) is False  # partial line
+    assert parsed.found == ["a", ("a", "xb"), "a", ("a", "b")]
+
+
+def test_line_rules_use_handlers_overridden_in_subclass():
+    from moler.cmd.unix.ping import Ping
+
+    class PingCollectingReplies(Ping):
+        def _parse_reply(self, match):
+            self.collected.append(int(match.group('SEQ')))
+
+    ping = PingCollectingReplies(connection=ObservableConnection(), destination='localhost')
+    ping.collected = list()
+    ping._parse_line_with_rules("64 bytes from localhost (127.0.0.1): icmp_seq=1 ttl=64 time=0.047 ms",
+                                is_full_line=True)
+    assert ping.collected == [1]
+    assert ping.get_rtt_statistics()['replies'] == 0  # base class handler not called
+
+
+def test_prompt_hint_skips_only_lines_which_cannot_be_prompt():
+    import re
+    from moler.cmd import PromptHint
+
+    default_prompt = re.compile(r'^[^<]*[\$|%|#|>|~]\s*$')
+    hint = PromptHint.get(default_prompt)
+    assert hint.end_chars == frozenset("$|%#>~")
+    assert PromptHint.get(default_prompt) is hint
+    lines = ["user@host:~$ ", "host:~ #", "drwxr-xr-x 2 user users 4096 Jan 1 file.txt", "", "   ", "x > ",
+             "<a>", "[ 0.000000] Linux version 4.15.0"]
+    for line in lines:
+        assert bool(default_prompt.search(line)) == (hint.may_match(line) and bool(default_prompt.search(line)))
+    assert not hint.may_match("[ 0.000000] Linux version 4.15.0")
+
+    literal_prompt = re.compile(r'^moler_bash#')
+    hint = PromptHint.get(literal_prompt)
+    assert hint.literal == 'moler_bash#'
+    assert hint.end_chars is None
+    assert hint.may_match("moler_bash# ls")
+    assert not hint.may_match("moler_bash$")
+
+    assert PromptHint.get(re.compile(r'host.*#\s*$', re.MULTILINE)).end_chars is None
+
+
 # --------------------------- resources ---------------------------
 
 
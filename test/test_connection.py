@@ -484,6 +484,47 @@ def test_garbage_collected_subscriber_is_not_notified():
     moler_conn.data_received("data")
     assert len(received_data) == 1
 
+
+def test_dispatching_lines_splits_data_once_for_all_observers():
+    from moler.connection import ObservableConnection
+
+    moler_conn = ObservableConnection(dispatch_lines=True)
+    received_lines = []
+
+    def lines_observer1(data):
+        received_lines.append(moler_conn.received_lines(data))
+
+    def lines_observer2(data):
+        received_lines.append(moler_conn.received_lines(data))
+
+    moler_conn.subscribe(lines_observer1)
+    moler_conn.subscribe(lines_observer2)
+    moler_conn.data_received("first line\nsecond\r\npart of")
+
+    assert len(received_lines) == 2
+    assert received_lines[0] is received_lines[1]
+    assert received_lines[0] == [("first line\n", True), ("second\r\n", True), ("part of", False)]
+
+
+def test_not_dispatching_lines_splits_data_for_each_observer():
+    from moler.connection import ObservableConnection
+
+    moler_conn = ObservableConnection()
+    received_lines = []
+
+    def lines_observer1(data):
+        received_lines.append(moler_conn.received_lines(data))
+
+    def lines_observer2(data):
+        received_lines.append(moler_conn.received_lines(data))
+
+    moler_conn.subscribe(lines_observer1)
+    moler_conn.subscribe(lines_observer2)
+    moler_conn.data_received("first line\npart of")
+
+    assert received_lines[0] is not received_lines[1]
+    assert received_lines[0] == received_lines[1] == [("first line\n", True), ("part of", False)]
+
 # --------------------------- resources ---------------------------
 
 
@@ -39,6 +39,47 @@ def test_device_unix_can_return_cd_command(configure_net_1_connection):
     )
 
 
+def test_device_plans_path_from_transitions(buffer_connection):
+    from moler.device.unixremote import UnixRemote
+
+    dev = UnixRemote(io_connection=buffer_connection, sm_params=unix_remote_sm_params)
+    for source_state in dev._state_hops:  # computed shortest paths agree with hand-written hops
+        for dest_state, next_state in dev._state_hops[source_state].items():
+            assert dev._next_hops[source_state][dest_state] == next_state
+
+    assert dev.plan_path("NOT_CONNECTED", "UNIX_REMOTE_ROOT") == (["UNIX_LOCAL", "UNIX_REMOTE", "UNIX_REMOTE_ROOT"],
+                                                                 None)
+    dev._add_state_change_duration("UNIX_LOCAL", "UNIX_REMOTE", 2.0)
+    dev._add_state_change_duration("UNIX_LOCAL", "UNIX_REMOTE", 4.0)
+    dev._add_state_change_duration("UNIX_REMOTE", "UNIX_REMOTE_ROOT", 0.5)
+    assert dev.plan_path("UNIX_LOCAL", "UNIX_REMOTE_ROOT") == (["UNIX_REMOTE", "UNIX_REMOTE_ROOT"], 3.5)
+
+
+
+def test_device_keeps_durations_of_last_state_changes_only(buffer_connection):
+    from moler.device.unixlocal import UnixLocal
+
+    dev = UnixLocal(io_connection=buffer_connection)
+    for _ in range(dev.max_state_changes_durations + 10):
+        dev._add_state_change_duration("UNIX_LOCAL", "UNIX_LOCAL_ROOT", 1.0)
+    assert len(dev.state_changes_durations) == dev.max_state_changes_durations
+    assert dev.state_changes_durations[-1] == ("UNIX_LOCAL", "UNIX_LOCAL_ROOT", 1.0)
+    assert dev._state_change_costs[("UNIX_LOCAL", "UNIX_LOCAL_ROOT")] == (dev.max_state_changes_durations + 10,
+                                                                       dev.max_state_changes_durations + 10.0)
+
+def test_device_applies_its_result_storage_to_commands_accumulating_records(buffer_connection):
+    from moler.device.unixlocal import UnixLocal
+
+    dev = UnixLocal(io_connection=buffer_connection, sm_params={"RESULT_STORAGE": {"mode": "ring", "max_records": 5}})
+    dev.goto_state("UNIX_LOCAL")
+    assert dev.result_storage == {"mode": "ring", "max_records": 5}
+    cat_cmd = dev.get_cmd(cmd_name="cat", cmd_params={"path": "/var/log/big.log"})
+    assert cat_cmd.current_ret["LINES"].maxlen == 5
+    cat_cmd = dev.get_cmd(cmd_name="cat", cmd_params={"path": "/var/log/big.log"}, result_storage={"mode": "memory"})
+    assert cat_cmd.current_ret["LINES"] == []
+    assert not dev.get_cmd(cmd_name="cd", cmd_params={"path": "/home/user/"}).accumulates_records
+
+
 # --------------------------- resources ---------------------------
 
 
@@ -50,3 +91,21 @@ def configure_net_1_connection():
     conn_cfg.define_connection(name='net_1', io_type='memory')
     yield
     conn_cfg.clear()
+
+
+unix_remote_sm_params = {
+    "CONNECTION_HOPS": {
+        "UNIX_LOCAL": {
+            "UNIX_REMOTE": {
+                "execute_command": "ssh",
+                "command_params": {"host": "remote_host", "login": "remote_login", "password": "passwd4remote",
+                                   "expected_prompt": "remote#"}
+            }
+        },
+        "UNIX_REMOTE": {
+            "UNIX_REMOTE_ROOT": {
+                "command_params": {"password": "root_passwd", "expected_prompt": "remote_root#"}
+            }
+        }
+    }
+}
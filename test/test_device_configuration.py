@@ -152,6 +152,105 @@ def test_can_select_all_devices_loaded_from_config_file(moler_config, device_fac
     assert device.__class__.__name__ == 'UnixLocal'
 
 
+def test_create_all_devices_creates_other_devices_when_one_fails(device_config, device_factory):
+    from moler.exceptions import DevicesCreationFailure
+    for device_name in ('MEM_1', 'MEM_2', 'MEM_3'):
+        device_config.define_device(name=device_name,
+                                    device_class='moler.device.unixlocal.UnixLocal',
+                                    connection_desc={'io_type': 'memory', 'variant': 'threaded'},
+                                    connection_hops={})
+    device_config.define_device(name='BROKEN',
+                                device_class='moler.device.not_existing.NotExisting',
+                                connection_desc={'io_type': 'memory', 'variant': 'threaded'},
+                                connection_hops={})
+
+    with pytest.raises(DevicesCreationFailure) as err:
+        device_factory.create_all_devices(max_workers=2)
+
+    assert list(err.value.failures.keys()) == ['BROKEN']
+    assert sorted(device_factory._devices.keys()) == ['MEM_1', 'MEM_2', 'MEM_3']
+    for device in device_factory._devices.values():
+        assert device.current_state == 'UNIX_LOCAL'
+        assert device.state_changes_durations[0][:2] == ('NOT_CONNECTED', 'CONNECTION_OPEN')
+
+
+def test_create_all_devices_reports_devices_not_ready_in_time(device_config, device_factory, monkeypatch):
+    import threading
+    import time
+    from moler.exceptions import DevicesCreationFailure
+    for device_name in ('MEM_1', 'HANGING', 'NOT_IN_INITIAL_STATE'):
+        device_config.define_device(name=device_name,
+                                    device_class='moler.device.unixlocal.UnixLocal',
+                                    connection_desc={'io_type': 'memory', 'variant': 'threaded'},
+                                    connection_hops={},
+                                    initial_state='UNIX_LOCAL_ROOT' if device_name == 'NOT_IN_INITIAL_STATE' else None)
+    release_hanging = threading.Event()
+    create_device = device_factory._create_device
+
+    def hanging_or_stuck_device(name, *args, **kwargs):
+        if name == 'HANGING':
+            release_hanging.wait(5)  # like connection that never opens
+        device = create_device(name, *args, **kwargs)
+        if name == 'NOT_IN_INITIAL_STATE':
+            device.goto_state = lambda state, timeout=-1: None  # like goto_state() running out of time
+        return device
+
+    monkeypatch.setattr(device_factory, '_create_device', hanging_or_stuck_device)
+    start_time = time.time()
+    try:
+        with pytest.raises(DevicesCreationFailure) as err:
+            device_factory.create_all_devices(timeout=0.5)
+        duration = time.time() - start_time
+    finally:
+        release_hanging.set()
+
+    assert duration < 2
+    assert sorted(err.value.failures.keys()) == ['HANGING', 'NOT_IN_INITIAL_STATE']
+    assert 'MEM_1' in device_factory._devices
+
+
+def test_create_all_devices_closes_device_created_after_timeout(device_config, device_factory, monkeypatch):
+    import threading
+    import time
+    from moler.exceptions import DevicesCreationFailure
+    for device_name in ('MEM_1', 'SLOW'):
+        device_config.define_device(name=device_name,
+                                    device_class='moler.device.unixlocal.UnixLocal',
+                                    connection_desc={'io_type': 'memory', 'variant': 'threaded'},
+                                    connection_hops={})
+    release_slow = threading.Event()
+    slow_devices = list()
+    create_device = device_factory._create_device
+
+    def slow_device(name, *args, **kwargs):
+        device = create_device(name, *args, **kwargs)
+        if name == 'SLOW':
+            goto_state = device.goto_state
+
+            def slow_goto_state(state, timeout=-1):
+                goto_state(state=state, timeout=timeout)
+                release_slow.wait(5)  # like device entering its initial state too late
+
+            device.goto_state = slow_goto_state
+            slow_devices.append(device)
+        return device
+
+    monkeypatch.setattr(device_factory, '_create_device', slow_device)
+    try:
+        with pytest.raises(DevicesCreationFailure) as err:
+            device_factory.create_all_devices(timeout=0.5)
+    finally:
+        release_slow.set()
+    assert list(err.value.failures.keys()) == ['SLOW']
+
+    slow_connection = slow_devices[0].io_connection
+    start_time = time.time()
+    while (slow_connection.pulling_thread is not None) and (time.time() - start_time < 2):
+        time.sleep(0.01)
+    assert slow_connection.pulling_thread is None  # connection of abandoned device is closed
+    assert sorted(device_factory._devices.keys()) == ['MEM_1']
+
+
 def test_can_select_device_loaded_from_env_variable(moler_config, monkeypatch, device_factory):
     conn_config = os.path.join(os.path.dirname(__file__), "resources", "device_config.yml")
     monkeypatch.setitem(os.environ, 'MOLER_CONFIG', conn_config)
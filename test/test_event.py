@@ -85,6 +85,20 @@ def test_event_whole_output(buffer_connection):
     assert event.done() is True
 
 
+def test_events_get_same_lines_from_line_dispatching_connection():
+    from moler.events.unix.wait4prompt import Wait4prompt
+    moler_conn = ObservableConnection(dispatch_lines=True)
+    event1 = Wait4prompt(connection=moler_conn, prompt="bash", till_occurs_times=1)
+    event2 = Wait4prompt(connection=moler_conn, prompt="host", till_occurs_times=1)
+    event1.start(timeout=0.1)
+    event2.start(timeout=0.1)
+    for output in ["user@ba", "sh:~$ ssh host\n", "host:~ #\n"]:
+        moler_conn.data_received(output)
+
+    assert event1.await_done()[0]['line'] == "user@bash:~$ ssh host"
+    assert event2.await_done()[0]['line'] == "user@bash:~$ ssh host"
+
+
 def test_event_get_last_occurrence(buffer_connection):
     from moler.events.unix.wait4prompt import Wait4prompt
     output = "bash\n"
@@ -98,6 +112,40 @@ def test_event_get_last_occurrence(buffer_connection):
     assert occurrence == dict_output
 
 
+def test_events_running_on_connection_share_pattern_index():
+    from moler.events.shared.wait4 import Wait4
+    from moler.events.unix.wait4prompt import Wait4prompt
+    moler_conn = ObservableConnection()
+    wait4 = Wait4(connection=moler_conn, detect_patterns=[r'(?P<bytes>\d+) bytes from', 'Login:'], till_occurs_times=1)
+    wait4prompt = Wait4prompt(connection=moler_conn, prompt=r'host:.*#', till_occurs_times=1)
+    wait4.start(timeout=0.1)
+    wait4prompt.start(timeout=0.1)
+    assert wait4._pattern_index is wait4prompt._pattern_index
+    for output in ["PING host (10.0.2.15) 56(84) bytes of data.\n", "64 bytes from host\n", "host:~ #\n"]:
+        moler_conn.data_received(output)
+
+    assert wait4.await_done()[0]['named_groups'] == {'bytes': '64'}
+    assert wait4prompt.await_done()[0]['line'] == "host:~ #"
+
+
+def test_pattern_index_finds_same_matches_as_separate_patterns():
+    import re
+    from moler.events.patternindex import PatternIndex
+    patterns = [re.compile(pattern) for pattern in [r'host:.*#', r'(?P<id>\d+) bytes', r'(?P<id>x)y', r'(\w)\1',
+                                                    r'(?i)login', r'^[^<]*[\$|%|#|>|~]\s*$']]
+    pattern_index = PatternIndex()
+    pattern_index.register(patterns)
+    lines = ["host:~ #", "64 bytes from", "xy", "aa", "LOGIN:", "user@host:~>", "nothing to find here"]
+    for line in lines:
+        for pattern in patterns:
+            index_match = pattern_index.search(pattern, line)
+            match = pattern.search(line)
+            assert (index_match.group(0) if index_match else None) == (match.group(0) if match else None)
+
+    pattern_index.unregister(patterns[:1])
+    assert pattern_index.search(patterns[1], "64 bytes from").group('id') == '64'
+
+
 def test_get_not_supported_parser():
     le = LineEvent(connection=None, detect_patterns=['Sample pattern'], match='not_supported_value')
     le._get_parser()
@@ -141,3 +189,31 @@ def do_nothing_command_class__for_major_base_class(command_major_base_class):
 def do_nothing_command__for_major_base_class(do_nothing_command_class__for_major_base_class):
     instance = do_nothing_command_class__for_major_base_class()
     return instance
+
+
+def test_wait4prompts_reports_last_prompt_of_chunk_and_keeps_line_fragment():
+    from moler.events.unix.wait4prompts import Wait4prompts
+    moler_conn = ObservableConnection()
+    states = list()
+    event = Wait4prompts(connection=moler_conn, prompts={r'user@host01:.*>': "UNIX_LOCAL", r'host:.*#': "UNIX_REMOTE"},
+                         till_occurs_times=-1)
+    event.add_event_occurred_callback(callback=lambda event: states.append(event.get_last_occurrence()['state']),
+                                      callback_params={"event": event})
+    event.start(timeout=0.5)
+    moler_conn.data_received("user@host01:~> ssh host\nhost:~ #\nuser@ho")
+    assert states == ["UNIX_REMOTE"]
+    moler_conn.data_received("st01:~> \n")
+    assert states == ["UNIX_REMOTE", "UNIX_LOCAL"]
+    assert event.get_last_occurrence()['line'] == "user@host01:~> "
+    event.cancel()
+
+
+def test_wait4prompts_gives_state_of_last_matching_prompt_when_prompts_overlap():
+    from moler.events.unix.wait4prompts import Wait4prompts
+    moler_conn = ObservableConnection()
+    event = Wait4prompts(connection=moler_conn, prompts={r'host.*#': "UNIX_REMOTE", r'^[^<]*[\$|%|#|>|~]\s*$': "PROXY_PC",
+                                                         r'user@host01:.*>': "UNIX_LOCAL"},
+                         till_occurs_times=1)
+    event.start(timeout=0.5)
+    moler_conn.data_received("host:~ #\n")  # matches both first and generic prompt
+    assert event.await_done(timeout=0.5)[0]['state'] == "PROXY_PC"
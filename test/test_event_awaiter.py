@@ -4,6 +4,8 @@ __author__ = 'Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
+import threading
+import time
 from moler.events.unix.wait4prompt import Wait4prompt
 from moler.event_awaiter import EventAwaiter
 from moler.connection import ObservableConnection
@@ -86,3 +88,36 @@ def test_events_false_any():
     assert 0 == len(done)
     assert 2 == len(not_done)
     EventAwaiter.cancel_all_events(events)
+
+
+def test_events_first_done_is_returned():
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb", "ccc")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    assert EventAwaiter.wait_for_first(timeout=0.05, events=events) is None
+    timer = threading.Timer(0.05, lambda: connection.data_received(patterns[1]))
+    timer.start()
+    assert EventAwaiter.wait_for_first(timeout=2, events=events) is events[1]
+    timer.join()
+    EventAwaiter.cancel_all_events(events)
+
+
+def test_events_wait_for_all_is_woken_by_done_events():
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    timer = threading.Timer(0.1, lambda: connection.data_received("aaa bbb"))
+    timer.start()
+    start_time = time.time()
+    assert EventAwaiter.wait_for_all(timeout=5, events=events) is True
+    assert time.time() - start_time < 2
+    timer.join()
+    EventAwaiter.cancel_all_events(events)
@@ -245,6 +245,47 @@ def test_raw_logger_can_create_both_raw_logs(monkeypatch):
         os.remove(filename)
 
 
+def test_async_logger_writes_raw_logs_inside_writer_thread(monkeypatch):
+    import os
+    import threading
+    import moler.config.loggers as m_logger
+
+    binary_msg = b"127.0.0.1 \xe2\x86\x92 ttl"
+    writing_threads = set()
+
+    monkeypatch.setattr(m_logger, 'raw_logs_active', True)
+    monkeypatch.setattr(m_logger, 'async_logs_active', True)
+    device_data_logger = m_logger.configure_device_logger(connection_name='Async_Suse_11', propagate=False)
+    raw_handler = None
+    for hndl in device_data_logger.handlers:
+        assert isinstance(hndl, m_logger.AsyncHandler)
+        if isinstance(hndl.target, m_logger.RawFileHandler) and \
+                not isinstance(hndl.target.formatter, m_logger.RawTraceFormatter):
+            raw_handler = hndl.target
+    original_emit = raw_handler.emit
+
+    def emit(record):
+        writing_threads.add(threading.current_thread())
+        original_emit(record)
+
+    monkeypatch.setattr(raw_handler, 'emit', emit)
+    try:
+        device_data_logger.log(level=m_logger.RAW_DATA, msg=binary_msg, extra={'transfer_direction': '<'})
+        m_logger.flush_async_logs(timeout=2)
+        with open(raw_handler.baseFilename, mode='rb') as logfh:
+            content = logfh.read()
+            assert content == binary_msg
+        assert threading.current_thread() not in writing_threads
+    finally:
+        created_files = []
+        for hndl in device_data_logger.handlers[:]:
+            hndl.close()
+            device_data_logger.removeHandler(hndl)
+            created_files.append(hndl.target.baseFilename)
+        for filename in created_files:
+            os.remove(filename)
+
+
 def test_raw_trace_log_can_be_yaml_loaded(monkeypatch):
     import os
     import yaml
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for registry of commands and events.
+"""
+
+__author__ = 'Grzegorz Latuszek'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com'
+
+import importlib
+import inspect
+import pkgutil
+
+
+def test_registry_finds_the_same_observers_as_importing_modules():
+    from moler.observers_registry import get_observers_in_package
+
+    for package_name in ('moler.cmd.unix', 'moler.events.unix', 'moler.cmd.scpi.scpi'):
+        imported = dict()
+        package = importlib.import_module(package_name)
+        for _, modname, _ in pkgutil.iter_modules(package.__path__):
+            module_name = "{}.{}".format(package_name, modname)
+            module = importlib.import_module(module_name)
+            for class_name, class_obj in inspect.getmembers(module, inspect.isclass):
+                if class_obj.__module__ == module_name:
+                    imported[class_obj.observer_name] = "{}.{}".format(module_name, class_name)
+        assert get_observers_in_package(package_name) == imported
+
+
+def test_registry_is_built_once_per_package(monkeypatch):
+    import moler.observers_registry as registry
+
+    registry.clear()
+    first = registry.get_observers_in_package('moler.cmd.unix')
+    assert first['ip_addr'] == 'moler.cmd.unix.ip_addr.IpAddr'
+
+    def fail_on_rebuild(package_name):
+        raise AssertionError("package {} scanned again".format(package_name))
+
+    monkeypatch.setattr(registry, '_find_observers_in_package', fail_on_rebuild)
+    assert registry.get_observers_in_package('moler.cmd.unix') is first
@@ -77,3 +77,20 @@ def test_tabletext_for_emty_value_field():
             result.append(z)
 
     assert result == table_text.COMMAND_RESULT_V4
+
+
+def test_tabletext_last_column_free_text_with_converters():
+    from moler.parser import table_text
+    t_text = table_text.TableText([r"PID", r"USER", r"%CPU", r"COMMAND"], ["PID", "USER", "%CPU", "COMMAND"],
+                                  converters={"PID": str}, last_column_free_text=True)
+
+    lines = ["  PID USER      %CPU COMMAND",
+             " 2642 bylica     1.7 java -Xmx1g  -jar app.jar",
+             "",
+             "    1 root"]
+    result = [t_text.parse(line) for line in lines]
+
+    assert result == [None,
+                      {'PID': '2642', 'USER': 'bylica', '%CPU': 1.7, 'COMMAND': 'java -Xmx1g  -jar app.jar'},
+                      None,
+                      None]  # too few values for row of table
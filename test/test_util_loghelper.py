@@ -119,3 +119,46 @@ def test_passing_extra_param_into_helper_logging_functions():
         fun_using_helper_logging()
 
     assert logged_record[0].transfer_direction == "<"
+
+
+def test_level_is_logged_only_if_some_handler_accepts_it():
+    import logging
+    from moler.util.loghelper import is_level_logged
+
+    logger = logging.getLogger('moler.test.is_level_logged')
+    logger.setLevel(1)
+    logger.propagate = False
+    handler = logging.NullHandler()
+    handler.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    try:
+        assert is_level_logged(logger, logging.INFO) is True
+        assert is_level_logged(logger, logging.DEBUG) is False
+        handler.setLevel(logging.DEBUG)
+        assert is_level_logged(logger, logging.DEBUG) is True
+        assert is_level_logged(None, logging.ERROR) is False
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_level_is_logged_sees_handler_added_after_first_check():
+    import logging
+    from moler.util.loghelper import is_level_logged
+
+    logger = logging.getLogger('moler.test.is_level_logged.late_handler')
+    logger.setLevel(logging.DEBUG)
+    parent = logging.getLogger('moler.test.is_level_logged')
+    parent.propagate = False  # isolate from root and pytest handlers
+    saved_parent_handlers = parent.handlers[:]
+    for handler in saved_parent_handlers:
+        parent.removeHandler(handler)
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.INFO)
+    try:
+        assert is_level_logged(logger, logging.INFO) is False
+        parent.addHandler(handler)  # like logging.basicConfig() or caplog done outside of Moler
+        assert is_level_logged(logger, logging.INFO) is True
+    finally:
+        parent.removeHandler(handler)
+        for saved_handler in saved_parent_handlers:
+            parent.addHandler(saved_handler)
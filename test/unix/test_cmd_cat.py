@@ -24,6 +24,33 @@ def test_cat_raise_exception_wrong_path(buffer_connection, command_output_and_ex
         cat_cmd()
 
 
+def test_cat_keeps_only_last_lines_in_ring_result_storage(buffer_connection):
+    output = "cat /var/log/big.log\n" + "".join("line {}\n".format(nr) for nr in range(100)) + "ute@debdev:~$ "
+    buffer_connection.remote_inject_response([output])
+    cat_cmd = Cat(connection=buffer_connection.moler_connection, path="/var/log/big.log")
+    cat_cmd.set_result_storage(mode='ring', max_records=3)
+    result = cat_cmd()
+    assert list(result['LINES']) == ["line 97", "line 98", "line 99"]
+
+
+def test_cat_spills_lines_to_disk_result_storage(buffer_connection, tmpdir):
+    import os
+    output = "cat /var/log/big.log\n" + "".join("line {}\n".format(nr) for nr in range(100)) + "ute@debdev:~$ "
+    buffer_connection.remote_inject_response([output])
+    cat_cmd = Cat(connection=buffer_connection.moler_connection, path="/var/log/big.log")
+    cat_cmd.set_result_storage(mode='disk', directory=str(tmpdir))
+    lines = cat_cmd()['LINES']
+    assert len(lines) == 100
+    assert lines[0] == "line 0"
+    assert lines[-1] == "line 99"
+    assert lines[10:12] == ["line 10", "line 11"]
+    assert lines == ["line {}".format(nr) for nr in range(100)]
+    assert os.listdir(str(tmpdir)) == []  # file without name can't be left in directory
+    lines.close()
+    with pytest.raises(IndexError):
+        lines[0]
+
+
 @pytest.fixture
 def command_output_and_expected_result():
     data = """
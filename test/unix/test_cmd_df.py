@@ -17,6 +17,14 @@ def test_calling_df_returns_result(buffer_connection, command_output_and_expecte
     result = df_cmd()
     assert result == expected_result
 
+
+def test_df_ignores_prompt_line_ended_with_newline(buffer_connection):
+    from moler.cmd.unix import df
+    buffer_connection.remote_inject_response([df.COMMAND_OUTPUT + "\n"])
+    df_cmd = df.Df(connection=buffer_connection.moler_connection)
+    result = df_cmd()
+    assert result == df.COMMAND_RESULT
+
 # --------------------------- resources
 
 
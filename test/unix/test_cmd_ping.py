@@ -23,3 +23,50 @@ def test_ping_observer_timeout(buffer_connection):
     cmd_ping.terminating_timeout = 0
     with pytest.raises(CommandTimeout):
         cmd_ping(timeout=0.1)
+
+
+def test_ping_counts_duplicated_and_out_of_order_replies_while_running(buffer_connection):
+    buffer_connection.remote_inject_response(["ping 10.0.0.1\n",
+                                              "PING 10.0.0.1 (10.0.0.1) 56(84) bytes of data.\n",
+                                              "64 bytes from 10.0.0.1: icmp_seq=1 ttl=64 time=1.0 ms\n",
+                                              "64 bytes from 10.0.0.1: icmp_seq=3 ttl=64 time=3.0 ms\n",
+                                              "64 bytes from 10.0.0.1: icmp_seq=2 ttl=64 time=20.0 ms\n",
+                                              "64 bytes from 10.0.0.1: icmp_seq=3 ttl=64 time=3.5 ms (DUP!)\n"])
+    cmd_ping = Ping(buffer_connection.moler_connection, destination='10.0.0.1')
+    replies = list()
+    for reply in cmd_ping.stream(timeout=5, max_buffered=2, when_full='block'):
+        replies.append(reply)
+        if len(replies) == 4:
+            break
+
+    assert [(reply['sequence'], reply['duplicated']) for reply in replies] == [(1, False), (3, False), (2, False),
+                                                                              (3, True)]
+    assert cmd_ping.running()
+    statistics = cmd_ping.get_rtt_statistics()
+    assert statistics['replies'] == 4
+    assert statistics['replies_duplicated'] == 1
+    assert statistics['replies_out_of_order'] == 1
+    assert statistics['rtt_p50_seconds'] == pytest.approx(0.003)
+    assert statistics['rtt_p99_seconds'] == pytest.approx(0.020)
+    cmd_ping.cancel()
+
+
+def test_ping_keeps_bounded_statistics_of_busybox_replies_without_series(buffer_connection):
+    replies_count = 2000
+    buffer_connection.remote_inject_response(["ping 10.0.0.1\n",
+                                              "PING 10.0.0.1 (10.0.0.1): 56 data bytes\n"] +
+                                             ["64 bytes from 10.0.0.1: seq={} ttl=64 time={}.{} ms\n".format(
+                                                 seq, seq % 10, seq % 7) for seq in range(replies_count)])
+    cmd_ping = Ping(buffer_connection.moler_connection, destination='10.0.0.1')
+    cmd_ping.keep_records = False
+    for reply in cmd_ping.stream(timeout=5):
+        if reply['sequence'] == replies_count - 1:
+            break
+
+    statistics = cmd_ping.get_rtt_statistics()
+    assert statistics['replies'] == replies_count
+    assert len(cmd_ping._rtt_statistics.rtts) == 0
+    assert len(cmd_ping._rtt_statistics._buckets) < 100
+    assert statistics['rtt_p50_seconds'] == pytest.approx(0.0046, rel=0.01)
+    assert statistics['rtt_p99_seconds'] == pytest.approx(0.0096, rel=0.01)
+    cmd_ping.cancel()
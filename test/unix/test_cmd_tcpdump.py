@@ -7,9 +7,40 @@ __author__ = 'Julia Patacz'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 _email_ = 'julia.patacz@nokia.com'
 
+import pytest
+
 from moler.cmd.unix.tcpdump import Tcpdump
 
 
 def test_tcpdump_returns_proper_command_string(buffer_connection):
     tcpdump_cmd = Tcpdump(buffer_connection, options="-c 4 -vv")
     assert "tcpdump -c 4 -vv" == tcpdump_cmd.command_string
+
+
+def test_tcpdump_streams_packets_as_they_are_parsed(buffer_connection):
+    from moler.cmd.unix.tcpdump import COMMAND_OUTPUT
+    buffer_connection.remote_inject_response([COMMAND_OUTPUT])
+    tcpdump_cmd = Tcpdump(connection=buffer_connection.moler_connection, options="-c 4")
+    tcpdump_cmd.keep_records = False
+
+    packets = [packet for packet in tcpdump_cmd.stream(timeout=2)]
+
+    assert [packet['timestamp'] for packet in packets] == ['13:16:22.176856', '13:16:22.178451', '13:16:22.178531',
+                                                           '13:16:22.178545']
+    assert tcpdump_cmd.result() == {'listening': 'eth0', 'link-type': 'EN10MB (Ethernet)',
+                                    'capture size': '262144 bytes', 'packets captured': '4',
+                                    'packets received by filter': '5', 'packets dropped by kernel': '0'}
+
+
+def test_tcpdump_stream_raises_command_exception_after_last_packet(buffer_connection):
+    from moler.exceptions import CommandTimeout
+    buffer_connection.remote_inject_response(["tcpdump -c 4\n",
+                                              "13:16:22.176856 IP debdev.ntp > fwdns2.vbctv.in.ntp: NTPv4, length 48\n",
+                                              "13:16:22.178451 IP debdev.44321 > rumcdc001.domain: 34347+ PTR?\n"])
+    tcpdump_cmd = Tcpdump(connection=buffer_connection.moler_connection, options="-c 4")
+    tcpdump_cmd.terminating_timeout = 0
+    packets = list()
+    with pytest.raises(CommandTimeout):
+        for packet in tcpdump_cmd.stream(timeout=0.3, max_buffered=1, when_full='drop_oldest'):
+            packets.append(packet)
+    assert [packet['timestamp'] for packet in packets] == ['13:16:22.176856']  # 2nd packet is not complete
@@ -26,6 +26,33 @@ def test_top_raise_error_on_bad_option(buffer_connection, command_output_and_exp
         top_cmd()
 
 
+def test_top_returns_processes_as_columnar_table(buffer_connection):
+    from moler.cmd.unix import top
+    buffer_connection.remote_inject_response([top.COMMAND_OUTPUT_without_options])
+    top_cmd = Top(connection=buffer_connection.moler_connection)
+    top_cmd.columnar_result = True
+    processes = top_cmd()['processes']
+    assert processes.to_records() == top.COMMAND_RESULT_without_options['processes']
+    assert list(processes.column('PID')) == [2642, 11447, 9497, 1]
+    assert processes.group_by('USER') == {'bylica': 2, 'root': 2}
+    assert processes.group_by('USER', 'SHR', aggregate='sum') == {'bylica': 33176, 'root': 6384}
+    assert processes.filter(USER='root', **{'%CPU': lambda cpu: cpu > 0.1}).to_records()[0]['COMMAND'] == 'top'
+
+
+
+def test_top_columnar_table_is_not_changed_by_rows_added_to_its_filtered_table(buffer_connection):
+    from moler.cmd.unix import top
+    buffer_connection.remote_inject_response([top.COMMAND_OUTPUT_without_options])
+    top_cmd = Top(connection=buffer_connection.moler_connection)
+    top_cmd.columnar_result = True
+    processes = top_cmd()['processes']
+    root_processes = processes.filter(USER='root')
+    root_processes.append({'USER': 'nobody', 'COMMAND': 'sleep'})
+    assert root_processes.group_by('USER') == {'nobody': 1, 'root': 2}
+    assert 'nobody' not in processes._get_column('USER').categories
+    assert 'sleep' not in processes._get_column('COMMAND').categories
+    assert processes.to_records() == top.COMMAND_RESULT_without_options['processes']
+
 @pytest.fixture
 def command_output_and_expected_result_on_bad_option():
     output = """xyz@debian>top abc n 1